@@ -11,5 +11,11 @@ python manage.py collectstatic --no-input
 echo "🔄 Load test data..."
 python ./load_test_data/load_data.py
 
+echo "🔄 Prepare metrics directory..."
+# Метрики Prometheus worker-ов uvicorn - в общем каталоге (очищается при старте)
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/cash_manager_metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 echo "🚀 Run application..."
 uvicorn service_cash_manager.asgi:application --host 0.0.0.0 --port 8000 --workers 4
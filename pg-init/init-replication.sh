@@ -0,0 +1,5 @@
+#!/bin/bash
+set -e
+
+# Подключения потоковой репликации (сервис pg_db_replica, профиль replica)
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
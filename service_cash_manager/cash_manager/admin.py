@@ -1,14 +1,46 @@
+import hashlib
+import io
+from uuid import UUID
+
 from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib import messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max, Min, Sum
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
 from rangefilter.filters import DateRangeFilterBuilder
 
+from .admin_changelist import (
+    CachedResultsChangeList,
+    EstimatedCountPaginator,
+    ExportChangeList,
+    KeysetChangeList,
+)
+from .admin_widgets import TaxonomyAutocompleteMixin
 from .admin_filters import (
+    CashFlowTaxonomyFilter,
     CashFlowStatusFilter,
     CashFlowTypeFilter,
     CashFlowCategoryFilter,
     CashFlowSubCategoryFilter,
     CashFlowCommentFilter,
 )
+from .cache_metrics import cache_get
+from .data_version import cash_flow_version, mark_cash_flows_changed
+from .exports import CashFlowCSVExporter
+from .imports import IMPORT_FORMAT_CSV, IMPORT_FORMATS, CashFlowImporter
 from .models import (
     CashFlow,
     CashFlowStatus,
@@ -17,7 +49,16 @@ from .models import (
     CashFlowCategoryBySubcategory,
     CashFlowCategory,
     CashFlowSubCategory,
+    CashFlowDailyRollup,
 )
+from .routers import read_db, read_from_replica
+from .taxonomy import TAXONOMY_KINDS, taxonomy
+
+IMPORT_REJECTS_SHOWN = 100
+# Макс. кол-во подсказок наименований в фильтрах списка ДДС
+AUTOCOMPLETE_LIMIT = 20
+EXPORT_CSV_URL_NAME = "cash_manager_cashflow_export_csv"
+
 
 class DefaultAdmin(admin.ModelAdmin):
     list_display = ("title", "alias")
@@ -27,6 +68,46 @@ class DefaultAdmin(admin.ModelAdmin):
     sortable_by = ("title", "alias")
     search_fields = ("title",)
 
+    paginator = EstimatedCountPaginator
+    # Ограничение подсказок autocomplete (TaxonomyAutocompleteSelect):
+    # GET-параметр (родительское поле формы) -> связи снимка taxonomy
+    autocomplete_parents: dict[str, str] = {}
+
+    def get_changelist(self, request, **kwargs):
+        return CachedResultsChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(
+            request,
+            queryset,
+            search_term,
+        )
+        match = request.resolver_match
+        if match is None or match.url_name != "autocomplete":
+            return queryset, may_have_duplicates
+
+        snapshot = taxonomy.snapshot
+        for param, links in self.autocomplete_parents.items():
+            if not (value := request.GET.get(param)):
+                continue
+            try:
+                parent_id = UUID(value)
+            except ValueError:
+                return queryset.none(), False
+            # Одна выборка по PK из связей снимка, без JOIN со связками
+            queryset = queryset.filter(
+                id__in=getattr(snapshot, links).get(parent_id, ()),
+            )
+        return queryset, may_have_duplicates
+
+    @staticmethod
+    def count_cache_version() -> str:
+        """
+        Версия для ключей кэша списка (CachedResultsChangeList): меняется
+        при сохранении/удалении любого справочника или связи.
+        """
+        return str(taxonomy.version())
+
 
 @admin.register(CashFlowStatus)
 class CashFlowStatusAdmin(DefaultAdmin):
@@ -35,40 +116,44 @@ class CashFlowStatusAdmin(DefaultAdmin):
 
 @admin.register(CashFlowSubCategory)
 class CashFlowSubCategoryAdmin(DefaultAdmin):
-    pass
+    autocomplete_parents = {"category": "subcategories_by_category"}
 
 
-class CashFlowCategoryBySubcategoryForm(forms.ModelForm):
-    class Meta:
-        model = CashFlowCategoryBySubcategory
-        fields = "__all__"
-        widgets = {"subcategory_id": forms.Select(attrs={"class": "select2"})}
-
-
-class CashFlowCategoryBySubcategoryInline(admin.TabularInline):
+class CashFlowCategoryBySubcategoryInline(
+    TaxonomyAutocompleteMixin,
+    admin.TabularInline,
+):
     model = CashFlowCategoryBySubcategory
-    form = CashFlowCategoryBySubcategoryForm
     extra = 1
-    autocomplete_fields = ("subcategory_id", )
+    autocomplete_fields = ("subcategory", )
+
+    def get_queryset(self, request):
+        # Строка inline выводит связку (__str__) с наименованиями
+        return super().get_queryset(request).select_related(
+            "category",
+            "subcategory",
+        )
 
 
 @admin.register(CashFlowCategory)
 class CashFlowCategoryAdmin(DefaultAdmin):
     inlines = (CashFlowCategoryBySubcategoryInline, )
+    autocomplete_parents = {"type": "categories_by_type"}
 
 
-class CashFlowCategoryByTypeForm(forms.ModelForm):
-    class Meta:
-        model = CashFlowCategoryByType
-        fields = "__all__"
-        widgets = {"category_id": forms.Select(attrs={"class": "select2"})}
-
-
-class CashFlowCategoryByTypeInline(admin.TabularInline):
+class CashFlowCategoryByTypeInline(
+    TaxonomyAutocompleteMixin,
+    admin.TabularInline,
+):
     model = CashFlowCategoryByType
-    form = CashFlowCategoryByTypeForm
     extra = 1
-    autocomplete_fields = ("category_id", )
+    autocomplete_fields = ("category", )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "category",
+            "type",
+        )
 
 
 @admin.register(CashFlowType)
@@ -76,26 +161,38 @@ class CashFlowTypeAdmin(DefaultAdmin):
     inlines = (CashFlowCategoryByTypeInline, )
 
 
-class CashFlowAdminForm(forms.ModelForm):
-    class Meta:
-        model = CashFlow
-        fields = "__all__"
-        widgets = {
-            "status": forms.Select(attrs={"class": "select2"}),
-            "type": forms.Select(attrs={"class": "select2"}),
-        }
+class CashFlowImportForm(forms.Form):
+    file = forms.FileField(label="Файл")
+    file_format = forms.ChoiceField(
+        label="Формат",
+        choices=[(f, f.upper()) for f in IMPORT_FORMATS],
+        initial=IMPORT_FORMAT_CSV,
+    )
+
+
+class CashFlowSummaryForm(forms.Form):
+    date_from = forms.DateField(
+        label="С",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
+    date_to = forms.DateField(
+        label="По",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
 
 
 @admin.register(CashFlow)
-class CashFlowAdmin(admin.ModelAdmin):
-    form = CashFlowAdminForm
+class CashFlowAdmin(TaxonomyAutocompleteMixin, admin.ModelAdmin):
+    change_list_template = "admin/cash_manager/cashflow/change_list.html"
 
     list_display = (
         "id",
         "status__title",
         "type__title",
-        "titles_categories",
-        "titles_subcategories",
+        "category__title",
+        "subcategory__title",
         "amount",
         "comment",
         "created_at",
@@ -113,32 +210,274 @@ class CashFlowAdmin(admin.ModelAdmin):
         ("created_at", DateRangeFilterBuilder(title="Дата создания")),
     ]
 
-    def titles_categories(self, obj):
-        if obj.type:
-            categories_titles = CashFlowCategory.objects.filter(
-                category_by_type__type=obj.type
-            ).values_list(
-                "title",
-                flat=True,
-            ).distinct()
-
-            return (
-                ", ".join(categories_titles)
-                if categories_titles else "—"
+    list_select_related = ("status", "type", "category", "subcategory")
+    paginator = EstimatedCountPaginator
+
+    autocomplete_fields = ("status", "type", "category", "subcategory")
+    # Категории - выбранного типа, подкатегории - выбранной категории
+    autocomplete_chained_fields = {"category": "type", "subcategory": "category"}
+
+    class Media:
+        js = ("cash_manager/autocomplete_filter.js", )
+
+    def get_changelist(self, request, **kwargs):
+        match = request.resolver_match
+        if match is not None and match.url_name == EXPORT_CSV_URL_NAME:
+            return ExportChangeList
+        return KeysetChangeList
+
+    @staticmethod
+    def count_cache_version() -> str:
+        """
+        Версия для ключей кэша кол-ва строк списка (KeysetChangeList):
+        справочники (фильтры по наименованиям) и данные ДДС.
+        """
+        return f"{taxonomy.version()}:{cash_flow_version()}"
+
+    def changelist_view(self, request, extra_context=None):
+        if (query := self._legacy_filter_query(request)) is not None:
+            return HttpResponseRedirect(f"{request.path}?{query}")
+
+        # Просмотр списка читается с реплики; действия (POST) - на primary
+        with read_from_replica(request.method == "GET"):
+            response = super().changelist_view(request, extra_context)
+            # Шаблон рендерится в участке: QuerySet вычисляются при рендере
+            if hasattr(response, "render"):
+                response.render()
+        return response
+
+    def _legacy_filter_query(self, request) -> str | None:
+        """
+        GET-параметры списка с текущими именами фильтров по справочникам
+        вместо старых ({kind}_title, см. legacy_parameter_name).
+
+        :return: Строка запроса или None (старых параметров нет).
+        """
+        renames = {
+            spec.legacy_parameter_name: spec.parameter_name
+            for spec in self.list_filter
+            if isinstance(spec, type)
+            and issubclass(spec, CashFlowTaxonomyFilter)
+        }
+        if not renames.keys() & request.GET.keys():
+            return None
+
+        params = request.GET.copy()
+        for legacy, name in renames.items():
+            if legacy in params:
+                values = params.pop(legacy)
+                if name not in params:
+                    params.setlist(name, values)
+        return params.urlencode()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        mark_cash_flows_changed()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        mark_cash_flows_changed()
+
+    def get_urls(self):
+        return [
+            path(
+                "export/csv/",
+                self.admin_site.admin_view(self.export_csv_view),
+                name=EXPORT_CSV_URL_NAME,
+            ),
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="cash_manager_cashflow_import",
+            ),
+            path(
+                "summary/",
+                self.admin_site.admin_view(self.summary_view),
+                name="cash_manager_cashflow_summary",
+            ),
+            path(
+                "autocomplete/<str:kind>/",
+                self.admin_site.admin_view(self.autocomplete_view),
+                name="cash_manager_cashflow_autocomplete",
+            ),
+            *super().get_urls(),
+        ]
+
+    def autocomplete_view(self, request, kind: str):
+        """
+        Подсказки наименований справочника для фильтров списка (JSON).
+
+        Отвечает из префиксного индекса снимка taxonomy, без запросов в БД;
+        ответ кэшируется (общий для worker-ов) до изменения справочников.
+        GET-параметр q - введенная строка; в ответе, как у autocomplete
+        Django admin, results: [{id, text}].
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        if kind not in TAXONOMY_KINDS:
+            raise Http404
+
+        value = request.GET.get("q", "").strip()
+        cache_key = (
+            f"cash_manager:autocomplete:{kind}:"
+            f"{hashlib.sha256(value.casefold().encode()).hexdigest()}:"
+            f"{taxonomy.version()}"
+        )
+        if (body := cache_get("autocomplete", cache_key)) is None:
+            items = taxonomy.snapshot.autocomplete(
+                kind,
+                value,
+                AUTOCOMPLETE_LIMIT,
+            )
+            body = {
+                "results": [
+                    {"id": str(item.id), "text": item.title}
+                    for item in items
+                ],
+                "pagination": {"more": False},
+            }
+            cache.set(
+                cache_key,
+                body,
+                timeout=settings.CHANGELIST_RESULTS_CACHE_TIMEOUT,
+            )
+        return JsonResponse(body)
+
+    def export_csv_view(self, request):
+        """
+        Потоковая выгрузка в CSV всех ДДС, подходящих под текущие фильтры
+        списка (без пагинации).
+
+        QuerySet строит ExportChangeList (см. get_changelist): те же
+        фильтры и поиск, что в списке, но без COUNT и запроса страницы.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        with read_from_replica() as database:
+            try:
+                changelist = self.get_changelist_instance(request)
+            except IncorrectLookupParameters:
+                return HttpResponseRedirect(
+                    reverse("admin:cash_manager_cashflow_changelist") + "?e=1"
+                )
+
+        # Выгрузка читается после выхода из view: БД задается явно
+        exporter = CashFlowCSVExporter(
+            changelist.queryset.using(database),
+            taxonomy.snapshot,
+        )
+        filename = f"cash_flows_{timezone.now():%Y%m%d_%H%M%S}.csv"
+
+        return StreamingHttpResponse(
+            # Под ASGI - async-итератор, чтобы не блокировать event loop
+            aiter(exporter)
+            if isinstance(request, ASGIRequest)
+            else iter(exporter),
+            content_type="text/csv; charset=utf-8",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            },
+        )
+
+    def import_view(self, request):
+        """Загрузка ДДС из CSV/JSONL (COPY, отклоненные строки - в отчет)."""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        result = None
+        form = CashFlowImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            file = io.TextIOWrapper(
+                form.cleaned_data["file"].file,
+                encoding="utf-8-sig",
+                newline="",
             )
-        return "—"
-
-    def titles_subcategories(self, obj):
-        if obj.type:
-            subcategories_titles = CashFlowSubCategory.objects.filter(
-                category_by_subcategory__category__category_by_type__type=obj.type
-            ).values_list(
-                "title",
-                flat=True,
-            ).distinct()
-
-            return (
-                ", ".join(subcategories_titles)
-                if subcategories_titles else "—"
+            result = CashFlowImporter(taxonomy.snapshot).run(
+                file,
+                form.cleaned_data["file_format"],
             )
-        return "—"
+            messages.info(
+                request,
+                f"Импортировано: {result.imported}, "
+                f"отклонено: {len(result.rejects)}.",
+            )
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "Импорт ДДС",
+            "form": form,
+            "result": result,
+            "rejects": result.rejects[:IMPORT_REJECTS_SHOWN] if result else [],
+        }
+        return TemplateResponse(
+            request,
+            "admin/cash_manager/cashflow/import.html",
+            context,
+        )
+
+    def summary_view(self, request):
+        """
+        Сводка ДДС за период по статусу, типу и категории.
+
+        Читается из дневных агрегатов (cash_flow_daily_rollup), а не из
+        cash_flow, поэтому стоимость не зависит от кол-ва ДДС за период.
+        """
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        form = CashFlowSummaryForm(request.GET or None)
+        queryset = CashFlowDailyRollup.objects.using(read_db())
+        if form.is_valid():
+            if date_from := form.cleaned_data["date_from"]:
+                queryset = queryset.filter(day__gte=date_from)
+            if date_to := form.cleaned_data["date_to"]:
+                queryset = queryset.filter(day__lte=date_to)
+
+        aggregates = {
+            "amount_sum": Sum("amount_sum"),
+            "amount_count": Sum("amount_count"),
+            "amount_min": Min("amount_min"),
+            "amount_max": Max("amount_max"),
+        }
+        snapshot = taxonomy.snapshot
+        rows = [
+            {
+                "status": self._taxonomy_title(
+                    snapshot.statuses,
+                    row["status_id"],
+                ),
+                "type": self._taxonomy_title(snapshot.types, row["type_id"]),
+                "category": self._taxonomy_title(
+                    snapshot.categories,
+                    row["category_id"],
+                ),
+                **row,
+            }
+            for row in queryset.values(
+                "status_id",
+                "type_id",
+                "category_id",
+            ).annotate(**aggregates).order_by()
+        ]
+        rows.sort(key=lambda row: (row["status"], row["type"], row["category"]))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.opts,
+            "title": "Сводка ДДС",
+            "form": form,
+            "rows": rows,
+            "total": queryset.aggregate(**aggregates),
+        }
+        return TemplateResponse(
+            request,
+            "admin/cash_manager/cashflow/summary.html",
+            context,
+        )
+
+    @staticmethod
+    def _taxonomy_title(items: dict, item_id) -> str:
+        item = items.get(item_id)
+        return item.title if item else "-"
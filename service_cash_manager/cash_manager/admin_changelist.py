@@ -0,0 +1,523 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
+
+from .cache_metrics import cache_get
+
+CURSOR_VAR = "cursor"
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+# GET-параметр: точный COUNT(*) вместо оценки планировщика
+EXACT_COUNT_VAR = "exact_count"
+
+
+def estimate_count(queryset) -> int | None:
+    """
+    Оценка кол-ва строк QuerySet по статистике планировщика PostgreSQL.
+
+    Без фильтров - pg_class.reltuples таблицы (или ее партиций), с
+    фильтрами - оценка строк из EXPLAIN. Для других СУБД или без статистики - None.
+
+    :param queryset: QuerySet.
+
+    :return: Оценка кол-ва строк или None.
+    """
+    if queryset.query.is_empty():
+        return 0
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    if not queryset.query.where:
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        # У партиционированной таблицы статистика - у партиций;
+        # reltuples = -1, если по таблице еще не собиралась статистика
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    sum(greatest(c.reltuples, 0))::bigint,
+                    bool_or(c.reltuples >= 0)
+                FROM pg_class AS c
+                WHERE c.relkind = 'r' AND (
+                    c.oid = %s::regclass
+                    OR c.oid IN (
+                        SELECT inhrelid
+                        FROM pg_inherits
+                        WHERE inhparent = %s::regclass
+                    )
+                )
+                """,
+                [table, table],
+            )
+            estimate, has_stats = cursor.fetchone()
+        return estimate if has_stats else None
+
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def seek_condition(
+    keyset: list[tuple[str, bool]],
+    values: list,
+    direction: str = CURSOR_NEXT,
+) -> Q:
+    """
+    Условие "строка после (до) ключа" для keyset-пагинации.
+
+    (a, b, c) > (x, y, z) раскрывается в
+    a >= x AND (a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)),
+    что допускает разные направления сортировки полей, а первое условие
+    позволяет использовать индекс по первому полю.
+
+    :param keyset: Поля сортировки [(поле, по убыванию), ...].
+    :param values: Значения ключа граничной строки.
+    :param direction: CURSOR_NEXT - строки после ключа, CURSOR_PREV - до.
+
+    :return: Условие для QuerySet.filter.
+    """
+    def lookup(descending: bool, strict: bool) -> str:
+        forward = descending == (direction == CURSOR_PREV)
+        return ("gt" if forward else "lt") + ("" if strict else "e")
+
+    lead_name, lead_desc = keyset[0]
+    condition = Q()
+    for i, (name, descending) in enumerate(keyset):
+        equal = {keyset[j][0]: values[j] for j in range(i)}
+        condition |= Q(
+            **equal,
+            **{f"{name}__{lookup(descending, True)}": values[i]},
+        )
+
+    return Q(**{f"{lead_name}__{lookup(lead_desc, False)}": values[0]}) & (
+        condition
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator, который не делает COUNT(*) по большим таблицам.
+
+    Если оценка кол-ва строк больше CHANGELIST_EXACT_COUNT_THRESHOLD,
+    count возвращает оценку планировщика, иначе - точный COUNT(*).
+    С exact = True - всегда точный COUNT(*). Если задан cache_key, кол-во
+    берется из Django cache (на CHANGELIST_COUNT_CACHE_TIMEOUT секунд).
+    """
+
+    is_estimated = False
+    exact = False
+    cache_key: str | None = None
+
+    @cached_property
+    def count(self) -> int:
+        if self.cache_key is not None:
+            cached = cache_get("changelist_count", self.cache_key)
+            if cached is not None:
+                count, self.is_estimated = cached
+                return count
+
+        count = self._count()
+        if self.cache_key is not None:
+            cache.set(
+                self.cache_key,
+                (count, self.is_estimated),
+                timeout=settings.CHANGELIST_COUNT_CACHE_TIMEOUT,
+            )
+        return count
+
+    def _count(self) -> int:
+        if not self.exact:
+            estimate = estimate_count(self.object_list)
+            if (
+                estimate is not None
+                and estimate > settings.CHANGELIST_EXACT_COUNT_THRESHOLD
+            ):
+                self.is_estimated = True
+                return estimate
+
+        return super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList с keyset (seek) пагинацией.
+
+    Вместо OFFSET/LIMIT страница выбирается условием "строго после (до)
+    ключа последней (первой) строки" по полям сортировки списка, поэтому
+    любая страница стоит столько же, сколько первая. Ключ передается в
+    GET-параметре cursor. Если сортировка не сводится к полям модели
+    (например, по связанной сущности), используется обычная пагинация.
+
+    Кол-ва строк (с фильтрами, всего, по значениям FK для фасетов)
+    кэшируются по нормализованным параметрам фильтров, если ModelAdmin
+    задает версию данных count_cache_version() - запись меняет версию, т.е.
+    и ключи кэша.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.exact_count = EXACT_COUNT_VAR in request.GET
+        self.next_cursor = None
+        self.prev_cursor = None
+        self.is_keyset = False
+        self.result_count_is_estimated = False
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        lookup_params.pop(EXACT_COUNT_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Смена фильтров/сортировки начинает список с первой страницы
+        remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    @property
+    def next_page_url(self) -> str | None:
+        if self.next_cursor:
+            return self.get_query_string({CURSOR_VAR: self.next_cursor})
+        return None
+
+    @property
+    def prev_page_url(self) -> str | None:
+        if self.prev_cursor:
+            return self.get_query_string({CURSOR_VAR: self.prev_cursor})
+        return None
+
+    @property
+    def first_page_url(self) -> str:
+        return self.get_query_string()
+
+    @property
+    def exact_count_url(self) -> str:
+        return self.get_query_string({EXACT_COUNT_VAR: 1})
+
+    def get_results(self, request):
+        paginator = self._get_filtered_paginator(request)
+        result_count = paginator.count
+
+        if not self.model_admin.show_full_result_count:
+            full_result_count = None
+        elif not (self.has_active_filters or self.query or self.exact_count):
+            # Без фильтров и поиска оба кол-ва - по одному QuerySet
+            full_result_count = result_count
+        else:
+            full_result_count = self._get_paginator(
+                request,
+                self.root_queryset,
+                self._count_cache_key("full", {}),
+            ).count
+
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        keyset = self._get_keyset()
+        if self.show_all and can_show_all:
+            result_list = self.queryset._clone()
+        elif keyset is not None:
+            self.is_keyset = True
+            result_list = self._get_page(keyset)
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage:
+                raise IncorrectLookupParameters
+
+        self.result_count = result_count
+        self.result_count_is_estimated = getattr(
+            paginator,
+            "is_estimated",
+            False,
+        )
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            full_result_count
+        )
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def facet_counts(
+        self,
+        request,
+        field: str,
+        exclude_parameters: list[str],
+    ) -> dict:
+        """
+        Кол-во строк по значениям поля (фасеты фильтра) при текущих
+        фильтрах, кроме фильтра exclude_parameters (как фасеты Django admin).
+
+        :param request: Запрос.
+        :param field: Поле (FK, например status_id).
+        :param exclude_parameters: Параметры фильтра, для которого фасеты.
+
+        :return: Значение -> кол-во строк.
+        """
+        params = {
+            name: value
+            for name, value in self.get_filters_params().items()
+            if name not in exclude_parameters
+        }
+        cache_key = self._count_cache_key(f"facets:{field}", params)
+        if cache_key is not None:
+            cached = cache_get("changelist_facets", cache_key)
+            if cached is not None:
+                return cached
+
+        queryset = self.get_queryset(
+            request,
+            exclude_parameters=exclude_parameters,
+        )
+        counts = dict(
+            queryset.order_by().values_list(field).annotate(count=Count("pk")),
+        )
+        if cache_key is not None:
+            cache.set(
+                cache_key,
+                counts,
+                timeout=settings.CHANGELIST_COUNT_CACHE_TIMEOUT,
+            )
+        return counts
+
+    def _get_filtered_paginator(self, request) -> Paginator:
+        return self._get_paginator(
+            request,
+            self.queryset,
+            self._count_cache_key("filtered", self.get_filters_params()),
+            exact=self.exact_count,
+        )
+
+    def _get_paginator(
+        self,
+        request,
+        queryset,
+        cache_key: str | None,
+        exact: bool = False,
+    ) -> Paginator:
+        paginator = self.model_admin.get_paginator(
+            request,
+            queryset,
+            self.list_per_page,
+        )
+        if isinstance(paginator, EstimatedCountPaginator):
+            paginator.exact = exact
+            paginator.cache_key = cache_key and f"{cache_key}:{exact:d}"
+        return paginator
+
+    def _count_cache_key(self, scope: str, params: dict) -> str | None:
+        """
+        Ключ кэша кол-ва строк: область, хэш нормализованных параметров
+        фильтров и поиска, версия данных ModelAdmin.count_cache_version().
+
+        :param scope: Область (filtered, full, facets:<поле>, results).
+        :param params: Параметры фильтров (get_filters_params).
+
+        :return: Ключ или None (ModelAdmin не задает версию - без кэша).
+        """
+        count_cache_version = getattr(
+            self.model_admin,
+            "count_cache_version",
+            None,
+        )
+        if count_cache_version is None:
+            return None
+
+        normalized = json.dumps(
+            {
+                "query": self.query,
+                "params": sorted(
+                    (
+                        name,
+                        sorted(value) if isinstance(value, list) else [value],
+                    )
+                    for name, value in params.items()
+                ),
+            },
+        )
+        params_hash = hashlib.sha256(normalized.encode()).hexdigest()
+        return (
+            f"{self.opts.label_lower}:changelist_count:{scope}:"
+            f"{params_hash}:{count_cache_version()}"
+        )
+
+    def _get_keyset(self) -> list[tuple[str, bool]] | None:
+        """
+        Поля сортировки списка в виде [(поле, по убыванию), ...].
+
+        :return: Поля ключа или None, если keyset-пагинация неприменима.
+        """
+        keyset = {}
+        for field in self.queryset.query.order_by:
+            if not isinstance(field, str) or "__" in field.lstrip("-"):
+                return None
+
+            name = field.lstrip("-")
+            if name != "pk":
+                try:
+                    self.lookup_opts.get_field(name)
+                except FieldDoesNotExist:
+                    return None
+            # ChangeList дописывает к сортировке списка сортировку
+            # QuerySet: повтор поля порядок не меняет
+            keyset.setdefault(name, field.startswith("-"))
+
+        return list(keyset.items()) or None
+
+    def _get_page(self, keyset: list[tuple[str, bool]]) -> list:
+        direction, values = self._decode_cursor(keyset)
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(
+                seek_condition(keyset, values, direction),
+            )
+        if direction == CURSOR_PREV:
+            queryset = queryset.reverse()
+
+        rows = list(queryset[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+
+        if direction == CURSOR_PREV:
+            rows.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, values is not None
+
+        if rows and has_next:
+            self.next_cursor = self._encode_cursor(
+                keyset,
+                rows[-1],
+                CURSOR_NEXT,
+            )
+        if rows and has_prev:
+            self.prev_cursor = self._encode_cursor(keyset, rows[0], CURSOR_PREV)
+
+        return rows
+
+    def _encode_cursor(
+        self,
+        keyset: list[tuple[str, bool]],
+        obj,
+        direction: str,
+    ) -> str:
+        values = [
+            self._get_field(name).value_to_string(obj)
+            for name, _ in keyset
+        ]
+        data = json.dumps({"d": direction, "v": values}).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def _decode_cursor(
+        self,
+        keyset: list[tuple[str, bool]],
+    ) -> tuple[str, list | None]:
+        """
+        Разбор GET-параметра cursor.
+
+        :raises IncorrectLookupParameters: Некорректный cursor.
+
+        :return: Направление и значения ключа (None - первая страница).
+        """
+        if not self.cursor:
+            return CURSOR_NEXT, None
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(self.cursor))
+            direction, raw_values = data["d"], data["v"]
+            if direction not in (CURSOR_NEXT, CURSOR_PREV):
+                raise ValueError(direction)
+            if len(raw_values) != len(keyset):
+                raise ValueError(raw_values)
+
+            values = [
+                self._get_field(name).to_python(value)
+                for (name, _), value in zip(keyset, raw_values)
+            ]
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise IncorrectLookupParameters
+
+        return direction, values
+
+    def _get_field(self, name: str):
+        if name == "pk":
+            return self.lookup_opts.pk
+        return self.lookup_opts.get_field(name)
+
+
+class ExportChangeList(KeysetChangeList):
+    """
+    KeysetChangeList для выгрузки: фильтры, поиск и сортировка списка без
+    страницы и кол-в строк.
+
+    Выгрузке нужен только отфильтрованный QuerySet (queryset), поэтому
+    get_results не выполняет ни COUNT, ни запрос страницы.
+    """
+
+    def get_results(self, request):
+        pass
+
+
+class CachedResultsChangeList(KeysetChangeList):
+    """
+    KeysetChangeList, который кэширует и строки страницы - для небольших,
+    редко изменяемых списков (справочники).
+
+    Кэшируются данные, а не HTML: страница рендерится для каждого запроса
+    (CSRF-токен, сообщения, права). Ключ - все GET-параметры списка и версия
+    ModelAdmin.count_cache_version(), поэтому изменение данных сразу делает
+    кэш неактуальным.
+    """
+
+    CACHED_ATTRS = (
+        "result_list",
+        "result_count",
+        "result_count_is_estimated",
+        "full_result_count",
+        "show_full_result_count",
+        "show_admin_actions",
+        "can_show_all",
+        "multi_page",
+        "is_keyset",
+        "next_cursor",
+        "prev_cursor",
+    )
+
+    def get_results(self, request):
+        cache_key = self._count_cache_key("results", self.params)
+        if cache_key is not None:
+            cached = cache_get("changelist_results", cache_key)
+            if cached is not None:
+                self.__dict__.update(cached)
+                # Paginator (шаблон: номера страниц) - с кол-вом из кэша
+                self.paginator = self._get_filtered_paginator(request)
+                return
+
+        super().get_results(request)
+        self.result_list = list(self.result_list)
+        if cache_key is not None:
+            cache.set(
+                cache_key,
+                {name: getattr(self, name) for name in self.CACHED_ATTRS},
+                timeout=settings.CHANGELIST_RESULTS_CACHE_TIMEOUT,
+            )
@@ -1,75 +1,117 @@
 from datetime import datetime
+from uuid import UUID
 
-from django.contrib import admin
 from django.contrib.admin import SimpleListFilter
+from django.urls import reverse
 
+from .search import search_comments
+from .taxonomy import taxonomy
 
-class CashFlowStatusFilter(admin.SimpleListFilter):
-    title = "Статус"
-    parameter_name = "status_title"
-    template = "admin/cash_manager/input_filter.html"
 
-    def lookups(self, request, model_admin):
-        return [("", "")]
+class CashFlowTaxonomyFilter(SimpleListFilter):
+    """
+    Фильтр ДДС по справочнику с подсказками наименований.
 
-    def queryset(self, request, queryset):
-        if value := self.value():
-            return queryset.filter(status__title__icontains=value)
-        return queryset
+    Поле ввода запрашивает подсказки у autocomplete_view и передает UUID
+    выбранного справочника, поэтому список фильтруется по индексу FK
+    ({kind}_id), а не по наименованию через JOIN. Введенная без выбора
+    строка ищется по наименованиям (с опечатками).
 
-    def choices(self, changelist):
-        return []
+    С show_facet_counts, когда в списке включены фасеты ("Show counts"),
+    под полем выводятся справочники с кол-вом ДДС (из кэша списка).
+    """
 
-
-class CashFlowTypeFilter(admin.SimpleListFilter):
-    title = "Тип"
-    parameter_name = "type_title"
-    template = "admin/cash_manager/input_filter.html"
+    kind: str
+    # Имя параметра до перехода на UUID ({kind}_title): ссылки и закладки
+    # со старым именем перенаправляются на parameter_name
+    legacy_parameter_name: str
+    template = "admin/cash_manager/autocomplete_filter.html"
+    show_facet_counts = False
 
     def lookups(self, request, model_admin):
         return [("", "")]
 
     def queryset(self, request, queryset):
         if value := self.value():
-            return queryset.filter(type__title__icontains=value)
+            return queryset.filter(
+                **{
+                    f"{self.kind}_id__in": taxonomy.snapshot.filter_ids(
+                        self.kind,
+                        value,
+                    ),
+                },
+            )
         return queryset
 
     def choices(self, changelist):
-        return []
+        if not (self.show_facet_counts and changelist.add_facets):
+            return []
+
+        items = taxonomy.snapshot.items(self.kind)
+        counts = changelist.facet_counts(
+            self.request,
+            f"{self.kind}_id",
+            self.expected_parameters(),
+        )
+        return [
+            {
+                "selected": self.value() == str(item_id),
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: item_id},
+                ),
+                "display": f"{items[item_id].title} ({count})",
+            }
+            for item_id, count in sorted(
+                counts.items(),
+                key=lambda item_count: -item_count[1],
+            )
+            if item_id in items
+        ]
+
+    def display_value(self) -> str:
+        """Наименование выбранного справочника (или введенная строка)."""
+        value = self.value() or ""
+        try:
+            item = taxonomy.snapshot.items(self.kind).get(UUID(value))
+        except ValueError:
+            item = None
+        return item.title if item else value
+
+    def autocomplete_url(self) -> str:
+        return reverse(
+            "admin:cash_manager_cashflow_autocomplete",
+            args=[self.kind],
+        )
+
+
+class CashFlowStatusFilter(CashFlowTaxonomyFilter):
+    title = "Статус"
+    parameter_name = "status"
+    legacy_parameter_name = "status_title"
+    kind = "status"
+    show_facet_counts = True
 
 
-class CashFlowCategoryFilter(admin.SimpleListFilter):
-    title = "Категория"
-    parameter_name = "category_title"
-    template = "admin/cash_manager/input_filter.html"
-
-    def lookups(self, request, model_admin):
-        return [("", "")]
+class CashFlowTypeFilter(CashFlowTaxonomyFilter):
+    title = "Тип"
+    parameter_name = "type"
+    legacy_parameter_name = "type_title"
+    kind = "type"
+    show_facet_counts = True
 
-    def queryset(self, request, queryset):
-        if value := self.value():
-            return queryset.filter(type__category_by_type__category__title=value)
-        return queryset
 
-    def choices(self, changelist):
-        return []
+class CashFlowCategoryFilter(CashFlowTaxonomyFilter):
+    title = "Категория"
+    parameter_name = "category"
+    legacy_parameter_name = "category_title"
+    kind = "category"
 
 
-class CashFlowSubCategoryFilter(admin.SimpleListFilter):
+class CashFlowSubCategoryFilter(CashFlowTaxonomyFilter):
     title = "Подкатегория"
-    parameter_name = "subcategory_title"
-    template = "admin/cash_manager/input_filter.html"
-
-    def lookups(self, request, model_admin):
-        return [("", "")]
-
-    def queryset(self, request, queryset):
-        if value := self.value():
-            return queryset.filter(type__category_by_type__category__category_by_subcategory__subcategory__title=value)
-        return queryset
-
-    def choices(self, changelist):
-        return []
+    parameter_name = "subcategory"
+    legacy_parameter_name = "subcategory_title"
+    kind = "subcategory"
 
 
 class CashFlowCommentFilter(SimpleListFilter):
@@ -82,7 +124,7 @@ class CashFlowCommentFilter(SimpleListFilter):
 
     def queryset(self, request, queryset):
         if value := self.value():
-            return queryset.filter(comment__icontains=value)
+            return search_comments(queryset, value)
         return queryset
 
     def choices(self, changelist):
@@ -0,0 +1,107 @@
+from uuid import UUID
+
+from django import forms
+from django.contrib.admin.widgets import AutocompleteSelect
+
+from .taxonomy import TAXONOMY_KINDS, taxonomy
+
+
+class TaxonomyAutocompleteSelect(AutocompleteSelect):
+    """
+    AJAX autocomplete (select2) поля-справочника ДДС.
+
+    Варианты запрашиваются у autocomplete Django admin постранично (поиск
+    по search_fields справочника), в HTML выводится только выбранное
+    значение - его наименование берется из снимка taxonomy, без запроса в
+    БД на каждое поле (строку inline-формы).
+
+    С chained_field подсказки ограничиваются значением родительского поля
+    той же формы (категории - типом, подкатегории - категорией): JS
+    передает его в GET-параметре с именем родительского поля.
+    """
+
+    def __init__(
+        self,
+        field,
+        admin_site,
+        attrs=None,
+        choices=(),
+        using=None,
+        chained_field: str | None = None,
+    ):
+        super().__init__(field, admin_site, attrs, choices, using)
+        self.chained_field = chained_field
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs=extra_attrs)
+        if self.chained_field:
+            attrs["data-chained-field"] = self.chained_field
+        return attrs
+
+    def optgroups(self, name, value, attr=None):
+        selected = [
+            v for v in value if str(v) not in self.choices.field.empty_values
+        ]
+        try:
+            items = taxonomy.snapshot.items(self.field.name)
+            selected_items = [items[UUID(str(v))] for v in selected]
+        except (KeyError, ValueError):
+            # Не справочник или значения еще нет в снимке - из БД
+            return super().optgroups(name, value, attr)
+
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, "", "", False, 0))
+        model = self.field.remote_field.model
+        for item in selected_items:
+            options.append(
+                self.create_option(
+                    name,
+                    str(item.id),
+                    self.choices.field.label_from_instance(
+                        model(id=item.id, title=item.title, alias=item.alias),
+                    ),
+                    True,
+                    len(options),
+                )
+            )
+        return [(None, options, 0)]
+
+    @property
+    def media(self):
+        # После admin/js/autocomplete.js: переопределяет инициализацию select2
+        return super().media + forms.Media(
+            js=(
+                "admin/js/autocomplete.js",
+                "cash_manager/chained_autocomplete.js",
+            ),
+        )
+
+
+class TaxonomyAutocompleteMixin:
+    """
+    ModelAdmin/InlineModelAdmin: поля-справочники ДДС из autocomplete_fields
+    выводятся TaxonomyAutocompleteSelect.
+
+    autocomplete_chained_fields - поле -> родительское поле формы,
+    значением которого ограничиваются подсказки (см.
+    DefaultAdmin.autocomplete_parents).
+    """
+
+    autocomplete_chained_fields: dict[str, str] = {}
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if (
+            "widget" not in kwargs
+            and db_field.name in TAXONOMY_KINDS
+            and db_field.name in self.get_autocomplete_fields(request)
+        ):
+            kwargs["widget"] = TaxonomyAutocompleteSelect(
+                db_field,
+                self.admin_site,
+                using=kwargs.get("using"),
+                chained_field=self.autocomplete_chained_fields.get(
+                    db_field.name,
+                ),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
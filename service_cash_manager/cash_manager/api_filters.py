@@ -0,0 +1,60 @@
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from django.utils.dateparse import parse_date
+
+from .search import search_comments
+from .taxonomy import TAXONOMY_KINDS, TaxonomySnapshot
+
+
+def filter_cash_flows(
+    queryset,
+    params: QueryDict,
+    snapshot: TaxonomySnapshot,
+    date_field: str = "created_at",
+):
+    """
+    Фильтрация ДДС по GET-параметрам API.
+
+    Справочники задаются UUID или, как в фильтрах админ-панели,
+    наименованием (с опечатками): статус и тип - все похожие, категория и
+    подкатегория - наиболее похожие. Наименования переводятся в ID по снимку
+    taxonomy. Комментарий - полнотекстовый и нечеткий поиск.
+
+    :param queryset: QuerySet ДДС.
+    :param params: GET-параметры: created_at_from, created_at_to, status,
+        type, category, subcategory, comment.
+    :param snapshot: Снимок справочников ДДС.
+    :param date_field: Поле даты (у дневных агрегатов - day).
+
+    :raises ValidationError: Некорректное значение параметра.
+
+    :return: Отфильтрованный QuerySet.
+    """
+    for name, lookup in (
+        ("created_at_from", f"{date_field}__gte"),
+        ("created_at_to", f"{date_field}__lte"),
+    ):
+        if value := params.get(name):
+            queryset = queryset.filter(**{lookup: _date(name, value)})
+
+    for name in TAXONOMY_KINDS:
+        if value := params.get(name):
+            queryset = queryset.filter(
+                **{f"{name}_id__in": snapshot.filter_ids(name, value)},
+            )
+
+    if value := params.get("comment"):
+        queryset = search_comments(queryset, value)
+
+    return queryset
+
+
+def _date(name: str, value: str):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: ["Ожидается дата YYYY-MM-DD."]})
+    return parsed
+
@@ -0,0 +1,239 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .data_version import mark_cash_flows_changed
+from .models import CashFlow, CashFlowIdempotencyKey
+from .serializers import build_cash_flow, validation_errors
+from .taxonomy import TaxonomySnapshot
+
+BULK_ACTION_CREATE = "create"
+BULK_ACTION_UPDATE = "update"
+BULK_ACTION_DELETE = "delete"
+BULK_ACTIONS = (BULK_ACTION_CREATE, BULK_ACTION_UPDATE, BULK_ACTION_DELETE)
+
+
+@dataclass
+class BulkPlan:
+    """Проверенная пачка операций массовой записи ДДС."""
+
+    creates: list[CashFlow] = field(default_factory=list)
+    updates: list[CashFlow] = field(default_factory=list)
+    update_fields: set[str] = field(default_factory=set)
+    deletes: list[UUID] = field(default_factory=list)
+    results: list[dict[str, Any]] = field(default_factory=list)
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+
+def request_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def parse_bulk_items(data: Any) -> list[dict[str, Any]]:
+    """
+    Операции из тела запроса {"items": [{"action", "id", "data"}, ...]}.
+
+    :raises ValidationError: Некорректная структура запроса.
+
+    :return: Операции.
+    """
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValidationError({"items": ["Ожидается непустой список."]})
+    if len(items) > settings.API_BULK_MAX_ITEMS:
+        raise ValidationError(
+            {"items": [f"Не более {settings.API_BULK_MAX_ITEMS} операций."]},
+        )
+    return items
+
+
+def bulk_ids(items: list[dict[str, Any]]) -> set[UUID]:
+    """
+    ID ДДС, которые изменяются или удаляются пачкой (корректные UUID).
+
+    :param items: Операции.
+
+    :return: ID.
+    """
+    ids = set()
+    for item in items:
+        if isinstance(item, dict) and item.get("action") in (
+            BULK_ACTION_UPDATE,
+            BULK_ACTION_DELETE,
+        ):
+            try:
+                ids.add(UUID(str(item.get("id"))))
+            except ValueError:
+                pass
+    return ids
+
+
+def plan_bulk(
+    items: list[dict[str, Any]],
+    existing: dict[UUID, CashFlow],
+    snapshot: TaxonomySnapshot,
+) -> BulkPlan:
+    """
+    Проверка всех операций пачки в памяти, без записи в БД.
+
+    Каждая запись проверяется так же, как в API одной записи
+    (build_cash_flow: валидаторы модели и CashFlow.validate_taxonomy).
+
+    :param items: Операции.
+    :param existing: Изменяемые/удаляемые ДДС по ID.
+    :param snapshot: Снимок справочников ДДС.
+
+    :return: План записи; при ошибках - plan.errors по индексам операций.
+    """
+    plan = BulkPlan()
+    seen: set[UUID] = set()
+    for index, item in enumerate(items):
+        try:
+            result = _plan_item(item, existing, snapshot, seen, plan)
+        except ValidationError as ex:
+            plan.errors.append(
+                {"index": index, "errors": validation_errors(ex)},
+            )
+            continue
+        plan.results.append({"index": index, **result})
+
+    return plan
+
+
+def idempotency_keys_expire_before() -> datetime:
+    """Ключи, сохраненные раньше этого момента, устарели."""
+    return timezone.now() - timedelta(
+        seconds=settings.API_IDEMPOTENCY_KEY_TTL,
+    )
+
+
+def active_idempotency_keys(user, key: str) -> QuerySet:
+    """
+    Действующий ключ идемпотентности пользователя.
+
+    :param user: Пользователь запроса.
+    :param key: Значение заголовка Idempotency-Key.
+    """
+    return CashFlowIdempotencyKey.objects.filter(
+        user=user,
+        key=key,
+        created_at__gte=idempotency_keys_expire_before(),
+    )
+
+
+def apply_bulk(
+    plan: BulkPlan,
+    response: dict[str, Any],
+    user=None,
+    idempotency_key: str | None = None,
+    body_hash: str = "",
+) -> CashFlowIdempotencyKey | None:
+    """
+    Запись пачки в одной транзакции: bulk_create, bulk_update, DELETE.
+
+    Ключ идемпотентности сохраняется в той же транзакции, поэтому ответ
+    сохраняется тогда и только тогда, когда записаны данные.
+
+    :param plan: Проверенная пачка.
+    :param response: Тело ответа на запрос.
+    :param user: Пользователь запроса (владелец ключа идемпотентности).
+    :param idempotency_key: Ключ идемпотентности.
+    :param body_hash: Хэш тела запроса.
+
+    :return: Ранее сохраненный ключ, если запрос с этим ключом уже
+        выполнен (данные при этом не записываются), иначе None.
+    """
+    batch_size = settings.API_BULK_BATCH_SIZE
+    try:
+        with transaction.atomic():
+            if idempotency_key:
+                # Устаревший ключ не повторяется - место занимает новый
+                CashFlowIdempotencyKey.objects.filter(
+                    user=user,
+                    key=idempotency_key,
+                    created_at__lt=idempotency_keys_expire_before(),
+                ).delete()
+                CashFlowIdempotencyKey.objects.create(
+                    user=user,
+                    key=idempotency_key,
+                    request_hash=body_hash,
+                    status_code=200,
+                    response=response,
+                )
+            if plan.creates:
+                CashFlow.objects.bulk_create(
+                    plan.creates,
+                    batch_size=batch_size,
+                )
+            if plan.updates:
+                CashFlow.objects.bulk_update(
+                    plan.updates,
+                    fields=sorted(plan.update_fields),
+                    batch_size=batch_size,
+                )
+            if plan.deletes:
+                CashFlow.objects.filter(pk__in=plan.deletes).delete()
+            mark_cash_flows_changed()
+    except IntegrityError:
+        # Параллельный запрос с тем же ключом успел записать первым
+        if idempotency_key and (
+            stored := active_idempotency_keys(user, idempotency_key).first()
+        ):
+            return stored
+        raise
+
+    return None
+
+
+def _plan_item(
+    item: Any,
+    existing: dict[UUID, CashFlow],
+    snapshot: TaxonomySnapshot,
+    seen: set[UUID],
+    plan: BulkPlan,
+) -> dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValidationError("Ожидается JSON-объект.")
+
+    action = item.get("action")
+    if action not in BULK_ACTIONS:
+        raise ValidationError(
+            {"action": [f"Допустимо: {', '.join(BULK_ACTIONS)}."]},
+        )
+
+    if action == BULK_ACTION_CREATE:
+        cash_flow, _ = build_cash_flow(item.get("data"), snapshot)
+        plan.creates.append(cash_flow)
+        return {"action": action, "id": cash_flow.id}
+
+    try:
+        pk = UUID(str(item.get("id")))
+    except ValueError:
+        raise ValidationError({"id": ["Ожидается UUID."]})
+    if pk not in existing:
+        raise ValidationError({"id": ["ДДС не найдено."]})
+    if pk in seen:
+        raise ValidationError({"id": ["ДДС уже изменяется в этом запросе."]})
+    seen.add(pk)
+
+    if action == BULK_ACTION_DELETE:
+        plan.deletes.append(pk)
+        return {"action": action, "id": pk}
+
+    cash_flow, changed = build_cash_flow(
+        item.get("data"),
+        snapshot,
+        instance=existing[pk],
+    )
+    if changed:
+        plan.updates.append(cash_flow)
+        plan.update_fields.update(changed)
+    return {"action": action, "id": pk}
@@ -0,0 +1,66 @@
+from collections import Counter
+from threading import Lock
+from typing import Any
+
+from django.core.cache import cache
+
+from .metrics import CACHE_LOOKUPS
+
+# Счетчики попаданий/промахов кэша по областям (отчеты, списки, подсказки)
+# текущего worker-процесса
+_hits: Counter[str] = Counter()
+_misses: Counter[str] = Counter()
+_lock = Lock()
+
+
+def record_cache_lookup(namespace: str, hit: bool) -> None:
+    """
+    Учет обращения к кэшу.
+
+    :param namespace: Область кэша.
+    :param hit: True - значение найдено.
+    """
+    with _lock:
+        (_hits if hit else _misses)[namespace] += 1
+    CACHE_LOOKUPS.labels(namespace, "hit" if hit else "miss").inc()
+
+
+def cache_get(namespace: str, key: str) -> Any:
+    """
+    Значение из Django cache с учетом попадания/промаха.
+
+    :param namespace: Область кэша.
+    :param key: Ключ.
+
+    :return: Значение или None (промах).
+    """
+    value = cache.get(key)
+    record_cache_lookup(namespace, value is not None)
+    return value
+
+
+async def acache_get(namespace: str, key: str) -> Any:
+    value = await cache.aget(key)
+    record_cache_lookup(namespace, value is not None)
+    return value
+
+
+def cache_stats() -> dict[str, dict]:
+    """
+    Попадания, промахи и доля попаданий по областям кэша с запуска
+    worker-процесса.
+
+    :return: Область -> {hits, misses, hit_rate}.
+    """
+    with _lock:
+        hits, misses = _hits.copy(), _misses.copy()
+
+    stats = {}
+    for namespace in sorted(hits.keys() | misses.keys()):
+        total = hits[namespace] + misses[namespace]
+        stats[namespace] = {
+            "hits": hits[namespace],
+            "misses": misses[namespace],
+            "hit_rate": round(hits[namespace] / total, 4),
+        }
+    return stats
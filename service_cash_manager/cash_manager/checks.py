@@ -0,0 +1,49 @@
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+# LC_CTYPE, при котором pg_trgm не считает кириллицу буквами
+C_CTYPES = frozenset({"C", "POSIX"})
+
+
+def database_ctype(alias: str) -> str | None:
+    """
+    LC_CTYPE базы данных (pg_database.datctype).
+
+    :param alias: Алиас БД из настроек.
+
+    :return: LC_CTYPE или None - БД не Postgres.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT datctype FROM pg_database"
+            " WHERE datname = current_database()",
+        )
+        return cursor.fetchone()[0]
+
+
+@register(Tags.database)
+def check_database_ctype(app_configs, databases=None, **kwargs):
+    """
+    Предупреждение о БД с LC_CTYPE=C: триграммы (pg_trgm) строятся только по
+    латинице и цифрам, поэтому нечеткий поиск по кириллице (комментарии,
+    наименования) ничего не находит. --lc-ctype в POSTGRES_INITDB_ARGS
+    действует только при создании volume.
+    """
+    warnings = []
+    for alias in databases or ():
+        ctype = database_ctype(alias)
+        if ctype in C_CTYPES:
+            warnings.append(
+                Warning(
+                    f"Database '{alias}' has LC_CTYPE={ctype}: pg_trgm "
+                    f"ignores non-ASCII letters, fuzzy search over Cyrillic "
+                    f"comments finds nothing.",
+                    hint="Recreate the database (volume pg_db_data) with "
+                    "--lc-ctype=C.UTF-8, see Readme.",
+                    id="cash_manager.W001",
+                ),
+            )
+    return warnings
@@ -0,0 +1,109 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
+
+CASH_FLOW_VERSION_KEY = "cash_manager:cash_flow:version"
+CASH_FLOW_VERSION_SEQUENCE = "cash_manager.cash_flow_version_seq"
+
+
+class DataVersion:
+    """
+    Версия данных (watermark) для ключей кэша.
+
+    Источник версии - sequence Postgres: значения монотонны, не теряются и
+    не повторяются. В Django cache лежит копия последнего значения, чтобы
+    не обращаться к БД при каждом чтении. Если копия вытеснена (MAX_ENTRIES
+    file-кэша, перезапуск Redis), версия перечитывается из sequence, а не
+    начинается с 0 - ключи со старыми версиями не переиспользуются.
+    """
+
+    def __init__(self, key: str, sequence: str) -> None:
+        """
+        :param key: Ключ копии версии в Django cache.
+        :param sequence: Sequence Postgres (schema.name).
+        """
+        self.key = key
+        self.sequence = sequence
+
+    def get(self) -> int:
+        """
+        Текущая версия.
+
+        :return: Версия (0 - bump еще не вызывался).
+        """
+        version = cache.get(self.key)
+        if version is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT coalesce(pg_sequence_last_value(%s::regclass), 0)",
+                    [self.sequence],
+                )
+                version = cursor.fetchone()[0]
+            # add, а не set: не затирает версию, записанную bump
+            # после чтения sequence
+            if not cache.add(self.key, version, timeout=None):
+                version = cache.get(self.key, version)
+        return version
+
+    async def aget(self) -> int:
+        version = await cache.aget(self.key)
+        if version is None:
+            version = await sync_to_async(self.get)()
+        return version
+
+    def bump(self) -> int:
+        """
+        Новая версия: следующее значение sequence (атомарно для всех
+        процессов и хостов), копия в кэше перезаписывается.
+
+        :return: Версия.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT nextval(%s::regclass)", [self.sequence])
+            version = cursor.fetchone()[0]
+        cache.set(self.key, version, timeout=None)
+        return version
+
+    async def abump(self) -> int:
+        return await sync_to_async(self.bump)()
+
+
+CASH_FLOW_VERSION = DataVersion(
+    CASH_FLOW_VERSION_KEY,
+    CASH_FLOW_VERSION_SEQUENCE,
+)
+
+
+def cash_flow_version() -> int:
+    """
+    Версия данных ДДС (watermark).
+
+    Увеличивается после каждой зафиксированной записи ДДС; входит в ключи
+    кэша отчетов, поэтому запись делает закэшированные отчеты неактуальными.
+
+    :return: Версия.
+    """
+    return CASH_FLOW_VERSION.get()
+
+
+async def acash_flow_version() -> int:
+    return await CASH_FLOW_VERSION.aget()
+
+
+def bump_cash_flow_version() -> None:
+    """Увеличение версии данных ДДС."""
+    CASH_FLOW_VERSION.bump()
+
+
+async def abump_cash_flow_version() -> None:
+    await CASH_FLOW_VERSION.abump()
+
+
+def mark_cash_flows_changed() -> None:
+    """
+    Увеличение версии данных ДДС после фиксации текущей транзакции.
+
+    Вызывается путями массовой записи, которые не отправляют сигналы
+    моделей (COPY, bulk_create/bulk_update, QuerySet.delete).
+    """
+    transaction.on_commit(bump_cash_flow_version)
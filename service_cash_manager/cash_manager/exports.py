@@ -0,0 +1,104 @@
+import csv
+from collections.abc import AsyncIterator, Iterator
+
+from .taxonomy import TaxonomySnapshot
+
+EXPORT_CHUNK_SIZE = 2000
+CSV_HEADER = (
+    "ID",
+    "Дата создания",
+    "Статус",
+    "Тип",
+    "Категория",
+    "Подкатегория",
+    "Сумма",
+    "Комментарий",
+)
+# Начало ячейки, с которого Excel/LibreOffice читают формулу
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@")
+CSV_FIELDS = (
+    "id",
+    "created_at",
+    "status_id",
+    "type_id",
+    "category_id",
+    "subcategory_id",
+    "amount",
+    "comment",
+)
+
+
+class Echo:
+    """Псевдо-буфер для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class CashFlowCSVExporter:
+    """
+    Потоковая выгрузка ДДС в CSV.
+
+    Строки читаются из БД чанками через server-side cursor
+    (QuerySet.iterator / aiterator), наименования справочников берутся из
+    снимка taxonomy, поэтому память не зависит от объема выгрузки.
+
+    Текстовые ячейки, начинающиеся с символа формулы (=, +, -, @),
+    выгружаются с префиксом "'": табличный редактор не выполнит их как
+    формулу (CSV injection).
+    """
+
+    def __init__(
+        self,
+        queryset,
+        snapshot: TaxonomySnapshot,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> None:
+        # values(), а не values_list(): итератор values_list выполняет запрос
+        # при создании, что в aiterator() происходит вне sync-потока
+        self.queryset = queryset.values(*CSV_FIELDS)
+        self.snapshot = snapshot
+        self.chunk_size = chunk_size
+        self.writer = csv.writer(Echo())
+
+    def __iter__(self) -> Iterator[str]:
+        yield self._header()
+        for row in self.queryset.iterator(chunk_size=self.chunk_size):
+            yield self._row(row)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        yield self._header()
+        async for row in self.queryset.aiterator(chunk_size=self.chunk_size):
+            yield self._row(row)
+
+    def _header(self) -> str:
+        # BOM - чтобы Excel открывал UTF-8 CSV без смены кодировки
+        return "\ufeff" + self.writer.writerow(CSV_HEADER)
+
+    def _row(self, row: dict) -> str:
+        return self.writer.writerow(
+            (
+                row["id"],
+                row["created_at"].isoformat(),
+                self._title(self.snapshot.statuses, row["status_id"]),
+                self._title(self.snapshot.types, row["type_id"]),
+                self._title(self.snapshot.categories, row["category_id"]),
+                self._title(
+                    self.snapshot.subcategories,
+                    row["subcategory_id"],
+                ),
+                row["amount"],
+                self._text(row["comment"] or ""),
+            )
+        )
+
+    @classmethod
+    def _title(cls, items: dict, item_id) -> str:
+        item = items.get(item_id)
+        return cls._text(item.title) if item else ""
+
+    @staticmethod
+    def _text(value: str) -> str:
+        if value.startswith(CSV_FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
@@ -0,0 +1,273 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, TextIO
+from uuid import uuid4
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .data_version import mark_cash_flows_changed
+from .models import CashFlow
+from .taxonomy import TaxonomySnapshot
+
+IMPORT_FORMAT_CSV = "csv"
+IMPORT_FORMAT_JSONL = "jsonl"
+IMPORT_FORMATS = (IMPORT_FORMAT_CSV, IMPORT_FORMAT_JSONL)
+COPY_COLUMNS = (
+    "id",
+    "created_at",
+    "status_id",
+    "type_id",
+    "category_id",
+    "subcategory_id",
+    "amount",
+    "comment",
+)
+
+
+@dataclass
+class ImportReject:
+    """Отклоненная строка файла импорта."""
+
+    line: int
+    error: str
+    raw: str
+
+
+@dataclass
+class ImportResult:
+    """Итог импорта ДДС."""
+
+    imported: int = 0
+    rejects: list[ImportReject] = field(default_factory=list)
+
+
+class CashFlowImporter:
+    """
+    Массовый импорт ДДС из CSV/JSONL через PostgreSQL COPY FROM STDIN.
+
+    Наименования справочников переводятся в ID по словарям, собранным один
+    раз из снимка taxonomy. Строки проверяются теми же валидаторами, что и
+    поля модели CashFlow, и бизнес-правилами связанности справочников;
+    некорректные строки не прерывают импорт, а попадают в rejects с
+    номером строки файла.
+    """
+
+    def __init__(
+        self,
+        snapshot: TaxonomySnapshot,
+        reject_writer: Any | None = None,
+    ) -> None:
+        """
+        :param snapshot: Снимок справочников ДДС.
+        :param reject_writer: csv.writer для записи отклоненных строк.
+        """
+        self.snapshot = snapshot
+        self.reject_writer = reject_writer
+
+        self.statuses = self._ids_by_title(snapshot.statuses)
+        self.types = self._ids_by_title(snapshot.types)
+        self.categories = self._ids_by_title(snapshot.categories)
+        self.subcategories = self._ids_by_title(snapshot.subcategories)
+
+        opts = CashFlow._meta
+        self.amount_field = opts.get_field("amount")
+        self.comment_field = opts.get_field("comment")
+
+    def run(self, file: TextIO, file_format: str) -> ImportResult:
+        """
+        Импорт файла одной командой COPY в одной транзакции.
+
+        :param file: Текстовый файл (CSV с заголовком или JSONL).
+        :param file_format: Формат файла: csv | jsonl.
+
+        :return: Итог импорта.
+        """
+        result = ImportResult()
+        if self.reject_writer:
+            self.reject_writer.writerow(("line", "error", "raw"))
+
+        columns = ", ".join(COPY_COLUMNS)
+        with transaction.atomic(), connection.cursor() as cursor:
+            with cursor.copy(
+                f"COPY cash_manager.cash_flow ({columns}) FROM STDIN"
+            ) as copy:
+                for row in self.iter_rows(
+                    self.parse(file, file_format),
+                    result,
+                ):
+                    copy.write_row(row)
+                    result.imported += 1
+            mark_cash_flows_changed()
+
+        return result
+
+    def iter_rows(
+        self,
+        records: Iterable[tuple[int, dict | None, str]],
+        result: ImportResult,
+    ) -> Iterator[tuple]:
+        """
+        Проверка записей файла и преобразование в строки для COPY.
+
+        :param records: (номер строки, запись, исходная строка).
+        :param result: Итог импорта (накапливает rejects).
+
+        :return: Итератор строк для COPY.
+        """
+        today = timezone.localdate()
+        for line, record, raw in records:
+            try:
+                if record is None:
+                    raise ValidationError("Некорректный формат строки.")
+                yield self.to_row(record, today)
+            except ValidationError as ex:
+                reject = ImportReject(line, "; ".join(ex.messages), raw)
+                result.rejects.append(reject)
+                if self.reject_writer:
+                    self.reject_writer.writerow(
+                        (reject.line, reject.error, reject.raw),
+                    )
+
+    def to_row(self, record: dict, today: date) -> tuple:
+        """
+        Проверка записи и преобразование в строку для COPY.
+
+        Сумма проверяется построчно (amount_field.clean - валидаторы
+        max_digits/decimal_places модели), а не отдельным проходом по
+        колонке: записи идут в COPY потоком, проход по колонке потребовал бы
+        держать файл в памяти и выполнял бы те же Decimal-преобразования.
+        Ошибка суммы отклоняет только свою строку.
+
+        :param record: Запись файла импорта.
+        :param today: Дата создания по умолчанию.
+
+        :raises ValidationError: Запись не прошла проверку.
+
+        :return: Значения колонок COPY_COLUMNS.
+        """
+        status_id = self._resolve(self.statuses, record, "status")
+        type_id = self._resolve(self.types, record, "type")
+        # Категория и подкатегория необязательны (NULL), как в модели
+        category_id = self._resolve(
+            self.categories,
+            record,
+            "category",
+            required=False,
+        )
+        subcategory_id = self._resolve(
+            self.subcategories,
+            record,
+            "subcategory",
+            required=False,
+        )
+
+        if category_id and category_id not in (
+            self.snapshot.categories_by_type.get(type_id, ())
+        ):
+            raise ValidationError("Категория не относится к выбранному типу.")
+        if subcategory_id and subcategory_id not in (
+            self.snapshot.subcategories_by_category.get(category_id, ())
+        ):
+            raise ValidationError(
+                "Подкатегория не связана с выбранной категорией."
+            )
+
+        amount = self.amount_field.clean(record.get("amount"), None)
+        comment = record.get("comment") or None
+        if comment is not None:
+            comment = self.comment_field.clean(comment, None)
+
+        created_at = today
+        if raw_created_at := record.get("created_at"):
+            try:
+                created_at = parse_date(str(raw_created_at))
+            except ValueError:
+                created_at = None
+            if created_at is None:
+                raise ValidationError(
+                    f"Некорректная дата: {raw_created_at}."
+                )
+
+        return (
+            uuid4(),
+            created_at,
+            status_id,
+            type_id,
+            category_id,
+            subcategory_id,
+            amount,
+            comment,
+        )
+
+    @staticmethod
+    def parse(
+        file: TextIO,
+        file_format: str,
+    ) -> Iterator[tuple[int, dict | None, str]]:
+        """
+        Чтение записей файла импорта.
+
+        :param file: Текстовый файл.
+        :param file_format: Формат файла: csv | jsonl.
+
+        :return: Итератор (номер строки, запись или None, исходная строка).
+        """
+        if file_format == IMPORT_FORMAT_JSONL:
+            for line, raw in enumerate(file, start=1):
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    record = None
+                yield line, record if isinstance(record, dict) else None, raw
+            return
+
+        reader = csv.DictReader(file)
+        for record in reader:
+            yield (
+                reader.line_num,
+                record,
+                json.dumps(record, ensure_ascii=False),
+            )
+
+    @staticmethod
+    def _resolve(
+        ids_by_title: dict,
+        record: dict,
+        name: str,
+        required: bool = True,
+    ):
+        """
+        ID справочника по наименованию из записи.
+
+        :raises ValidationError: Значение не строка, не заполнено
+            (required) или неизвестно.
+
+        :return: ID или None (не заполнено, not required).
+        """
+        title = record.get(name)
+        if title is not None and not isinstance(title, str):
+            raise ValidationError(
+                f"Некорректное значение {name}: ожидается строка."
+            )
+        title = (title or "").strip()
+        if not title:
+            if not required:
+                return None
+            raise ValidationError(f"Не заполнено поле {name}.")
+        try:
+            return ids_by_title[title]
+        except KeyError:
+            raise ValidationError(f"Неизвестное значение {name}: {title}.")
+
+    @staticmethod
+    def _ids_by_title(items: dict) -> dict:
+        return {item.title: item.id for item in items.values()}
@@ -0,0 +1,128 @@
+import hashlib
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger("cash_manager.performance")
+
+# Профиль текущего запроса (None - запрос не профилируется)
+_profile: ContextVar["RequestProfile | None"] = ContextVar(
+    "cash_manager_request_profile",
+    default=None,
+)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|\$\d+")
+_VALUES_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Отпечаток SQL: значения и параметры заменены на ?, списки значений
+    (IN, VALUES) свернуты, пробелы нормализованы - запросы, отличающиеся
+    только параметрами (N+1), получают один отпечаток.
+
+    :param sql: SQL.
+
+    :return: Нормализованный SQL.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _VALUES_LIST_RE.sub("(?+)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint_id(value: str) -> str:
+    return hashlib.sha1(value.encode()).hexdigest()[:12]
+
+
+@dataclass
+class RequestProfile:
+    """SQL-запросы одного HTTP-запроса: кол-во, время, повторы."""
+
+    queries: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    fingerprints: Counter = field(default_factory=Counter)
+
+    @property
+    def duplicate_queries(self) -> int:
+        """Повторы запросов с теми же SQL и параметрами."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def repeated_fingerprints(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Отпечатки, выполненные не менее threshold раз (признак N+1).
+
+        :param threshold: Мин. кол-во выполнений.
+
+        :return: [(отпечаток, кол-во), ...] по убыванию кол-ва.
+        """
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+@contextmanager
+def profile_request():
+    """Профилирование SQL-запросов участка кода (HTTP-запроса)."""
+    profile = RequestProfile()
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """
+    Execute-wrapper соединения с БД: учет запроса в профиле текущего
+    HTTP-запроса и запись медленных запросов в лог.
+
+    Вне profile_request() - только проверка ContextVar.
+    """
+    profile = _profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        sql_fingerprint = fingerprint(sql)
+        profile.queries += 1
+        profile.db_time += duration
+        profile.statements[(sql, repr(params))] += 1
+        profile.fingerprints[sql_fingerprint] += 1
+
+        if duration * 1000 >= settings.PERFORMANCE_SLOW_QUERY_MS:
+            logger.warning(
+                "slow query duration_ms=%.1f fingerprint_id=%s sql=%s",
+                duration * 1000,
+                fingerprint_id(sql_fingerprint),
+                sql_fingerprint,
+                extra={
+                    "duration_ms": round(duration * 1000, 1),
+                    "fingerprint_id": fingerprint_id(sql_fingerprint),
+                    "fingerprint": sql_fingerprint,
+                    "database": context["connection"].alias,
+                },
+            )
+
+
+def install_query_wrapper(connection) -> None:
+    """Подключение query_wrapper к соединению (однократно)."""
+    if query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_wrapper)
@@ -0,0 +1,391 @@
+import io
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from cash_manager.admin_changelist import EXACT_COUNT_VAR, estimate_count
+from cash_manager.imports import IMPORT_FORMAT_JSONL, CashFlowImporter
+from cash_manager.models import CashFlow
+from cash_manager.taxonomy import taxonomy
+
+# Индекс колонки amount в CashFlowAdmin.list_display (параметр o, с 1)
+AMOUNT_ORDER_COLUMN = 6
+DUMMY_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+BENCHMARK_SCHEMA_VERSION = 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк AdminPanel ДДС: p50/p95 и кол-во SQL-запросов списка, "
+        "каждого фильтра, периода и сортировки по сумме, а также скорость "
+        "импорта (COPY). Результат - JSON для сравнения между коммитами."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=30,
+            help="Число замеров на сценарий",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Число прогревочных запросов на сценарий",
+        )
+        parser.add_argument(
+            "--bulk-rows",
+            type=int,
+            default=10_000,
+            help="Строк в одном импорте (0 - без замера импорта)",
+        )
+        parser.add_argument(
+            "--bulk-iterations",
+            type=int,
+            default=3,
+            help="Число замеров импорта (транзакция откатывается)",
+        )
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            help="Только указанные сценарии (можно несколько раз)",
+        )
+        parser.add_argument(
+            "--with-cache",
+            action="store_true",
+            help="Не отключать Django cache (по умолчанию - DummyCache: "
+                 "замеряются запросы к БД, а не попадания в кэш)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Seed выбора значений фильтров",
+        )
+        parser.add_argument(
+            "--output",
+            help="Файл для JSON-результата (по умолчанию - stdout)",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON-результат предыдущего запуска для сравнения p50",
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help="С --baseline: ошибка, если p50 сценария вырос больше, "
+                 "чем на указанный процент",
+        )
+
+    def handle(self, *args, **options):
+        iterations: int = options["iterations"]
+        warmup: int = options["warmup"]
+        if iterations < 1 or warmup < 0 or options["bulk_rows"] < 0:
+            raise CommandError(
+                "--iterations must be >= 1, --warmup and --bulk-rows >= 0"
+            )
+        if connections["default"].vendor != "postgresql":
+            raise CommandError("Benchmark requires a PostgreSQL database")
+
+        user = get_user_model().objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Benchmark requires a superuser")
+        if not CashFlow.objects.exists():
+            raise CommandError("No cash flows to benchmark")
+
+        rng = random.Random(options["seed"])
+        scenarios = self._scenarios(rng)
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) - scenarios.keys()
+            if unknown:
+                raise CommandError(
+                    f"Unknown scenarios: {', '.join(sorted(unknown))}; "
+                    f"available: {', '.join(scenarios)}"
+                )
+            scenarios = {
+                name: params
+                for name, params in scenarios.items()
+                if name in options["scenarios"]
+            }
+
+        with ExitStack() as stack:
+            stack.enter_context(
+                override_settings(ALLOWED_HOSTS=["testserver"]),
+            )
+            if not options["with_cache"]:
+                stack.enter_context(override_settings(CACHES=DUMMY_CACHES))
+
+            client = Client()
+            client.force_login(user)
+            url = reverse("admin:cash_manager_cashflow_changelist")
+            results = {
+                name: self._measure_view(
+                    client,
+                    url,
+                    params,
+                    iterations,
+                    warmup,
+                )
+                for name, params in scenarios.items()
+            }
+            if options["bulk_rows"] and not options["scenarios"]:
+                results["bulk_import"] = self._measure_import(
+                    rng,
+                    options["bulk_rows"],
+                    options["bulk_iterations"],
+                )
+
+        report = {
+            "schema": BENCHMARK_SCHEMA_VERSION,
+            "meta": self._meta(options),
+            "results": results,
+        }
+        body = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(body + "\n")
+        else:
+            self.stdout.write(body)
+
+        if options["baseline"]:
+            self._compare(
+                results,
+                options["baseline"],
+                options["max_regression"],
+            )
+
+    @staticmethod
+    def _scenarios(rng: random.Random) -> dict[str, Callable[[], dict]]:
+        """
+        Сценарии: имя -> функция GET-параметров списка для очередного
+        запроса (значения фильтров выбираются rng из справочников).
+        """
+        snapshot = taxonomy.snapshot
+        first_day, last_day = (
+            CashFlow.objects.order_by("created_at")
+            .values_list("created_at", flat=True)
+            .first(),
+            CashFlow.objects.order_by("-created_at")
+            .values_list("created_at", flat=True)
+            .first(),
+        )
+        span = max((last_day - first_day).days, 1)
+        comments = list(
+            CashFlow.objects.exclude(comment=None)
+            .values_list("comment", flat=True)[:200]
+        ) or ["оплата"]
+
+        def reference(kind: str) -> Callable[[], dict]:
+            ids = [str(item_id) for item_id in snapshot.items(kind)]
+            return lambda: {kind: rng.choice(ids)} if ids else {}
+
+        def date_range() -> dict:
+            start = first_day + timedelta(days=rng.randrange(span))
+            end = min(start + timedelta(days=30), last_day)
+            return {
+                "created_at__range__gte": start.isoformat(),
+                "created_at__range__lte": end.isoformat(),
+            }
+
+        def comment() -> dict:
+            words = rng.choice(comments).split()
+            return {"comment": rng.choice(words)}
+
+        return {
+            "changelist": lambda: {},
+            "changelist_exact_count": lambda: {EXACT_COUNT_VAR: 1},
+            "filter_status": reference("status"),
+            "filter_type": reference("type"),
+            "filter_category": reference("category"),
+            "filter_subcategory": reference("subcategory"),
+            "filter_comment": comment,
+            "filter_date_range": date_range,
+            "sort_amount_desc": lambda: {"o": f"-{AMOUNT_ORDER_COLUMN}"},
+        }
+
+    @staticmethod
+    def _measure_view(
+        client: Client,
+        url: str,
+        params: Callable[[], dict],
+        iterations: int,
+        warmup: int,
+    ) -> dict:
+        for _ in range(warmup):
+            client.get(url, params())
+
+        timings, queries = [], []
+        for _ in range(iterations):
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(
+                        CaptureQueriesContext(connections[alias]),
+                    )
+                    for alias in connections
+                ]
+                started = time.perf_counter()
+                response = client.get(url, params())
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{url} returned {response.status_code}")
+            queries.append(sum(len(context) for context in captured))
+
+        return {
+            **_latency(timings),
+            "queries": max(queries),
+            "iterations": iterations,
+        }
+
+    @staticmethod
+    def _measure_import(
+        rng: random.Random,
+        rows: int,
+        iterations: int,
+    ) -> dict:
+        """
+        Скорость импорта JSONL (COPY). Транзакция каждого замера
+        откатывается - данные не меняются.
+        """
+        snapshot = taxonomy.snapshot
+        chains = [
+            (type_id, category_id, subcategory_id)
+            for type_id in snapshot.types
+            for category_id in snapshot.categories_by_type.get(type_id, ())
+            for subcategory_id in snapshot.subcategories_by_category.get(
+                category_id,
+                (),
+            )
+        ]
+        if not chains or not snapshot.statuses:
+            raise CommandError("No valid type/category/subcategory chains")
+        statuses = list(snapshot.statuses)
+        today = date.today()
+
+        lines = []
+        for n in range(rows):
+            type_id, category_id, subcategory_id = rng.choice(chains)
+            lines.append(json.dumps({
+                "created_at": (
+                    today - timedelta(days=rng.randrange(365))
+                ).isoformat(),
+                "status": snapshot.statuses[rng.choice(statuses)].title,
+                "type": snapshot.types[type_id].title,
+                "category": snapshot.categories[category_id].title,
+                "subcategory": snapshot.subcategories[subcategory_id].title,
+                "amount": f"{rng.uniform(1, 100_000):.2f}",
+                "comment": f"Бенчмарк импорта {n}",
+            }, ensure_ascii=False))
+        payload = "\n".join(lines)
+
+        timings = []
+        for _ in range(iterations):
+            with transaction.atomic():
+                started = time.perf_counter()
+                result = CashFlowImporter(snapshot).run(
+                    io.StringIO(payload),
+                    IMPORT_FORMAT_JSONL,
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+                transaction.set_rollback(True)
+            if result.rejects:
+                raise CommandError(
+                    f"Import rejected rows: {result.rejects[0].error}"
+                )
+
+        return {
+            **_latency(timings),
+            "rows": rows,
+            "rows_per_second": round(
+                rows / (statistics.median(timings) / 1000),
+            ),
+            "iterations": iterations,
+        }
+
+    @staticmethod
+    def _meta(options: dict) -> dict:
+        connection = connections["default"]
+        connection.ensure_connection()
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "postgres": connection.pg_version,
+            "cash_flow_rows": estimate_count(CashFlow.objects.all()),
+            "cache": "enabled" if options["with_cache"] else "disabled",
+            "seed": options["seed"],
+        }
+
+    def _compare(
+        self,
+        results: dict,
+        baseline_path: str,
+        max_regression: float | None,
+    ) -> None:
+        with open(baseline_path, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+        regressions = []
+        self.stderr.write(
+            f"{'scenario':<26}{'p50 base':>10}{'p50 now':>10}"
+            f"{'change':>9}{'queries':>10}"
+        )
+        for name, now in results.items():
+            if name not in baseline:
+                continue
+            base = baseline[name]
+            change = (now["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100
+            queries = (
+                f"{base.get('queries', '-')}->{now.get('queries', '-')}"
+            )
+            self.stderr.write(
+                f"{name:<26}{base['p50_ms']:>10.1f}{now['p50_ms']:>10.1f}"
+                f"{change:>+8.1f}%{queries:>10}"
+            )
+            if max_regression is not None and change > max_regression:
+                regressions.append(name)
+
+        if regressions:
+            raise CommandError(
+                f"p50 regression over {max_regression}%: "
+                f"{', '.join(regressions)}"
+            )
+
+
+def _latency(timings: list[float]) -> dict:
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(
+            statistics.quantiles(timings, n=20)[-1]
+            if len(timings) > 1
+            else timings[0],
+            3,
+        ),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
@@ -0,0 +1,243 @@
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from cash_manager.admin_changelist import seek_condition
+from cash_manager.models import (
+    CashFlow,
+    CashFlowCategory,
+    CashFlowCategoryBySubcategory,
+    CashFlowCategoryByType,
+    CashFlowStatus,
+    CashFlowSubCategory,
+    CashFlowType,
+)
+
+# Варианты драйвера: до (client-side binding, как psycopg2) и после
+# (server-side binding и prepared statements psycopg3)
+BENCHMARK_VARIANTS = {
+    "client_binding": {
+        "server_side_binding": False,
+        "prepare_threshold": None,
+    },
+    "server_binding": {
+        "server_side_binding": True,
+    },
+}
+# Сортировка списка ДДС в AdminPanel (ordering + "-pk" от ChangeList)
+CHANGELIST_ORDERING = ("amount", "created_at", "-pk")
+CHANGELIST_KEYSET = [("amount", False), ("created_at", False), ("pk", True)]
+CHANGELIST_RELATED = ("status", "type", "category", "subcategory")
+PAGE_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Задержка горячих запросов (список ДДС, фильтры, справочники) при "
+        "client-side и server-side binding psycopg3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="Число замеров на запрос",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="Число прогревочных выполнений на запрос",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="Алиас БД, настройки которой берутся за основу",
+        )
+
+    def handle(self, *args, **options):
+        iterations: int = options["iterations"]
+        warmup: int = options["warmup"]
+        if iterations < 1 or warmup < 0:
+            raise CommandError("--iterations must be >= 1, --warmup >= 0")
+
+        base = connections[options["database"]].settings_dict
+        if base["ENGINE"] != "django.db.backends.postgresql":
+            raise CommandError("Benchmark requires a PostgreSQL database")
+
+        samples = self._samples(options["database"])
+        if not samples["cash_flows"]:
+            raise CommandError("No cash flows to benchmark")
+
+        results: dict[str, dict[str, list[float]]] = {}
+        for variant, driver_options in BENCHMARK_VARIANTS.items():
+            alias = f"benchmark_{variant}"
+            connections.settings[alias] = {
+                **base,
+                # Без пула: у каждого варианта одно свое соединение
+                "OPTIONS": {
+                    **{
+                        key: value
+                        for key, value in base["OPTIONS"].items()
+                        if key != "pool"
+                    },
+                    **driver_options,
+                },
+                "CONN_MAX_AGE": None,
+            }
+            try:
+                results[variant] = {
+                    name: self._measure(
+                        lambda: query(alias),
+                        iterations,
+                        warmup,
+                    )
+                    for name, query in self._queries(samples).items()
+                }
+            finally:
+                connections[alias].close()
+                del connections[alias]
+                del connections.settings[alias]
+
+        self._report(results)
+
+    @staticmethod
+    def _samples(database: str) -> dict[str, list]:
+        cash_flows = list(
+            CashFlow.objects.using(database)
+            .order_by("-created_at")
+            .values_list(
+                "id",
+                "amount",
+                "created_at",
+                "status_id",
+                "category_id",
+            )[:1000]
+        )
+        return {
+            "cash_flows": cash_flows,
+            "statuses": list(
+                CashFlowStatus.objects.using(database).values_list(
+                    "id",
+                    flat=True,
+                ),
+            ),
+        }
+
+    @staticmethod
+    def _queries(samples: dict[str, list]) -> dict[str, Callable[[str], list]]:
+        cash_flows = samples["cash_flows"]
+        statuses = samples["statuses"]
+
+        def changelist(alias: str) -> list:
+            return list(
+                CashFlow.objects.using(alias)
+                .select_related(*CHANGELIST_RELATED)
+                .order_by(*CHANGELIST_ORDERING)[:PAGE_SIZE]
+            )
+
+        def changelist_keyset(alias: str) -> list:
+            pk, amount, created_at, *_ = random.choice(cash_flows)
+            return list(
+                CashFlow.objects.using(alias)
+                .select_related(*CHANGELIST_RELATED)
+                .filter(
+                    seek_condition(CHANGELIST_KEYSET, [amount, created_at, pk]),
+                )
+                .order_by(*CHANGELIST_ORDERING)[:PAGE_SIZE]
+            )
+
+        def changelist_filters(alias: str) -> list:
+            _, _, created_at, status_id, category_id = random.choice(
+                cash_flows,
+            )
+            queryset = CashFlow.objects.using(alias).filter(
+                created_at__lte=created_at,
+                status_id__in=[status_id, random.choice(statuses)],
+            )
+            if category_id:
+                queryset = queryset.filter(category_id=category_id)
+            return list(
+                queryset.select_related(*CHANGELIST_RELATED)
+                .order_by(*CHANGELIST_ORDERING)[:PAGE_SIZE]
+            )
+
+        def detail(alias: str) -> list:
+            return list(
+                CashFlow.objects.using(alias).filter(
+                    pk=random.choice(cash_flows)[0],
+                ),
+            )
+
+        def titles(alias: str) -> list:
+            rows = []
+            for model in (
+                CashFlowStatus,
+                CashFlowType,
+                CashFlowCategory,
+                CashFlowSubCategory,
+            ):
+                rows += model.objects.using(alias).values_list(
+                    "id",
+                    "title",
+                    "alias",
+                )
+            rows += CashFlowCategoryByType.objects.using(alias).values_list(
+                "type_id",
+                "category_id",
+            )
+            rows += CashFlowCategoryBySubcategory.objects.using(
+                alias,
+            ).values_list("category_id", "subcategory_id")
+            return rows
+
+        return {
+            "changelist": changelist,
+            "changelist_keyset": changelist_keyset,
+            "changelist_filters": changelist_filters,
+            "detail": detail,
+            "titles": titles,
+        }
+
+    @staticmethod
+    def _measure(
+        query: Callable[[], list],
+        iterations: int,
+        warmup: int,
+    ) -> list[float]:
+        for _ in range(warmup):
+            query()
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, results: dict[str, dict[str, list[float]]]) -> None:
+        before, after = (results[variant] for variant in BENCHMARK_VARIANTS)
+        self.stdout.write(
+            f"{'query':<20}{'variant':<16}"
+            f"{'median ms':>11}{'p95 ms':>10}{'mean ms':>10}{'change':>9}"
+        )
+        for name in before:
+            base_median = statistics.median(before[name])
+            for variant, timings in results.items():
+                median = statistics.median(timings[name])
+                p95 = (
+                    statistics.quantiles(timings[name], n=20)[-1]
+                    if len(timings[name]) > 1
+                    else median
+                )
+                change = (median - base_median) / base_median * 100
+                self.stdout.write(
+                    f"{name:<20}{variant:<16}"
+                    f"{median:>11.3f}{p95:>10.3f}"
+                    f"{statistics.fmean(timings[name]):>10.3f}"
+                    f"{change:>+8.1f}%"
+                )
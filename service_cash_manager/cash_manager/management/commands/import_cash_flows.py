@@ -0,0 +1,63 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cash_manager.imports import (
+    IMPORT_FORMAT_CSV,
+    IMPORT_FORMAT_JSONL,
+    IMPORT_FORMATS,
+    CashFlowImporter,
+)
+from cash_manager.taxonomy import taxonomy
+
+
+class Command(BaseCommand):
+    help = (
+        "Массовый импорт ДДС из CSV/JSONL через COPY. "
+        "Некорректные строки записываются в файл rejects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="Файл импорта")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Формат файла (по умолчанию - по расширению)",
+        )
+        parser.add_argument(
+            "--rejects",
+            type=Path,
+            help="Файл отклоненных строк (по умолчанию <path>.rejects.csv)",
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["path"]
+        if not path.is_file():
+            raise CommandError(f"File not found: {path}")
+
+        file_format = options["format"] or (
+            IMPORT_FORMAT_JSONL
+            if path.suffix.lower() in (".jsonl", ".ndjson")
+            else IMPORT_FORMAT_CSV
+        )
+        rejects_path: Path = options["rejects"] or path.with_name(
+            f"{path.name}.rejects.csv",
+        )
+
+        with (
+            path.open(encoding="utf-8-sig", newline="") as file,
+            rejects_path.open("w", encoding="utf-8", newline="") as rejects,
+        ):
+            importer = CashFlowImporter(
+                taxonomy.snapshot,
+                reject_writer=csv.writer(rejects),
+            )
+            result = importer.run(file, file_format)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported: {result.imported}, "
+                f"rejected: {len(result.rejects)} ({rejects_path})"
+            )
+        )
@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from cash_manager.partitions import (
+    PARTITIONS_AHEAD,
+    create_partitions,
+    detach_partitions,
+    list_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Обслуживание месячных партиций cash_flow: создание партиций "
+        "заранее и отключение (архивирование) старых."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=PARTITIONS_AHEAD,
+            help="Кол-во месяцев вперед, для которых создаются партиции",
+        )
+        parser.add_argument(
+            "--detach-before",
+            type=date.fromisoformat,
+            help="Отключить партиции, целиком лежащие до даты (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            help="Схема, в которую переносятся отключенные партиции",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Удалить отключенные партиции",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="Только вывести список партиций",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for partition in list_partitions():
+                self.stdout.write(
+                    f"{partition.name}: {partition.lower} - {partition.upper}"
+                )
+            return
+
+        if options["ahead"] < 0:
+            raise CommandError("--ahead must not be negative")
+        if options["drop"] and options["archive_schema"]:
+            raise CommandError("--drop and --archive-schema are exclusive")
+
+        until = month_start(timezone.localdate(), options["ahead"])
+        for partition in create_partitions(until):
+            self.stdout.write(self.style.SUCCESS(f"Created {partition.name}"))
+
+        if before := options["detach_before"]:
+            for partition in detach_partitions(
+                before,
+                archive_schema=options["archive_schema"],
+                drop=options["drop"],
+            ):
+                self.stdout.write(
+                    self.style.SUCCESS(f"Detached {partition.name}")
+                )
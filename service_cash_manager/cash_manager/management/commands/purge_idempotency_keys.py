@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from cash_manager.bulk import idempotency_keys_expire_before
+from cash_manager.models import CashFlowIdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление ключей идемпотентности массовой записи ДДС старше "
+        "API_IDEMPOTENCY_KEY_TTL."
+    )
+
+    def handle(self, *args, **options):
+        deleted, _ = CashFlowIdempotencyKey.objects.filter(
+            created_at__lt=idempotency_keys_expire_before(),
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} idempotency keys")
+        )
@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from cash_manager.rollup import rebuild_daily_rollup
+
+
+class Command(BaseCommand):
+    help = "Пересчет дневных агрегатов ДДС (cash_flow_daily_rollup) за период."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=date.fromisoformat,
+            required=True,
+            help="Начало периода, YYYY-MM-DD",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=date.fromisoformat,
+            help="Конец периода, YYYY-MM-DD (по умолчанию - сегодня)",
+        )
+
+    def handle(self, *args, **options):
+        date_from: date = options["date_from"]
+        date_to: date = options["date_to"] or timezone.localdate()
+        if date_from > date_to:
+            raise CommandError("--from must not be later than --to")
+
+        rows = rebuild_daily_rollup(date_from, date_to)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} rollup rows for {date_from} - {date_to}"
+            )
+        )
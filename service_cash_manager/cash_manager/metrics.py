@@ -0,0 +1,179 @@
+import hmac
+import os
+from multiprocessing.util import Finalize
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .models import CashFlow
+
+# Метрики пишутся каждым worker-процессом uvicorn; при заданной
+# PROMETHEUS_MULTIPROC_DIR - в файлы общего каталога, и /metrics любого
+# worker-а отдает сумму по всем процессам
+REQUEST_DURATION = Histogram(
+    "cash_manager_http_request_duration_seconds",
+    "Время ответа по маршрутам (view) и статусам.",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "cash_manager_db_query_duration_seconds",
+    "Время выполнения SQL-запросов по БД (alias).",
+    ["database"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "cash_manager_db_pool_connections",
+    "Соединения пула psycopg: size - открытые, available - свободные.",
+    ["database", "state"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAITING = Gauge(
+    "cash_manager_db_pool_requests_waiting",
+    "Запросы, ожидающие соединение из пула.",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+CACHE_LOOKUPS = Counter(
+    "cash_manager_cache_lookups",
+    "Обращения к Django cache по областям: hit - найдено, miss - нет.",
+    ["namespace", "result"],
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+    # Гейджи (livesum) завершившегося worker-а не попадают в сумму
+    Finalize(
+        None,
+        multiprocess.mark_process_dead,
+        args=(os.getpid(), ),
+        exitpriority=0,
+    )
+
+
+def observe_request(request, response, duration: float) -> None:
+    """
+    Учет HTTP-запроса: время ответа по маршруту и состояние пулов
+    соединений текущего worker-процесса.
+
+    :param request: Запрос.
+    :param response: Ответ.
+    :param duration: Время ответа (сек.).
+    """
+    match = request.resolver_match
+    REQUEST_DURATION.labels(
+        request.method,
+        match.view_name if match else UNMATCHED_ROUTE,
+        response.status_code,
+    ).observe(duration)
+
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        for state in ("size", "available"):
+            DB_POOL_CONNECTIONS.labels(alias, state).set(
+                stats.get(f"pool_{state}", 0),
+            )
+        DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+
+
+def db_query_wrapper(execute, sql, params, many, context):
+    """Execute-wrapper соединения с БД: время SQL-запроса в /metrics."""
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_DURATION.labels(context["connection"].alias).observe(
+            perf_counter() - started,
+        )
+
+
+def install_db_query_wrapper(connection) -> None:
+    """Подключение db_query_wrapper к соединению (однократно)."""
+    if db_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_query_wrapper)
+
+
+class CashFlowRowsCollector:
+    """
+    Кол-во строк ДДС по партициям cash_flow (оценка по статистике
+    Postgres, pg_class.reltuples) - считается при каждом опросе /metrics.
+    """
+
+    def collect(self):
+        rows = GaugeMetricFamily(
+            "cash_manager_cash_flow_rows",
+            "Оценка кол-ва строк ДДС по партициям cash_flow.",
+            labels=["partition"],
+        )
+        connection = connections["default"]
+        table = connection.ops.quote_name(CashFlow._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname, greatest(c.reltuples, 0)::bigint
+                FROM pg_class AS c
+                WHERE c.relkind = 'r' AND (
+                    c.oid = %s::regclass
+                    OR c.oid IN (
+                        SELECT inhrelid
+                        FROM pg_inherits
+                        WHERE inhparent = %s::regclass
+                    )
+                )
+                ORDER BY c.relname
+                """,
+                [table, table],
+            )
+            for partition, estimate in cursor.fetchall():
+                rows.add_metric([partition], estimate)
+        yield rows
+
+
+def metrics_view(request):
+    """
+    GET /metrics - метрики сервиса в формате Prometheus.
+
+    Доступ - с заголовком Authorization: Bearer <METRICS_TOKEN> (если
+    токен задан) или из сессии staff-пользователя; без METRICS_ENABLED -
+    404.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not (
+        (
+            settings.METRICS_TOKEN
+            and hmac.compare_digest(
+                request.headers.get("Authorization", ""),
+                f"Bearer {settings.METRICS_TOKEN}",
+            )
+        )
+        or request.user.is_staff
+    ):
+        return HttpResponse(status=401)
+
+    registry = CollectorRegistry()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    registry.register(CashFlowRowsCollector())
+
+    return HttpResponse(
+        generate_latest(registry),
+        content_type=CONTENT_TYPE_LATEST,
+    )
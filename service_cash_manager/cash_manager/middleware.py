@@ -0,0 +1,166 @@
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+
+from .instrumentation import (
+    fingerprint_id,
+    logger as performance_logger,
+    profile_request,
+)
+from .metrics import observe_request
+from .routers import pinned_to_primary, replica_configured
+
+PRIMARY_STICKY_COOKIE = "cash_manager_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@sync_and_async_middleware
+def replica_stickiness_middleware(get_response):
+    """
+    Read-your-writes при чтении с реплики.
+
+    После успешного изменяющего запроса сессии (браузера) ставится cookie на
+    POSTGRES_REPLICA_STICKY_SECONDS: пока она есть, чтения этой сессии идут
+    на primary, даже внутри read_from_replica(), т.е. только что
+    сохраненный ДДС виден сразу, несмотря на задержку репликации.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with pinned_to_primary(_is_sticky(request)):
+                response = await get_response(request)
+            return _mark_write(request, response)
+    else:
+        def middleware(request):
+            with pinned_to_primary(_is_sticky(request)):
+                response = get_response(request)
+            return _mark_write(request, response)
+
+    return middleware
+
+
+def _is_sticky(request) -> bool:
+    return PRIMARY_STICKY_COOKIE in request.COOKIES
+
+
+def _mark_write(request, response):
+    if (
+        replica_configured()
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            "1",
+            max_age=settings.POSTGRES_REPLICA_STICKY_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def performance_middleware(get_response):
+    """
+    Метрики запроса: время ответа, кол-во SQL-запросов, время в БД,
+    повторяющиеся запросы (N+1).
+
+    Пишутся в лог cash_manager.performance (поля - в extra) и в заголовок
+    Server-Timing (видно в DevTools браузера). SQL учитывает
+    instrumentation.query_wrapper. При PERFORMANCE_INSTRUMENTATION = False
+    middleware не подключается (MiddlewareNotUsed). У потоковых ответов
+    (выгрузка CSV) учитывается время до начала выдачи.
+    """
+    if not settings.PERFORMANCE_INSTRUMENTATION:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = perf_counter()
+            with profile_request() as profile:
+                response = await get_response(request)
+            return _report(request, response, profile, started)
+    else:
+        def middleware(request):
+            started = perf_counter()
+            with profile_request() as profile:
+                response = get_response(request)
+            return _report(request, response, profile, started)
+
+    return middleware
+
+
+def _report(request, response, profile, started: float):
+    duration_ms = (perf_counter() - started) * 1000
+    db_time_ms = profile.db_time * 1000
+    repeated = profile.repeated_fingerprints(
+        settings.PERFORMANCE_REPEATED_QUERY_THRESHOLD,
+    )
+
+    response["Server-Timing"] = (
+        f"total;dur={duration_ms:.1f}, "
+        f'db;dur={db_time_ms:.1f};desc="{profile.queries} queries, '
+        f'{profile.duplicate_queries} duplicate"'
+    )
+    performance_logger.info(
+        "request method=%s path=%s status=%s duration_ms=%.1f "
+        "db_queries=%s db_time_ms=%.1f duplicate_queries=%s",
+        request.method,
+        request.path,
+        response.status_code,
+        duration_ms,
+        profile.queries,
+        db_time_ms,
+        profile.duplicate_queries,
+        extra={
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 1),
+            "db_queries": profile.queries,
+            "db_time_ms": round(db_time_ms, 1),
+            "duplicate_queries": profile.duplicate_queries,
+        },
+    )
+    for sql_fingerprint, count in repeated:
+        performance_logger.warning(
+            "repeated query path=%s count=%s fingerprint_id=%s sql=%s",
+            request.path,
+            count,
+            fingerprint_id(sql_fingerprint),
+            sql_fingerprint,
+            extra={
+                "path": request.path,
+                "count": count,
+                "fingerprint_id": fingerprint_id(sql_fingerprint),
+                "fingerprint": sql_fingerprint,
+            },
+        )
+    return response
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Время ответа по маршрутам и состояние пулов соединений для /metrics
+    (metrics.observe_request). При METRICS_ENABLED = False не подключается.
+    """
+    if not settings.METRICS_ENABLED:
+        raise MiddlewareNotUsed
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = perf_counter()
+            response = await get_response(request)
+            observe_request(request, response, perf_counter() - started)
+            return response
+    else:
+        def middleware(request):
+            started = perf_counter()
+            response = get_response(request)
+            observe_request(request, response, perf_counter() - started)
+            return response
+
+    return middleware
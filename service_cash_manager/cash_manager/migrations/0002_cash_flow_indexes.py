@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:05
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Индексы на большой таблице создаются без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ('cash_manager', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='cashflow',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='cash_flow_created_at_brin'),
+        ),
+        AddIndexConcurrently(
+            model_name='cashflow',
+            index=models.Index(fields=['amount', 'created_at'], name='cash_flow_amount_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='cashflow',
+            index=models.Index(fields=['type', 'created_at'], name='cash_flow_type_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='cashflow',
+            index=models.Index(fields=['status', 'created_at'], name='cash_flow_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='cashflow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('comment'), name='gin_trgm_ops'), name='cash_flow_comment_trgm_idx'),
+        ),
+    ]
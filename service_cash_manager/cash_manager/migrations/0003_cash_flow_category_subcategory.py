@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0002_cash_flow_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashflow',
+            name='category',
+            field=models.ForeignKey(help_text='Категория (должна относиться к типу)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cash_flow', to='cash_manager.cashflowcategory'),
+        ),
+        migrations.AddField(
+            model_name='cashflow',
+            name='subcategory',
+            field=models.ForeignKey(help_text='Подкатегория (должна быть связана с категорией)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='cash_flow', to='cash_manager.cashflowsubcategory'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:06
+
+from django.db import migrations
+
+
+def backfill_category_subcategory(apps, schema_editor):
+    """
+    Заполнение категории и подкатегории у существующих ДДС по таблицам-связкам
+    только там, где выбор однозначен: у типа ровно одна категория, у категории
+    ровно одна подкатегория. Остальные ДДС остаются с NULL (поля
+    необязательные) - категорию/подкатегорию выбирает пользователь.
+    """
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            """
+            UPDATE cash_manager.cash_flow AS cf
+            SET category_id = cbt.category_id
+            FROM (
+                SELECT link.type_id, min(link.category_id::text)::uuid
+                    AS category_id
+                FROM cash_manager.cash_flow_category_by_type AS link
+                GROUP BY link.type_id
+                HAVING count(DISTINCT link.category_id) = 1
+            ) AS cbt
+            WHERE cf.type_id = cbt.type_id AND cf.category_id IS NULL;
+            """
+        )
+        schema_editor.execute(
+            """
+            UPDATE cash_manager.cash_flow AS cf
+            SET subcategory_id = cbs.subcategory_id
+            FROM (
+                SELECT link.category_id, min(link.subcategory_id::text)::uuid
+                    AS subcategory_id
+                FROM cash_manager.cash_flow_category_by_subcategory AS link
+                GROUP BY link.category_id
+                HAVING count(DISTINCT link.subcategory_id) = 1
+            ) AS cbs
+            WHERE cf.category_id = cbs.category_id
+                AND cf.subcategory_id IS NULL;
+            """
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0003_cash_flow_category_subcategory'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_category_subcategory,
+            migrations.RunPython.noop,
+        ),
+    ]
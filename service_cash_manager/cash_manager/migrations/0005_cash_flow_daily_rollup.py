@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0004_backfill_cash_flow_category_subcategory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashFlowDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Дата создания ДДС')),
+                ('amount_sum', models.DecimalField(decimal_places=3, help_text='Сумма ДДС в рублях', max_digits=20)),
+                ('amount_count', models.BigIntegerField(help_text='Кол-во ДДС')),
+                ('amount_min', models.DecimalField(decimal_places=3, help_text='Минимальная сумма ДДС в рублях', max_digits=11)),
+                ('amount_max', models.DecimalField(decimal_places=3, help_text='Максимальная сумма ДДС в рублях', max_digits=11)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollup', to='cash_manager.cashflowcategory')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollup', to='cash_manager.cashflowstatus')),
+                ('type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollup', to='cash_manager.cashflowtype')),
+            ],
+            options={
+                'verbose_name': 'Агрегат ДДС за день',
+                'verbose_name_plural': 'Агрегаты ДДС за день',
+                'db_table': 'cash_manager"."cash_flow_daily_rollup',
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'type', 'category'), name='cash_flow_daily_rollup_key', nulls_distinct=False)],
+            },
+        ),
+    ]
@@ -0,0 +1,168 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:20
+
+from django.db import migrations
+
+ROLLUP_COLUMNS = (
+    "day, status_id, type_id, category_id, "
+    "amount_sum, amount_count, amount_min, amount_max"
+)
+ROLLUP_AGGREGATES = "sum(amount), count(*), min(amount), max(amount)"
+GROUP_COLUMNS = "created_at, status_id, type_id, category_id"
+DELETED_GROUPS = f"SELECT DISTINCT {GROUP_COLUMNS} FROM old_rows"
+UPDATED_GROUPS = (
+    f"SELECT {GROUP_COLUMNS} FROM old_rows "
+    f"UNION SELECT {GROUP_COLUMNS} FROM new_rows"
+)
+
+
+def refresh_groups(groups: str) -> str:
+    """
+    SQL пересчета агрегатов для групп (день, статус, тип, категория).
+
+    :param groups: SELECT, возвращающий группы (GROUP_COLUMNS).
+
+    :return: SQL (DELETE + INSERT).
+    """
+    return f"""
+                    DELETE FROM cash_manager.cash_flow_daily_rollup AS r
+                    USING ({groups}) AS g
+                    WHERE r.day = g.created_at
+                        AND r.status_id = g.status_id
+                        AND r.type_id = g.type_id
+                        AND r.category_id IS NOT DISTINCT FROM g.category_id;
+
+                    INSERT INTO cash_manager.cash_flow_daily_rollup
+                        ({ROLLUP_COLUMNS})
+                    SELECT
+                        cf.created_at, cf.status_id, cf.type_id, cf.category_id,
+                        sum(cf.amount), count(*), min(cf.amount), max(cf.amount)
+                    FROM cash_manager.cash_flow AS cf
+                    JOIN ({groups}) AS g
+                        ON cf.created_at = g.created_at
+                        AND cf.status_id = g.status_id
+                        AND cf.type_id = g.type_id
+                        AND cf.category_id IS NOT DISTINCT FROM g.category_id
+                    GROUP BY
+                        cf.created_at, cf.status_id, cf.type_id, cf.category_id;
+    """
+
+
+def create_rollup_triggers(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        # INSERT (в т.ч. COPY) - инкрементальное обновление агрегатов,
+        # UPDATE/DELETE - пересчет затронутых групп (min/max нельзя вычесть)
+        schema_editor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION cash_manager.cash_flow_rollup_refresh()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO cash_manager.cash_flow_daily_rollup AS r
+                        ({ROLLUP_COLUMNS})
+                    SELECT {GROUP_COLUMNS}, {ROLLUP_AGGREGATES}
+                    FROM new_rows
+                    GROUP BY {GROUP_COLUMNS}
+                    ON CONFLICT ON CONSTRAINT cash_flow_daily_rollup_key
+                    DO UPDATE SET
+                        amount_sum = r.amount_sum + EXCLUDED.amount_sum,
+                        amount_count = r.amount_count + EXCLUDED.amount_count,
+                        amount_min = LEAST(r.amount_min, EXCLUDED.amount_min),
+                        amount_max = GREATEST(r.amount_max, EXCLUDED.amount_max);
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    {refresh_groups(DELETED_GROUPS)}
+                ELSE
+                    {refresh_groups(UPDATED_GROUPS)}
+                END IF;
+
+                RETURN NULL;
+            END
+            $$;
+            """
+        )
+        schema_editor.execute(
+            """
+            CREATE OR REPLACE FUNCTION cash_manager.cash_flow_rollup_truncate()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                TRUNCATE cash_manager.cash_flow_daily_rollup;
+                RETURN NULL;
+            END
+            $$;
+            """
+        )
+
+        # Statement-level триггеры: одна агрегация на весь COPY/bulk
+        schema_editor.execute(
+            """
+            CREATE TRIGGER cash_flow_rollup_insert
+            AFTER INSERT ON cash_manager.cash_flow
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_rollup_refresh();
+
+            CREATE TRIGGER cash_flow_rollup_update
+            AFTER UPDATE ON cash_manager.cash_flow
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_rollup_refresh();
+
+            CREATE TRIGGER cash_flow_rollup_delete
+            AFTER DELETE ON cash_manager.cash_flow
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_rollup_refresh();
+
+            CREATE TRIGGER cash_flow_rollup_truncate
+            AFTER TRUNCATE ON cash_manager.cash_flow
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_rollup_truncate();
+            """
+        )
+
+        # Агрегаты по уже существующим ДДС
+        schema_editor.execute(
+            f"""
+            INSERT INTO cash_manager.cash_flow_daily_rollup ({ROLLUP_COLUMNS})
+            SELECT {GROUP_COLUMNS}, {ROLLUP_AGGREGATES}
+            FROM cash_manager.cash_flow
+            GROUP BY {GROUP_COLUMNS};
+            """
+        )
+
+
+def delete_rollup_triggers(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            """
+            DROP TRIGGER IF EXISTS cash_flow_rollup_insert
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_rollup_update
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_rollup_delete
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_rollup_truncate
+                ON cash_manager.cash_flow;
+            DROP FUNCTION IF EXISTS cash_manager.cash_flow_rollup_refresh();
+            DROP FUNCTION IF EXISTS cash_manager.cash_flow_rollup_truncate();
+            """
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0005_cash_flow_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_rollup_triggers, delete_rollup_triggers),
+    ]
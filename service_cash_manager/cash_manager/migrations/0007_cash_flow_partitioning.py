@@ -0,0 +1,152 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:05
+
+from datetime import date
+
+from django.db import migrations
+
+TABLE = "cash_manager.cash_flow"
+PARTITIONS_AHEAD = 3
+
+
+def month_start(value: date, months: int = 0) -> date:
+    month = value.year * 12 + value.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def table_objects(cursor) -> tuple[list[str], list[str], list[str]]:
+    """
+    DDL индексов, ограничений (кроме PK) и триггеров таблицы cash_flow.
+
+    Определения переносятся на новую таблицу как есть, поэтому имена,
+    которые ожидают миграции Django (индексы, FK), сохраняются.
+    """
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index AS i
+        WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+        """,
+        [TABLE],
+    )
+    indexes = [
+        row[0].replace(" ON ONLY ", " ON ") for row in cursor.fetchall()
+    ]
+
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype <> 'p'
+        """,
+        [TABLE],
+    )
+    constraints = [
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}"
+        for name, definition in cursor.fetchall()
+    ]
+
+    cursor.execute(
+        """
+        SELECT pg_get_triggerdef(oid)
+        FROM pg_trigger
+        WHERE tgrelid = %s::regclass AND NOT tgisinternal
+        """,
+        [TABLE],
+    )
+    triggers = [row[0] for row in cursor.fetchall()]
+
+    return indexes, constraints, triggers
+
+
+def rebuild_table(
+    schema_editor,
+    create_sql: list[str],
+    primary_key: str,
+) -> None:
+    """
+    Пересоздание cash_flow с переносом данных, индексов, FK и триггеров.
+
+    :param create_sql: DDL таблицы cash_manager.cash_flow_new (и партиций).
+    :param primary_key: Колонки первичного ключа.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        indexes, constraints, triggers = table_objects(cursor)
+
+        for statement in create_sql:
+            cursor.execute(statement)
+        # Данные копируются до создания триггеров: агрегаты уже посчитаны
+        cursor.execute(
+            f"INSERT INTO cash_manager.cash_flow_new SELECT * FROM {TABLE}"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}")
+        cursor.execute(
+            "ALTER TABLE cash_manager.cash_flow_new RENAME TO cash_flow"
+        )
+        cursor.execute(
+            f"ALTER TABLE {TABLE} "
+            f"ADD CONSTRAINT cash_flow_pkey PRIMARY KEY ({primary_key})"
+        )
+        for statement in (*constraints, *indexes, *triggers):
+            cursor.execute(statement)
+
+
+def partition_table(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"SELECT min(created_at) FROM {TABLE}")
+            first_day = cursor.fetchone()[0] or date.today()
+
+        create_sql = [
+            f"""
+            CREATE TABLE cash_manager.cash_flow_new
+            (LIKE {TABLE} INCLUDING DEFAULTS)
+            PARTITION BY RANGE (created_at)
+            """,
+            # Страховка для дат вне созданных партиций
+            """
+            CREATE TABLE cash_manager.cash_flow_default
+            PARTITION OF cash_manager.cash_flow_new DEFAULT
+            """,
+        ]
+        month = month_start(first_day)
+        last_month = month_start(date.today(), PARTITIONS_AHEAD)
+        while month <= last_month:
+            create_sql.append(
+                f"""
+                CREATE TABLE cash_manager.cash_flow_p{month:%Y_%m}
+                PARTITION OF cash_manager.cash_flow_new
+                FOR VALUES FROM ('{month}') TO ('{month_start(month, 1)}')
+                """
+            )
+            month = month_start(month, 1)
+
+        # Первичный ключ партиционированной таблицы обязан включать ключ
+        # партиционирования
+        rebuild_table(schema_editor, create_sql, "id, created_at")
+
+
+def unpartition_table(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        rebuild_table(
+            schema_editor,
+            [
+                f"""
+                CREATE TABLE cash_manager.cash_flow_new
+                (LIKE {TABLE} INCLUDING DEFAULTS)
+                """,
+            ],
+            "id",
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0006_cash_flow_daily_rollup_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:21
+
+import django.core.serializers.json
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0007_cash_flow_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashFlowIdempotencyKey',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('key', models.CharField(help_text='Значение заголовка Idempotency-Key', max_length=255, unique=True)),
+                ('request_hash', models.CharField(help_text='SHA-256 тела запроса', max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(help_text='HTTP-статус')),
+                ('response', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Тело ответа')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Дата и время выполнения запроса')),
+            ],
+            options={
+                'verbose_name': 'Ключ идемпотентности ДДС',
+                'verbose_name_plural': 'Ключи идемпотентности ДДС',
+                'db_table': 'cash_manager"."cash_flow_idempotency_key',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:37
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0008_cash_flow_idempotency_key'),
+    ]
+
+    # Генерируемая колонка вычисляется для всех строк (перезапись таблицы);
+    # GIN-индекс на партиционированной таблице создается без CONCURRENTLY
+    operations = [
+        migrations.AddField(
+            model_name='cashflow',
+            name='comment_search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('comment', config='russian'), help_text='Комментарий для полнотекстового поиска (tsvector)', output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='cashflow',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['comment_search'], name='cash_flow_comment_search_idx'),
+        ),
+    ]
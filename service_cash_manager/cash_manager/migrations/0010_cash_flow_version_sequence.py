@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0009_cash_flow_comment_search'),
+    ]
+
+    operations = [
+        # Источник версии данных ДДС (data_version.CASH_FLOW_VERSION)
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE cash_manager.cash_flow_version_seq",
+            reverse_sql="DROP SEQUENCE cash_manager.cash_flow_version_seq",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0010_cash_flow_version_sequence'),
+    ]
+
+    operations = [
+        # Источник версии справочников (taxonomy.TAXONOMY_VERSION)
+        migrations.RunSQL(
+            sql="CREATE SEQUENCE cash_manager.taxonomy_version_seq",
+            reverse_sql="DROP SEQUENCE cash_manager.taxonomy_version_seq",
+        ),
+    ]
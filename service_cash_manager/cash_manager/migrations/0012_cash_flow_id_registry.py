@@ -0,0 +1,119 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:10
+
+from django.db import migrations
+
+
+def create_id_registry(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        # PK партиционированной cash_flow - (id, created_at): уникальность
+        # id по всем партициям обеспечивает реестр с PK (id)
+        schema_editor.execute(
+            """
+            CREATE TABLE cash_manager.cash_flow_id (
+                id uuid PRIMARY KEY
+            );
+
+            INSERT INTO cash_manager.cash_flow_id (id)
+            SELECT id FROM cash_manager.cash_flow;
+            """
+        )
+        # UPDATE: освобождаются id, которых нет среди новых строк, и
+        # занимаются новые (без DISTINCT - дубли внутри запроса тоже
+        # нарушают PK реестра)
+        schema_editor.execute(
+            """
+            CREATE OR REPLACE FUNCTION cash_manager.cash_flow_id_refresh()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO cash_manager.cash_flow_id (id)
+                    SELECT id FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    DELETE FROM cash_manager.cash_flow_id
+                    WHERE id IN (SELECT id FROM old_rows);
+                ELSE
+                    DELETE FROM cash_manager.cash_flow_id
+                    WHERE id IN (SELECT id FROM old_rows)
+                        AND id NOT IN (SELECT id FROM new_rows);
+                    INSERT INTO cash_manager.cash_flow_id (id)
+                    SELECT n.id FROM new_rows AS n
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM old_rows AS o WHERE o.id = n.id
+                    );
+                END IF;
+
+                RETURN NULL;
+            END
+            $$;
+
+            CREATE OR REPLACE FUNCTION cash_manager.cash_flow_id_truncate()
+            RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                TRUNCATE cash_manager.cash_flow_id;
+                RETURN NULL;
+            END
+            $$;
+            """
+        )
+        schema_editor.execute(
+            """
+            CREATE TRIGGER cash_flow_id_insert
+            AFTER INSERT ON cash_manager.cash_flow
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_id_refresh();
+
+            CREATE TRIGGER cash_flow_id_update
+            AFTER UPDATE ON cash_manager.cash_flow
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_id_refresh();
+
+            CREATE TRIGGER cash_flow_id_delete
+            AFTER DELETE ON cash_manager.cash_flow
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_id_refresh();
+
+            CREATE TRIGGER cash_flow_id_truncate
+            AFTER TRUNCATE ON cash_manager.cash_flow
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION cash_manager.cash_flow_id_truncate();
+            """
+        )
+
+
+def delete_id_registry(apps, schema_editor):
+    # PostgresSQL:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            """
+            DROP TRIGGER IF EXISTS cash_flow_id_insert
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_id_update
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_id_delete
+                ON cash_manager.cash_flow;
+            DROP TRIGGER IF EXISTS cash_flow_id_truncate
+                ON cash_manager.cash_flow;
+            DROP FUNCTION IF EXISTS cash_manager.cash_flow_id_refresh();
+            DROP FUNCTION IF EXISTS cash_manager.cash_flow_id_truncate();
+            DROP TABLE IF EXISTS cash_manager.cash_flow_id;
+            """
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0011_taxonomy_version_sequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_id_registry, delete_id_registry),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash_manager', '0012_cash_flow_id_registry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Сохраненные ответы без пользователя нельзя отнести ни к кому:
+        # повтор таких запросов выполняется заново
+        migrations.RunSQL(
+            sql="DELETE FROM cash_manager.cash_flow_idempotency_key",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name='cashflowidempotencykey',
+            name='user',
+            field=models.ForeignKey(default=None, help_text='Пользователь, выполнивший запрос', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+            preserve_default=False,
+        ),
+        # Таблица в схеме cash_manager: интроспекция Django не находит ее
+        # ограничения, а DROP INDEX ищет индекс без схемы, поэтому
+        # уникальность key и индекс created_at меняются явным SQL
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                    ALTER TABLE cash_manager.cash_flow_idempotency_key
+                        DROP CONSTRAINT cash_flow_idempotency_key_key_key;
+                    DROP INDEX cash_manager.cash_flow_idempotency_key_key_a03912f4_like;
+                    """,
+                    reverse_sql="""
+                    ALTER TABLE cash_manager.cash_flow_idempotency_key
+                        ADD CONSTRAINT cash_flow_idempotency_key_key_key UNIQUE (key);
+                    CREATE INDEX cash_flow_idempotency_key_key_a03912f4_like
+                        ON cash_manager.cash_flow_idempotency_key (key varchar_pattern_ops);
+                    """,
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='cashflowidempotencykey',
+                    name='key',
+                    field=models.CharField(help_text='Значение заголовка Idempotency-Key', max_length=255),
+                ),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                    CREATE INDEX cash_flow_idempotency_created
+                        ON cash_manager.cash_flow_idempotency_key (created_at);
+                    """,
+                    reverse_sql="""
+                    DROP INDEX cash_manager.cash_flow_idempotency_created;
+                    """,
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='cashflowidempotencykey',
+                    index=models.Index(fields=['created_at'], name='cash_flow_idempotency_created'),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cashflowidempotencykey',
+            constraint=models.UniqueConstraint(fields=('user', 'key'), name='cash_flow_idempotency_key_user_key'),
+        ),
+    ]
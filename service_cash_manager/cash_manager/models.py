@@ -1,6 +1,12 @@
 from uuid import uuid4
 
+from django.conf import settings
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 
 
@@ -178,8 +184,21 @@ class CashFlowStatus(UUIDMixin):
         return f"{self.title}({self.alias})"
 
 
+class CashFlowManager(models.Manager):
+    """Менеджер ДДС: tsvector комментария нужен только в условиях поиска."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer("comment_search")
+
+
 class CashFlow(UUIDMixin, DateStampedMixin):
-    """Модель - Движение денежного средства (ДДС)."""
+    """
+    Модель - Движение денежного средства (ДДС).
+
+    Таблица партиционирована по created_at, ее PK в БД - (id, created_at).
+    Уникальность id по всем партициям (id - PK модели) обеспечивает реестр
+    cash_manager.cash_flow_id с триггерами на cash_flow (миграция 0012).
+    """
 
     status = models.ForeignKey(
         "CashFlowStatus",
@@ -191,6 +210,20 @@ class CashFlow(UUIDMixin, DateStampedMixin):
         on_delete=models.PROTECT,
         related_name="cash_flow",
     )
+    category = models.ForeignKey(
+        "CashFlowCategory",
+        on_delete=models.PROTECT,
+        null=True,
+        related_name="cash_flow",
+        help_text="Категория (должна относиться к типу)",
+    )
+    subcategory = models.ForeignKey(
+        "CashFlowSubCategory",
+        on_delete=models.PROTECT,
+        null=True,
+        related_name="cash_flow",
+        help_text="Подкатегория (должна быть связана с категорией)",
+    )
 
     amount = models.DecimalField(
         max_digits=11,
@@ -204,11 +237,216 @@ class CashFlow(UUIDMixin, DateStampedMixin):
         null=True,
         help_text="Комментарий",
     )
+    comment_search = models.GeneratedField(
+        expression=SearchVector("comment", config="russian"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        help_text="Комментарий для полнотекстового поиска (tsvector)",
+    )
+
+    objects = CashFlowManager()
 
     class Meta:
         db_table = 'cash_manager"."cash_flow'
         verbose_name = "Движение денежного средства (ДДС)"
         verbose_name_plural = "Движения денежных средств (ДДС)"
+        indexes = [
+            # Фильтр по периоду дат (created_at растет вместе с таблицей)
+            BrinIndex(
+                fields=["created_at"],
+                name="cash_flow_created_at_brin",
+            ),
+            # Сортировка списка по умолчанию
+            models.Index(
+                fields=["amount", "created_at"],
+                name="cash_flow_amount_created_idx",
+            ),
+            # Фильтры по типу/статусу вместе с периодом дат
+            models.Index(
+                fields=["type", "created_at"],
+                name="cash_flow_type_created_idx",
+            ),
+            models.Index(
+                fields=["status", "created_at"],
+                name="cash_flow_status_created_idx",
+            ),
+            # Поиск по комментарию: нечеткий (UPPER(comment) %> ...) и
+            # icontains (UPPER(comment) LIKE '%...%')
+            GinIndex(
+                OpClass(Upper("comment"), name="gin_trgm_ops"),
+                name="cash_flow_comment_trgm_idx",
+            ),
+            # Полнотекстовый поиск по комментарию (comment_search @@ ...)
+            GinIndex(
+                fields=["comment_search"],
+                name="cash_flow_comment_search_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return str(self.id)
+
+    def clean(self) -> None:
+        """
+        Проверка бизнес-правил по справочникам ДДС:
+        категория относится к типу, подкатегория связана с категорией.
+
+        :raises ValidationError: Нарушена связанность справочников.
+        """
+        from .taxonomy import taxonomy
+
+        super().clean()
+        self.validate_taxonomy(taxonomy.snapshot)
+
+    def validate_taxonomy(self, snapshot) -> None:
+        """
+        Проверка ссылок на справочники по снимку taxonomy (без запросов в
+        БД): справочные сущности существуют, категория относится к типу,
+        подкатегория связана с категорией.
+
+        :param snapshot: Снимок справочников ДДС (TaxonomySnapshot).
+
+        :raises ValidationError: Нарушена связанность справочников.
+        """
+        errors = {}
+        for name, items in (
+            ("status", snapshot.statuses),
+            ("type", snapshot.types),
+            ("category", snapshot.categories),
+            ("subcategory", snapshot.subcategories),
+        ):
+            item_id = getattr(self, f"{name}_id")
+            if item_id is not None and item_id not in items:
+                errors[name] = "Неизвестное значение справочника."
+        if errors:
+            raise ValidationError(errors)
+
+        if self.category_id and self.category_id not in (
+            snapshot.categories_by_type.get(self.type_id, ())
+        ):
+            errors["category"] = "Категория не относится к выбранному типу."
+
+        if self.subcategory_id and self.subcategory_id not in (
+            snapshot.subcategories_by_category.get(self.category_id, ())
+        ):
+            errors["subcategory"] = (
+                "Подкатегория не связана с выбранной категорией."
+            )
+
+        if errors:
+            raise ValidationError(errors)
+
+
+class CashFlowDailyRollup(models.Model):
+    """
+    Модель - Агрегаты ДДС за день в разрезе статуса, типа и категории.
+
+    Поддерживается триггерами на таблице cash_flow (в т.ч. для COPY и
+    массовых операций), пересчитывается командой rebuild_cash_flow_rollup.
+    """
+
+    day = models.DateField(help_text="Дата создания ДДС")
+    status = models.ForeignKey(
+        "CashFlowStatus",
+        on_delete=models.CASCADE,
+        related_name="daily_rollup",
+    )
+    type = models.ForeignKey(
+        "CashFlowType",
+        on_delete=models.CASCADE,
+        related_name="daily_rollup",
+    )
+    category = models.ForeignKey(
+        "CashFlowCategory",
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="daily_rollup",
+    )
+
+    amount_sum = models.DecimalField(
+        max_digits=20,
+        decimal_places=3,
+        help_text="Сумма ДДС в рублях",
+    )
+    amount_count = models.BigIntegerField(help_text="Кол-во ДДС")
+    amount_min = models.DecimalField(
+        max_digits=11,
+        decimal_places=3,
+        help_text="Минимальная сумма ДДС в рублях",
+    )
+    amount_max = models.DecimalField(
+        max_digits=11,
+        decimal_places=3,
+        help_text="Максимальная сумма ДДС в рублях",
+    )
+
+    class Meta:
+        db_table = 'cash_manager"."cash_flow_daily_rollup'
+        verbose_name = "Агрегат ДДС за день"
+        verbose_name_plural = "Агрегаты ДДС за день"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "type", "category"],
+                name="cash_flow_daily_rollup_key",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day}: {self.amount_sum} ({self.amount_count})"
+
+
+class CashFlowIdempotencyKey(UUIDMixin):
+    """
+    Модель - Ключ идемпотентности массовой записи ДДС.
+
+    Хранит ответ на уже выполненный запрос: повтор с тем же ключом (того
+    же пользователя, в пределах API_IDEMPOTENCY_KEY_TTL) возвращает
+    сохраненный ответ без повторной записи.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="Пользователь, выполнивший запрос",
+    )
+    key = models.CharField(
+        max_length=255,
+        help_text="Значение заголовка Idempotency-Key",
+    )
+    request_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 тела запроса",
+    )
+    status_code = models.PositiveSmallIntegerField(help_text="HTTP-статус")
+    response = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text="Тело ответа",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Дата и время выполнения запроса",
+    )
+
+    class Meta:
+        db_table = 'cash_manager"."cash_flow_idempotency_key'
+        verbose_name = "Ключ идемпотентности ДДС"
+        verbose_name_plural = "Ключи идемпотентности ДДС"
+        constraints = [
+            # Ключ действует только для своего пользователя
+            models.UniqueConstraint(
+                fields=["user", "key"],
+                name="cash_flow_idempotency_key_user_key",
+            ),
+        ]
+        indexes = [
+            # Удаление устаревших ключей
+            models.Index(
+                fields=["created_at"],
+                name="cash_flow_idempotency_created",
+            ),
+        ]
 
     def __str__(self) -> str:
-        return self.id
+        return self.key
@@ -0,0 +1,211 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+
+from .data_version import mark_cash_flows_changed
+from .models import CashFlow, CashFlowDailyRollup
+
+PARTITIONS_AHEAD = 3
+DEFAULT_PARTITION = "cash_flow_default"
+# Реестр id ДДС (уникальность id по всем партициям, миграция 0012)
+ID_REGISTRY = "cash_flow_id"
+
+PARTITION_BOUND_RE = re.compile(
+    r"FOR VALUES FROM \('(?P<lower>[\d-]+)'\) TO \('(?P<upper>[\d-]+)'\)"
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Месячная партиция таблицы cash_flow: [lower, upper)."""
+
+    name: str
+    lower: date
+    upper: date
+
+
+def month_start(value: date, months: int = 0) -> date:
+    """
+    Первое число месяца value, сдвинутого на months месяцев.
+
+    :param value: Дата.
+    :param months: Сдвиг в месяцах.
+
+    :return: Дата начала месяца.
+    """
+    month = value.year * 12 + value.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"cash_flow_p{month:%Y_%m}"
+
+
+def list_partitions() -> list[Partition]:
+    """
+    Месячные партиции cash_flow (без DEFAULT), по возрастанию дат.
+
+    :return: Партиции.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits AS i
+            JOIN pg_class AS c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [_table()],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        if match := PARTITION_BOUND_RE.search(bound):
+            partitions.append(
+                Partition(
+                    name=name,
+                    lower=date.fromisoformat(match["lower"]),
+                    upper=date.fromisoformat(match["upper"]),
+                )
+            )
+
+    return sorted(partitions, key=lambda partition: partition.lower)
+
+
+def create_partitions(until: date) -> list[Partition]:
+    """
+    Создание недостающих месячных партиций до месяца until включительно
+    (а также за прошлые месяцы, строки которых лежат в DEFAULT-партиции).
+
+    Строки, уже попавшие в DEFAULT-партицию в диапазон новой партиции,
+    переносятся в нее (иначе ATTACH/CREATE PARTITION завершится ошибкой).
+    Перенос идет напрямую между партициями, минуя триггеры родительской
+    таблицы, поэтому дневные агрегаты и реестр id не меняются.
+
+    :param until: Дата, до месяца которой нужны партиции.
+
+    :return: Созданные партиции.
+    """
+    table = _table()
+    existing = {partition.lower for partition in list_partitions()}
+    last_month = month_start(until)
+    month = month_start(date.today())
+    if existing:
+        month = min(month, max(existing))
+
+    # Месяцы с данными в DEFAULT-партиции (например, после загрузки истории)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT min(created_at) FROM {_qualified(DEFAULT_PARTITION)}"
+        )
+        if first_default := cursor.fetchone()[0]:
+            month = min(month, month_start(first_default))
+
+    columns = ", ".join(
+        connection.ops.quote_name(field.column)
+        for field in CashFlow._meta.concrete_fields
+        if not field.generated
+    )
+    created = []
+    while month <= last_month:
+        if month not in existing:
+            partition = Partition(
+                name=partition_name(month),
+                lower=month,
+                upper=month_start(month, 1),
+            )
+            with transaction.atomic(), connection.cursor() as cursor:
+                name = _qualified(partition.name)
+                default = _qualified(DEFAULT_PARTITION)
+                cursor.execute(
+                    f"CREATE TABLE {name} "
+                    f"(LIKE {table} INCLUDING DEFAULTS INCLUDING GENERATED)"
+                )
+                # Генерируемые колонки (comment_search) вычисляются заново
+                cursor.execute(
+                    f"""
+                    WITH moved AS (
+                        DELETE FROM {default}
+                        WHERE created_at >= %s AND created_at < %s
+                        RETURNING *
+                    )
+                    INSERT INTO {name} ({columns}) SELECT {columns} FROM moved
+                    """,
+                    [partition.lower, partition.upper],
+                )
+                # DDL не принимает параметры (server-side binding):
+                # границы подставляются в текст запроса
+                cursor.execute(
+                    connection.ops.compose_sql(
+                        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM (%s) TO (%s)",
+                        [partition.lower, partition.upper],
+                    )
+                )
+            created.append(partition)
+        month = month_start(month, 1)
+
+    return created
+
+
+def detach_partitions(
+    before: date,
+    archive_schema: str | None = None,
+    drop: bool = False,
+) -> list[Partition]:
+    """
+    Отключение от cash_flow партиций, целиком лежащих до даты before.
+
+    Отключенная партиция остается отдельной таблицей (или переносится в
+    схему archive_schema, или удаляется при drop). Дневные агрегаты за ее
+    период и id ее строк в реестре cash_flow_id удаляются, чтобы
+    cash_flow_daily_rollup и реестр соответствовали cash_flow.
+
+    :param before: Граница: отключаются партиции с upper <= before.
+    :param archive_schema: Схема для отключенных партиций.
+    :param drop: Удалить отключенные партиции.
+
+    :return: Отключенные партиции.
+    """
+    table = _table()
+    rollup_table = connection.ops.quote_name(
+        CashFlowDailyRollup._meta.db_table,
+    )
+
+    detached = []
+    for partition in list_partitions():
+        if partition.upper > before:
+            continue
+
+        name = _qualified(partition.name)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            cursor.execute(
+                f"DELETE FROM {rollup_table} WHERE day >= %s AND day < %s",
+                [partition.lower, partition.upper],
+            )
+            cursor.execute(
+                f"DELETE FROM {_qualified(ID_REGISTRY)} AS r "
+                f"USING {name} AS p WHERE r.id = p.id"
+            )
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            elif archive_schema:
+                schema = connection.ops.quote_name(archive_schema)
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+                cursor.execute(f"ALTER TABLE {name} SET SCHEMA {schema}")
+            mark_cash_flows_changed()
+        detached.append(partition)
+
+    return detached
+
+
+def _table() -> str:
+    return connection.ops.quote_name(CashFlow._meta.db_table)
+
+
+def _qualified(name: str) -> str:
+    return f"cash_manager.{connection.ops.quote_name(name)}"
@@ -0,0 +1,214 @@
+import hashlib
+import json
+from decimal import Decimal
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db.models import Avg, Count, DateField, IntegerField, Sum, Value
+from django.db.models.functions import Trunc
+from django.http import QueryDict
+
+from .api_filters import filter_cash_flows
+from .models import CashFlow, CashFlowDailyRollup
+from .taxonomy import TaxonomySnapshot
+
+REPORT_DIMENSIONS = ("status", "type", "category", "subcategory")
+REPORT_BUCKETS = ("day", "week", "month", "quarter")
+REPORT_FILTERS = (
+    "created_at_from",
+    "created_at_to",
+    "status",
+    "type",
+    "category",
+    "subcategory",
+    "comment",
+)
+# Измерения и фильтры, доступные в дневных агрегатах cash_flow_daily_rollup
+ROLLUP_DIMENSIONS = ("status", "type", "category")
+ROLLUP_FILTERS = (
+    "created_at_from",
+    "created_at_to",
+    "status",
+    "type",
+    "category",
+)
+REPORT_SOURCE_ROLLUP = "rollup"
+REPORT_SOURCE_CASH_FLOW = "cash_flow"
+AVG_QUANTUM = Decimal("0.001")
+
+
+class CashFlowReport:
+    """
+    Отчет по ДДС: SUM/COUNT/AVG суммы с группировкой по любому набору
+    справочников и периодам (date_trunc: day/week/month/quarter).
+
+    Считается одним SQL-запросом. Если измерения и фильтры есть в дневных
+    агрегатах (cash_flow_daily_rollup), отчет читается из них, иначе - из
+    cash_flow.
+    """
+
+    def __init__(self, params: QueryDict, snapshot: TaxonomySnapshot) -> None:
+        """
+        :param params: GET-параметры: group_by (через запятую), bucket и
+            фильтры списка ДДС.
+        :param snapshot: Снимок справочников ДДС.
+
+        :raises ValidationError: Некорректные параметры отчета.
+        """
+        self.snapshot = snapshot
+        self.group_by = self._group_by(params.get("group_by", ""))
+        self.bucket = params.get("bucket") or None
+        if self.bucket is not None and self.bucket not in REPORT_BUCKETS:
+            raise ValidationError(
+                {"bucket": [f"Допустимо: {', '.join(REPORT_BUCKETS)}."]},
+            )
+
+        self.filters = QueryDict(mutable=True)
+        for name in REPORT_FILTERS:
+            if value := params.get(name):
+                self.filters[name] = value
+
+        self.source = (
+            REPORT_SOURCE_ROLLUP
+            if set(self.group_by) <= set(ROLLUP_DIMENSIONS)
+            and set(self.filters) <= set(ROLLUP_FILTERS)
+            else REPORT_SOURCE_CASH_FLOW
+        )
+
+    def cache_key(self, taxonomy_version: int, data_version: int) -> str:
+        """
+        Ключ кэша отчета: хэш параметров, версия справочников (фильтры по
+        наименованиям) и версия данных ДДС.
+
+        :param taxonomy_version: Версия справочников.
+        :param data_version: Версия данных ДДС.
+
+        :return: Ключ кэша.
+        """
+        params = json.dumps(
+            {
+                "group_by": self.group_by,
+                "bucket": self.bucket,
+                "filters": sorted(self.filters.items()),
+            },
+            sort_keys=True,
+        )
+        params_hash = hashlib.sha256(params.encode()).hexdigest()
+        return (
+            f"cash_manager:report:{params_hash}:"
+            f"{taxonomy_version}:{data_version}"
+        )
+
+    def queryset(self):
+        """
+        QuerySet отчета (values + annotate: один GROUP BY запрос).
+
+        :raises ValidationError: Некорректные фильтры.
+        """
+        columns = [f"{name}_id" for name in self.group_by]
+        if self.source == REPORT_SOURCE_ROLLUP:
+            queryset = filter_cash_flows(
+                CashFlowDailyRollup.objects.all(),
+                self.filters,
+                self.snapshot,
+                date_field="day",
+            )
+            date_field = "day"
+            aggregates = {
+                "amount_sum": Sum("amount_sum"),
+                "amount_count": Sum("amount_count"),
+            }
+        else:
+            queryset = filter_cash_flows(
+                CashFlow.objects.all(),
+                self.filters,
+                self.snapshot,
+            )
+            date_field = "created_at"
+            aggregates = {
+                "amount_sum": Sum("amount"),
+                "amount_count": Count("id"),
+                "amount_avg": Avg("amount"),
+            }
+
+        if self.bucket:
+            queryset = queryset.annotate(
+                period=Trunc(date_field, self.bucket, output_field=DateField()),
+            )
+            columns.insert(0, "period")
+
+        if not columns:
+            # Итог без группировки: values() без полей сгруппировал бы по
+            # всем полям (строка на строку), константа дает одну строку
+            return (
+                queryset.values(total=Value(1, output_field=IntegerField()))
+                .annotate(**aggregates)
+                .order_by()
+            )
+
+        return (
+            queryset.values(*columns)
+            .annotate(**aggregates)
+            .order_by(*columns)
+        )
+
+    def row(self, values: dict[str, Any]) -> dict[str, Any]:
+        """
+        Строка отчета для API: справочники - {id, title} по снимку.
+
+        :param values: Строка QuerySet отчета.
+
+        :return: Строка отчета.
+        """
+        row: dict[str, Any] = {}
+        if self.bucket:
+            row["period"] = values["period"]
+        for name, items in (
+            ("status", self.snapshot.statuses),
+            ("type", self.snapshot.types),
+            ("category", self.snapshot.categories),
+            ("subcategory", self.snapshot.subcategories),
+        ):
+            if name in self.group_by:
+                item_id = values[f"{name}_id"]
+                item = items.get(item_id)
+                row[name] = {
+                    "id": item_id,
+                    "title": item.title if item else None,
+                }
+
+        amount_sum = values["amount_sum"] or Decimal(0)
+        amount_count = values["amount_count"] or 0
+        amount_avg = values.get("amount_avg")
+        if amount_avg is None and amount_count:
+            amount_avg = amount_sum / amount_count
+
+        row.update(
+            {
+                "sum": amount_sum,
+                "count": amount_count,
+                "avg": (
+                    amount_avg.quantize(AVG_QUANTUM)
+                    if amount_avg is not None
+                    else None
+                ),
+            }
+        )
+        return row
+
+    @staticmethod
+    def _group_by(value: str) -> list[str]:
+        group_by = [name.strip() for name in value.split(",") if name.strip()]
+        if unknown := [
+            name for name in group_by if name not in REPORT_DIMENSIONS
+        ]:
+            raise ValidationError(
+                {
+                    "group_by": [
+                        f"Неизвестные измерения: {', '.join(unknown)}. "
+                        f"Допустимо: {', '.join(REPORT_DIMENSIONS)}."
+                    ],
+                },
+            )
+        # Порядок измерений не влияет на результат (и ключ кэша)
+        return sorted(set(group_by), key=REPORT_DIMENSIONS.index)
@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.db import connection, transaction
+
+from .data_version import mark_cash_flows_changed
+from .models import CashFlow, CashFlowDailyRollup
+
+
+def rebuild_daily_rollup(date_from: date, date_to: date) -> int:
+    """
+    Пересчет дневных агрегатов ДДС за период по таблице cash_flow.
+
+    Агрегаты поддерживаются триггерами БД; пересчет нужен после ручных
+    правок в обход триггеров (например, при отключенных триггерах). На
+    время пересчета запись в cash_flow блокируется (SHARE), чтобы
+    параллельные вставки не учлись дважды.
+
+    :param date_from: Начало периода (включительно).
+    :param date_to: Конец периода (включительно).
+
+    :return: Кол-во записанных агрегатов.
+    """
+    cash_flow_table = connection.ops.quote_name(CashFlow._meta.db_table)
+    rollup_table = connection.ops.quote_name(CashFlowDailyRollup._meta.db_table)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {cash_flow_table} IN SHARE MODE")
+        cursor.execute(
+            f"DELETE FROM {rollup_table} WHERE day BETWEEN %s AND %s",
+            [date_from, date_to],
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {rollup_table} (
+                day, status_id, type_id, category_id,
+                amount_sum, amount_count, amount_min, amount_max
+            )
+            SELECT
+                created_at, status_id, type_id, category_id,
+                sum(amount), count(*), min(amount), max(amount)
+            FROM {cash_flow_table}
+            WHERE created_at BETWEEN %s AND %s
+            GROUP BY created_at, status_id, type_id, category_id
+            """,
+            [date_from, date_to],
+        )
+        mark_cash_flows_changed()
+        return cursor.rowcount
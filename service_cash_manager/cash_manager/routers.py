@@ -0,0 +1,94 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DB = "default"
+REPLICA_DB = "replica"
+
+# Чтение разрешено с реплики (read-only участок: список, выгрузка, отчет)
+_read_from_replica: ContextVar[bool] = ContextVar(
+    "cash_manager_read_from_replica",
+    default=False,
+)
+# Запрос закреплен за primary (недавняя запись в этой сессии)
+_pinned_to_primary: ContextVar[bool] = ContextVar(
+    "cash_manager_pinned_to_primary",
+    default=False,
+)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB in settings.DATABASES
+
+
+def is_pinned_to_primary() -> bool:
+    """Закреплен ли текущий запрос за primary (см. pinned_to_primary)."""
+    return _pinned_to_primary.get()
+
+
+def read_db() -> str:
+    """
+    БД для read-only запроса: реплика, если она настроена и запрос не
+    закреплен за primary после записи.
+
+    :return: Алиас БД.
+    """
+    if replica_configured() and not is_pinned_to_primary():
+        return REPLICA_DB
+    return PRIMARY_DB
+
+
+@contextmanager
+def read_from_replica(enabled: bool = True) -> Iterator[str]:
+    """
+    Участок кода, чтения которого направляются на реплику (см. read_db).
+
+    Запросы вне участка, а также все записи, выполняются на primary.
+    QuerySet, который вычисляется после выхода из участка (например, при
+    потоковой выдаче), нужно привязать к БД явно: queryset.using(read_db()).
+
+    :param enabled: False - участок без реплики (чтение с primary).
+
+    :return: Алиас БД для чтения на участке.
+    """
+    token = _read_from_replica.set(enabled)
+    try:
+        yield read_db() if enabled else PRIMARY_DB
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def pinned_to_primary(pinned: bool = True) -> Iterator[None]:
+    """Закрепление чтений за primary (read-your-writes)."""
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизация запросов между primary (default) и репликой (replica).
+
+    Записи и чтения по умолчанию - на primary; на реплику направляются
+    только чтения внутри read_from_replica().
+    """
+
+    def db_for_read(self, model, **hints) -> str:
+        if _read_from_replica.get():
+            return read_db()
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints) -> str:
+        # Явно: иначе объект, прочитанный с реплики, сохранялся бы в нее
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db != REPLICA_DB
@@ -0,0 +1,89 @@
+import re
+from functools import lru_cache
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Q, Value
+from django.db.models.functions import Upper
+
+# Конфигурация полнотекстового поиска (морфология) по комментариям ДДС
+SEARCH_CONFIG = "russian"
+# Порог сходства наименований справочников (как pg_trgm.similarity_threshold)
+TITLE_SIMILARITY_THRESHOLD = 0.3
+
+WORD_RE = re.compile(r"\w+")
+
+
+def search_comments(queryset, value: str):
+    """
+    Фильтр ДДС по комментарию.
+
+    Полнотекстовый поиск по comment_search (tsvector, GIN-индекс) с учетом
+    морфологии, либо - для опечаток и частей слов - сходство по триграммам
+    со словами комментария (UPPER(comment) %> ..., GIN-индекс pg_trgm).
+
+    :param queryset: QuerySet ДДС.
+    :param value: Строка поиска (синтаксис websearch: "фраза", or, -слово).
+
+    :return: Отфильтрованный QuerySet.
+    """
+    return queryset.alias(comment_upper=Upper("comment")).filter(
+        Q(comment_search=_comment_query(value))
+        | Q(comment_upper__trigram_word_similar=Upper(Value(value))),
+    )
+
+
+def rank_comments(queryset, value: str):
+    """
+    Релевантность ДДС строке поиска: ts_rank по comment_search плюс
+    сходство по триграммам (аннотация search_rank).
+
+    :param queryset: QuerySet ДДС (отфильтрованный search_comments).
+    :param value: Строка поиска.
+
+    :return: QuerySet с аннотацией search_rank.
+    """
+    return queryset.annotate(
+        search_rank=SearchRank(F("comment_search"), _comment_query(value))
+        + TrigramWordSimilarity(Upper(Value(value)), Upper("comment")),
+    )
+
+
+@lru_cache(maxsize=4096)
+def trigrams(value: str) -> frozenset[str]:
+    """
+    Триграммы строки, как в pg_trgm: слова в нижнем регистре, дополненные
+    двумя пробелами слева и одним справа.
+
+    :param value: Строка.
+
+    :return: Множество триграмм.
+    """
+    grams = set()
+    for word in WORD_RE.findall(value.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def title_similarity(value: str, title: str) -> float:
+    """
+    Сходство строки поиска с наименованием (как similarity() pg_trgm).
+
+    :param value: Строка поиска.
+    :param title: Наименование.
+
+    :return: Доля общих триграмм, 0..1.
+    """
+    value_grams = trigrams(value)
+    title_grams = trigrams(title)
+    if not value_grams or not title_grams:
+        return 0.0
+    return len(value_grams & title_grams) / len(value_grams | title_grams)
+
+
+def _comment_query(value: str) -> SearchQuery:
+    return SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
@@ -0,0 +1,152 @@
+from typing import Any
+from uuid import UUID
+
+from django.core.exceptions import ValidationError
+
+from .models import CashFlow
+from .taxonomy import TaxonomyItem, TaxonomySnapshot
+
+CASH_FLOW_OBJECT = "cash_flow"
+CASH_FLOW_REFERENCE_FIELDS = ("status", "type", "category", "subcategory")
+CASH_FLOW_VALUE_FIELDS = ("amount", "comment")
+CASH_FLOW_WRITABLE_FIELDS = (
+    *CASH_FLOW_REFERENCE_FIELDS,
+    *CASH_FLOW_VALUE_FIELDS,
+)
+CASH_FLOW_REQUIRED_FIELDS = ("status", "type", "amount")
+
+
+def serialize_cash_flow(
+    cash_flow: CashFlow,
+    snapshot: TaxonomySnapshot,
+) -> dict[str, Any]:
+    """
+    Представление ДДС для API.
+
+    Наименования справочников берутся из снимка taxonomy, поэтому
+    сериализация не делает запросов в БД.
+
+    :param cash_flow: ДДС.
+    :param snapshot: Снимок справочников ДДС.
+
+    :return: Словарь для JSON-ответа.
+    """
+    return {
+        "id": cash_flow.id,
+        "object": CASH_FLOW_OBJECT,
+        "created_at": cash_flow.created_at,
+        "status": _reference(snapshot.statuses, cash_flow.status_id),
+        "type": _reference(snapshot.types, cash_flow.type_id),
+        "category": _reference(snapshot.categories, cash_flow.category_id),
+        "subcategory": _reference(
+            snapshot.subcategories,
+            cash_flow.subcategory_id,
+        ),
+        "amount": cash_flow.amount,
+        "comment": cash_flow.comment,
+    }
+
+
+def build_cash_flow(
+    data: Any,
+    snapshot: TaxonomySnapshot,
+    instance: CashFlow | None = None,
+) -> tuple[CashFlow, list[str]]:
+    """
+    Заполнение и проверка ДДС по данным запроса API.
+
+    Поля проверяются валидаторами модели (CashFlow.clean_fields), ссылки на
+    справочники и их связанность - CashFlow.validate_taxonomy по снимку,
+    т.е. без запросов в БД.
+
+    :param data: Данные запроса (JSON-объект).
+    :param snapshot: Снимок справочников ДДС.
+    :param instance: Изменяемый ДДС (None - создание нового).
+
+    :raises ValidationError: Данные не прошли проверку.
+
+    :return: ДДС (не сохранен) и список измененных полей.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("Ожидается JSON-объект.")
+
+    errors: dict[str, list[str]] = {}
+    if unknown := sorted(set(data) - set(CASH_FLOW_WRITABLE_FIELDS)):
+        errors["__all__"] = [f"Неизвестные поля: {', '.join(unknown)}."]
+
+    cash_flow = instance or CashFlow()
+    if instance is None:
+        for name in CASH_FLOW_REQUIRED_FIELDS:
+            if data.get(name) in (None, ""):
+                errors[name] = ["Обязательное поле."]
+
+    changed = []
+    for name in CASH_FLOW_REFERENCE_FIELDS:
+        if name not in data or name in errors:
+            continue
+        value = data[name]
+        if value in (None, ""):
+            if not CashFlow._meta.get_field(name).null:
+                errors[name] = ["Обязательное поле."]
+                continue
+            value = None
+        else:
+            try:
+                value = UUID(str(value))
+            except ValueError:
+                errors[name] = ["Ожидается UUID."]
+                continue
+        setattr(cash_flow, f"{name}_id", value)
+        changed.append(name)
+
+    for name in CASH_FLOW_VALUE_FIELDS:
+        if name in data and name not in errors:
+            setattr(cash_flow, name, data[name] if data[name] != "" else None)
+            changed.append(name)
+
+    # Комментарий необязателен (null=True), как и при импорте
+    exclude = {
+        field.name
+        for field in CashFlow._meta.concrete_fields
+        if field.name not in CASH_FLOW_VALUE_FIELDS
+    }
+    if cash_flow.comment is None:
+        exclude.add("comment")
+    try:
+        cash_flow.clean_fields(exclude=exclude | set(errors))
+    except ValidationError as ex:
+        errors.update(ex.message_dict)
+
+    if not errors:
+        try:
+            cash_flow.validate_taxonomy(snapshot)
+        except ValidationError as ex:
+            errors.update(ex.message_dict)
+
+    if errors:
+        raise ValidationError(errors)
+
+    return cash_flow, changed
+
+
+def validation_errors(ex: ValidationError) -> dict[str, list[str]]:
+    """
+    Ошибки проверки в виде {поле: [сообщения]}.
+
+    :param ex: Ошибка проверки.
+
+    :return: Словарь ошибок (общие ошибки - под ключом __all__).
+    """
+    if hasattr(ex, "error_dict"):
+        return ex.message_dict
+    return {"__all__": ex.messages}
+
+
+def _reference(
+    items: dict[UUID, TaxonomyItem],
+    item_id: UUID | None,
+) -> dict[str, Any] | None:
+    if item_id is None:
+        return None
+    item = items.get(item_id)
+    return {"id": item_id, "title": item.title if item else None}
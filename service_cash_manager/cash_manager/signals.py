@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+from .data_version import mark_cash_flows_changed
+from .instrumentation import install_query_wrapper
+from .metrics import install_db_query_wrapper
+from .models import (
+    CashFlow,
+    CashFlowStatus,
+    CashFlowType,
+    CashFlowCategory,
+    CashFlowSubCategory,
+    CashFlowCategoryByType,
+    CashFlowCategoryBySubcategory,
+)
+from .taxonomy import taxonomy
+
+TAXONOMY_MODELS = (
+    CashFlowStatus,
+    CashFlowType,
+    CashFlowCategory,
+    CashFlowSubCategory,
+    CashFlowCategoryByType,
+    CashFlowCategoryBySubcategory,
+)
+
+
+def invalidate_taxonomy(sender, **kwargs) -> None:
+    """Сброс кэша справочников ДДС после фиксации изменений в БД."""
+    transaction.on_commit(taxonomy.invalidate)
+
+
+for model in TAXONOMY_MODELS:
+    post_save.connect(
+        invalidate_taxonomy,
+        sender=model,
+        dispatch_uid=f"invalidate_taxonomy_save_{model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_taxonomy,
+        sender=model,
+        dispatch_uid=f"invalidate_taxonomy_delete_{model.__name__}",
+    )
+
+
+def invalidate_cash_flow_version(sender, **kwargs) -> None:
+    """
+    Увеличение версии данных ДДС после сохранения ДДС.
+
+    post_delete не подключается: получатель сигнала отключает быстрый
+    DELETE у QuerySet.delete(), поэтому пути удаления вызывают
+    mark_cash_flows_changed явно.
+    """
+    mark_cash_flows_changed()
+
+
+post_save.connect(
+    invalidate_cash_flow_version,
+    sender=CashFlow,
+    dispatch_uid="invalidate_cash_flow_version_save",
+)
+
+
+def configure_db_connection(sender, connection, **kwargs) -> None:
+    """Размер кэша prepared statements psycopg для соединения с Postgres."""
+    if connection.vendor == "postgresql":
+        connection.connection.prepared_max = settings.POSTGRES_PREPARED_MAX
+
+
+connection_created.connect(
+    configure_db_connection,
+    dispatch_uid="configure_db_connection",
+)
+
+
+def instrument_db_connection(sender, connection, **kwargs) -> None:
+    """Учет SQL-запросов соединения в метриках HTTP-запроса."""
+    install_query_wrapper(connection)
+
+
+# Без инструментирования wrapper не подключается - нет накладных расходов
+if settings.PERFORMANCE_INSTRUMENTATION:
+    connection_created.connect(
+        instrument_db_connection,
+        dispatch_uid="instrument_db_connection",
+    )
+
+
+def observe_db_queries(sender, connection, **kwargs) -> None:
+    """Учет времени SQL-запросов соединения в метриках /metrics."""
+    install_db_query_wrapper(connection)
+
+
+if settings.METRICS_ENABLED:
+    connection_created.connect(
+        observe_db_queries,
+        dispatch_uid="observe_db_queries",
+    )
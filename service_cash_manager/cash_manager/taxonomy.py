@@ -0,0 +1,417 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from .data_version import DataVersion
+from .models import (
+    CashFlowStatus,
+    CashFlowType,
+    CashFlowCategory,
+    CashFlowSubCategory,
+    CashFlowCategoryByType,
+    CashFlowCategoryBySubcategory,
+)
+from .search import TITLE_SIMILARITY_THRESHOLD, WORD_RE, title_similarity
+
+TAXONOMY_VERSION_KEY = "cash_manager:taxonomy:version"
+TAXONOMY_VERSION_SEQUENCE = "cash_manager.taxonomy_version_seq"
+TAXONOMY_VERSION_CHECK_INTERVAL = 1.0
+# Вид справочника -> атрибут снимка
+TAXONOMY_KINDS = {
+    "status": "statuses",
+    "type": "types",
+    "category": "categories",
+    "subcategory": "subcategories",
+}
+# Виды, в фильтре которых ожидается одно наименование (наиболее похожие)
+TAXONOMY_BEST_MATCH_KINDS = frozenset({"category", "subcategory"})
+
+
+@dataclass(frozen=True)
+class TaxonomyItem:
+    """Справочная сущность ДДС (статус, тип, категория, подкатегория)."""
+
+    id: UUID
+    title: str
+    alias: str
+
+
+class TitlePrefixIndex:
+    """
+    Префиксный индекс наименований справочника.
+
+    Ключи - наименование и каждое его слово в нижнем регистре, в
+    отсортированном списке: поиск по префиксу - bisect, без перебора всех
+    наименований.
+    """
+
+    def __init__(self, items: dict[UUID, TaxonomyItem]) -> None:
+        keys = []
+        for item in items.values():
+            title = item.title.casefold()
+            keys.append((title, 0, item.title, item.id))
+            for word in WORD_RE.findall(title)[1:]:
+                keys.append((word, 1, item.title, item.id))
+        keys.sort()
+        self._keys = keys
+        self._prefixes = [key[0] for key in keys]
+
+    def search(self, prefix: str) -> list[UUID]:
+        """
+        Справочники, наименование или слово наименования которых начинается
+        с prefix (без учета регистра).
+
+        :param prefix: Префикс.
+
+        :return: ID: сначала совпадения с начала наименования, затем - со
+            слова, внутри - по наименованию.
+        """
+        prefix = prefix.casefold()
+        matches = []
+        start = bisect_left(self._prefixes, prefix)
+        for position in range(start, len(self._keys)):
+            key, rank, title, item_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            matches.append((rank, title, item_id))
+
+        matches.sort(key=lambda match: (match[0], match[1]))
+        return list(dict.fromkeys(item_id for _, _, item_id in matches))
+
+
+@dataclass
+class TaxonomySnapshot:
+    """Снимок справочников ДДС и связей между ними."""
+
+    statuses: dict[UUID, TaxonomyItem] = field(default_factory=dict)
+    types: dict[UUID, TaxonomyItem] = field(default_factory=dict)
+    categories: dict[UUID, TaxonomyItem] = field(default_factory=dict)
+    subcategories: dict[UUID, TaxonomyItem] = field(default_factory=dict)
+
+    categories_by_type: dict[UUID, tuple[UUID, ...]] = field(
+        default_factory=dict,
+    )
+    types_by_category: dict[UUID, tuple[UUID, ...]] = field(
+        default_factory=dict,
+    )
+    subcategories_by_category: dict[UUID, tuple[UUID, ...]] = field(
+        default_factory=dict,
+    )
+    categories_by_subcategory: dict[UUID, tuple[UUID, ...]] = field(
+        default_factory=dict,
+    )
+    title_indexes: dict[str, TitlePrefixIndex] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls) -> "TaxonomySnapshot":
+        """
+        Загрузка всех справочников ДДС из БД (по одному запросу на таблицу).
+
+        :return: Снимок справочников.
+        """
+        snapshot = cls(
+            statuses=cls._load_items(CashFlowStatus),
+            types=cls._load_items(CashFlowType),
+            categories=cls._load_items(CashFlowCategory),
+            subcategories=cls._load_items(CashFlowSubCategory),
+        )
+
+        categories_by_type: dict[UUID, set[UUID]] = {}
+        types_by_category: dict[UUID, set[UUID]] = {}
+        for type_id, category_id in CashFlowCategoryByType.objects.values_list(
+            "type_id",
+            "category_id",
+        ):
+            categories_by_type.setdefault(type_id, set()).add(category_id)
+            types_by_category.setdefault(category_id, set()).add(type_id)
+
+        subcategories_by_category: dict[UUID, set[UUID]] = {}
+        categories_by_subcategory: dict[UUID, set[UUID]] = {}
+        for category_id, subcategory_id in (
+            CashFlowCategoryBySubcategory.objects.values_list(
+                "category_id",
+                "subcategory_id",
+            )
+        ):
+            subcategories_by_category.setdefault(category_id, set()).add(
+                subcategory_id,
+            )
+            categories_by_subcategory.setdefault(subcategory_id, set()).add(
+                category_id,
+            )
+
+        snapshot.categories_by_type = snapshot._sort_links(
+            categories_by_type,
+            snapshot.categories,
+        )
+        snapshot.types_by_category = snapshot._sort_links(
+            types_by_category,
+            snapshot.types,
+        )
+        snapshot.subcategories_by_category = snapshot._sort_links(
+            subcategories_by_category,
+            snapshot.subcategories,
+        )
+        snapshot.categories_by_subcategory = snapshot._sort_links(
+            categories_by_subcategory,
+            snapshot.categories,
+        )
+        snapshot.title_indexes = {
+            kind: TitlePrefixIndex(snapshot.items(kind))
+            for kind in TAXONOMY_KINDS
+        }
+
+        return snapshot
+
+    def items(self, kind: str) -> dict[UUID, TaxonomyItem]:
+        """
+        Справочник снимка по виду (status, type, category, subcategory).
+
+        :raises KeyError: Неизвестный вид справочника.
+        """
+        return getattr(self, TAXONOMY_KINDS[kind])
+
+    def filter_ids(self, kind: str, value: str) -> list[UUID]:
+        """
+        ID справочников для фильтра ДДС: UUID (выбран в подсказках) или
+        наименование с опечатками (search_title_ids).
+
+        :param kind: Вид справочника.
+        :param value: UUID или строка поиска.
+
+        :return: ID.
+        """
+        try:
+            return [UUID(value)]
+        except ValueError:
+            return search_title_ids(
+                self.items(kind),
+                value,
+                best_only=kind in TAXONOMY_BEST_MATCH_KINDS,
+            )
+
+    def autocomplete(
+        self,
+        kind: str,
+        value: str,
+        limit: int,
+    ) -> list[TaxonomyItem]:
+        """
+        Подсказки наименований справочника для ввода value.
+
+        Совпадения по префиксу берутся из префиксного индекса; если их нет
+        (опечатка) - похожие по триграммам (search_title_ids).
+
+        :param kind: Вид справочника.
+        :param value: Введенная строка (пустая - все по наименованию).
+        :param limit: Макс. кол-во подсказок.
+
+        :return: Справочники.
+        """
+        items = self.items(kind)
+        value = value.strip()
+        if not value:
+            ids = [
+                item.id
+                for item in sorted(items.values(), key=lambda i: i.title)
+            ]
+        else:
+            ids = self.title_indexes[kind].search(value) or search_title_ids(
+                items,
+                value,
+            )
+        return [items[item_id] for item_id in ids[:limit]]
+
+    @staticmethod
+    def _load_items(model) -> dict[UUID, TaxonomyItem]:
+        return {
+            item_id: TaxonomyItem(id=item_id, title=title, alias=alias)
+            for item_id, title, alias in model.objects.values_list(
+                "id",
+                "title",
+                "alias",
+            )
+        }
+
+    @staticmethod
+    def _sort_links(
+        links: dict[UUID, set[UUID]],
+        items: dict[UUID, TaxonomyItem],
+    ) -> dict[UUID, tuple[UUID, ...]]:
+        return {
+            key: tuple(sorted(ids, key=lambda item_id: items[item_id].title))
+            for key, ids in links.items()
+        }
+
+
+TAXONOMY_VERSION = DataVersion(TAXONOMY_VERSION_KEY, TAXONOMY_VERSION_SEQUENCE)
+
+
+class Taxonomy:
+    """
+    In-process кэш справочников ДДС: тип -> категория -> подкатегория.
+
+    Снимок загружается один раз на процесс (worker) и перечитывается, когда
+    меняется версия справочников (sequence Postgres, копия в Django cache).
+    Версия увеличивается сигналами при изменении справочников, поэтому все
+    worker-ы видят одну версию.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._snapshot: TaxonomySnapshot | None = None
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    @property
+    def snapshot(self) -> TaxonomySnapshot:
+        """
+        Актуальный снимок справочников.
+
+        Версия в Django cache проверяется не чаще, чем раз в
+        TAXONOMY_VERSION_CHECK_INTERVAL секунд.
+        """
+        now = monotonic()
+        if (
+            self._snapshot is not None
+            and now - self._checked_at < TAXONOMY_VERSION_CHECK_INTERVAL
+        ):
+            return self._snapshot
+
+        version = self.version()
+        with self._lock:
+            if self._snapshot is None or self._version != version:
+                self._snapshot = TaxonomySnapshot.load()
+                self._version = version
+            self._checked_at = now
+
+            return self._snapshot
+
+    async def asnapshot(self) -> TaxonomySnapshot:
+        """
+        Актуальный снимок справочников для async-кода.
+
+        Пока снимок свежий, возвращается без перехода в sync-поток;
+        проверка версии и перезагрузка выполняются через sync_to_async.
+        """
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and monotonic() - self._checked_at < TAXONOMY_VERSION_CHECK_INTERVAL
+        ):
+            return snapshot
+
+        return await sync_to_async(lambda: self.snapshot)()
+
+    @staticmethod
+    def version() -> int:
+        """
+        Текущая версия справочников.
+
+        :return: Версия.
+        """
+        return TAXONOMY_VERSION.get()
+
+    @staticmethod
+    async def aversion() -> int:
+        return await TAXONOMY_VERSION.aget()
+
+    def invalidate(self) -> None:
+        """Увеличение версии справочников и сброс локального снимка."""
+        TAXONOMY_VERSION.bump()
+
+        with self._lock:
+            self._snapshot = None
+            self._version = None
+
+    def categories_for_type(self, type_id: UUID) -> list[TaxonomyItem]:
+        snapshot = self.snapshot
+        return [
+            snapshot.categories[c_id]
+            for c_id in snapshot.categories_by_type.get(type_id, ())
+        ]
+
+    def subcategories_for_category(
+        self,
+        category_id: UUID,
+    ) -> list[TaxonomyItem]:
+        snapshot = self.snapshot
+        return [
+            snapshot.subcategories[sc_id]
+            for sc_id in snapshot.subcategories_by_category.get(category_id, ())
+        ]
+
+    def is_category_of_type(self, category_id: UUID, type_id: UUID) -> bool:
+        """
+        Проверка, что категория относится к типу ДДС.
+
+        :param category_id: ID категории.
+        :param type_id: ID типа ДДС.
+
+        :return: True - категория связана с типом.
+        """
+        return category_id in self.snapshot.categories_by_type.get(
+            type_id,
+            (),
+        )
+
+    def is_subcategory_of_category(
+        self,
+        subcategory_id: UUID,
+        category_id: UUID,
+    ) -> bool:
+        """
+        Проверка, что подкатегория связана с категорией.
+
+        :param subcategory_id: ID подкатегории.
+        :param category_id: ID категории.
+
+        :return: True - подкатегория связана с категорией.
+        """
+        return subcategory_id in self.snapshot.subcategories_by_category.get(
+            category_id,
+            (),
+        )
+
+
+def search_title_ids(
+    items: dict[UUID, TaxonomyItem],
+    value: str,
+    best_only: bool = False,
+) -> list[UUID]:
+    """
+    Поиск справочников по наименованию без запросов в БД: точное
+    совпадение, вхождение (без учета регистра) или сходство по триграммам
+    не ниже TITLE_SIMILARITY_THRESHOLD (опечатки).
+
+    :param items: Справочники по ID (из снимка).
+    :param value: Строка поиска.
+    :param best_only: Только наиболее похожие (фильтры, где ожидается одно
+        наименование: категория, подкатегория).
+
+    :return: ID по убыванию сходства.
+    """
+    folded = value.casefold()
+    ranked = []
+    for item in items.values():
+        title = item.title.casefold()
+        if title == folded:
+            score = 3.0
+        elif folded in title:
+            score = 2.0 + title_similarity(value, item.title)
+        else:
+            score = title_similarity(value, item.title)
+            if score < TITLE_SIMILARITY_THRESHOLD:
+                continue
+        ranked.append((score, item.id))
+
+    ranked.sort(key=lambda pair: pair[0], reverse=True)
+    if best_only and ranked:
+        ranked = [pair for pair in ranked if pair[0] == ranked[0][0]]
+    return [item_id for _, item_id in ranked]
+
+
+taxonomy = Taxonomy()
@@ -0,0 +1,180 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.db.models import Count, Max, Min, Sum
+
+from ..models import (
+    CashFlow,
+    CashFlowCategory,
+    CashFlowCategoryBySubcategory,
+    CashFlowCategoryByType,
+    CashFlowDailyRollup,
+    CashFlowStatus,
+    CashFlowSubCategory,
+    CashFlowType,
+)
+from ..taxonomy import taxonomy
+
+# Кэш в памяти процесса: тесты не читают и не портят общий кэш сервиса
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+def create_taxonomy(prefix: str = "test") -> dict:
+    """
+    Справочники ДДС со связями: статус, тип -> категория -> подкатегория.
+
+    :param prefix: Префикс наименований (уникальность title/alias).
+
+    :return: {status, type, category, subcategory}.
+    """
+    items = {
+        "status": CashFlowStatus.objects.create(
+            title=f"{prefix}-status",
+            alias=f"{prefix}_status",
+        ),
+        "type": CashFlowType.objects.create(
+            title=f"{prefix}-type",
+            alias=f"{prefix}_type",
+        ),
+        "category": CashFlowCategory.objects.create(
+            title=f"{prefix}-category",
+            alias=f"{prefix}_category",
+        ),
+        "subcategory": CashFlowSubCategory.objects.create(
+            title=f"{prefix}-subcategory",
+            alias=f"{prefix}_subcategory",
+        ),
+    }
+    CashFlowCategoryByType.objects.create(
+        type=items["type"],
+        category=items["category"],
+    )
+    CashFlowCategoryBySubcategory.objects.create(
+        category=items["category"],
+        subcategory=items["subcategory"],
+    )
+    # Сигналы сбрасывают снимок справочников после commit, которого в
+    # TestCase нет
+    taxonomy.invalidate()
+    return items
+
+
+def create_api_user(username: str, *actions: str):
+    """
+    Пользователь с правами модели CashFlow.
+
+    :param username: Имя пользователя.
+    :param actions: Действия: view, add, change, delete.
+    """
+    user = get_user_model().objects.create_user(username)
+    user.user_permissions.add(
+        *Permission.objects.filter(
+            content_type__app_label="cash_manager",
+            codename__in=[f"{action}_cashflow" for action in actions],
+        )
+    )
+    return user
+
+
+def create_cash_flows(
+    taxonomy_items: dict,
+    count: int,
+    created_at: date,
+) -> list[CashFlow]:
+    """
+    ДДС за дату created_at.
+
+    created_at - auto_now_add (bulk_create ставит текущую дату), поэтому
+    дата задается UPDATE после вставки.
+    """
+    cash_flows = CashFlow.objects.bulk_create(
+        CashFlow(
+            **taxonomy_items,
+            amount=Decimal(i + 1),
+            comment=f"Оплата по договору {i}",
+        )
+        for i in range(count)
+    )
+    CashFlow.objects.filter(
+        id__in=[cash_flow.id for cash_flow in cash_flows],
+    ).update(created_at=created_at)
+    return list(
+        CashFlow.objects.filter(
+            id__in=[cash_flow.id for cash_flow in cash_flows],
+        ).order_by("amount")
+    )
+
+
+def explain(queryset, **planner_settings) -> str:
+    """
+    План запроса (EXPLAIN) с настройками планировщика на время текущей
+    транзакции (SET LOCAL), например enable_seqscan=False: на маленьких
+    тестовых таблицах seq scan дешевле любого индекса.
+    """
+    with connection.cursor() as cursor:
+        for name, value in planner_settings.items():
+            cursor.execute(f"SET LOCAL {name} = {'on' if value else 'off'}")
+    return queryset.explain()
+
+
+def index_names(index: str) -> set[str]:
+    """
+    Имена индекса таблицы cash_flow и его индексов на партициях.
+
+    :param index: Имя индекса (Meta.indexes).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits AS i
+            JOIN pg_class AS c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [f"cash_manager.{index}"],
+        )
+        return {index} | {name for name, in cursor.fetchall()}
+
+
+def rollup_groups() -> dict:
+    """
+    Агрегаты cash_flow_daily_rollup: (день, статус, тип, категория) ->
+    (сумма, кол-во, мин., макс.).
+    """
+    return {
+        (r.day, r.status_id, r.type_id, r.category_id): (
+            r.amount_sum,
+            r.amount_count,
+            r.amount_min,
+            r.amount_max,
+        )
+        for r in CashFlowDailyRollup.objects.all()
+    }
+
+
+def cash_flow_groups() -> dict:
+    """Те же агрегаты, посчитанные по cash_flow (см. rollup_groups)."""
+    return {
+        (
+            row["created_at"],
+            row["status_id"],
+            row["type_id"],
+            row["category_id"],
+        ): (row["sum"], row["count"], row["min"], row["max"])
+        for row in CashFlow.objects.values(
+            "created_at",
+            "status_id",
+            "type_id",
+            "category_id",
+        ).annotate(
+            sum=Sum("amount"),
+            count=Count("id"),
+            min=Min("amount"),
+            max=Max("amount"),
+        ).order_by()
+    }
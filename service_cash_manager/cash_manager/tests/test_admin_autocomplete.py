@@ -0,0 +1,119 @@
+import re
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import CashFlow, CashFlowCategory, CashFlowSubCategory
+from .base import TEST_CACHES, create_taxonomy
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ChainedAutocompleteTests(TestCase):
+    """
+    Подсказки полей формы ДДС: категории - выбранного типа, подкатегории -
+    выбранной категории (data-chained-field поля формы, GET-параметр
+    chained_autocomplete.js, autocomplete_parents справочника).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+        cls.taxonomy = create_taxonomy()
+        cls.other_taxonomy = create_taxonomy("other")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def suggestions(self, field_name: str, **params) -> set[str]:
+        """ID подсказок autocomplete Django admin для поля формы ДДС."""
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "",
+                "app_label": "cash_manager",
+                "model_name": "cashflow",
+                "field_name": field_name,
+                **params,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        return {item["id"] for item in response.json()["results"]}
+
+    def ids(self, kind: str, *taxonomies: dict) -> set[str]:
+        return {str(items[kind].id) for items in taxonomies}
+
+    def test_form_fields_name_their_parent_field(self):
+        response = self.client.get(reverse("admin:cash_manager_cashflow_add"))
+        html = response.content.decode()
+
+        for field, parent in (
+            ("category", "type"),
+            ("subcategory", "category"),
+            ("type", None),
+        ):
+            with self.subTest(field=field):
+                select = re.search(rf'<select[^>]* name="{field}"[^>]*>', html)
+                chained = re.search(
+                    r'data-chained-field="(\w+)"',
+                    select.group(),
+                )
+                self.assertEqual(chained and chained.group(1), parent)
+        self.assertContains(response, "cash_manager/chained_autocomplete.js")
+
+    def test_js_parameters_match_autocomplete_parents(self):
+        cash_flow_admin = admin.site._registry[CashFlow]
+        for field, model in (
+            ("category", CashFlowCategory),
+            ("subcategory", CashFlowSubCategory),
+        ):
+            with self.subTest(field=field):
+                # JS передает значение родителя в параметре с его именем
+                self.assertIn(
+                    cash_flow_admin.autocomplete_chained_fields[field],
+                    admin.site._registry[model].autocomplete_parents,
+                )
+
+    def test_categories_are_limited_to_selected_type(self):
+        both = (self.taxonomy, self.other_taxonomy)
+
+        self.assertEqual(
+            self.suggestions("category", type=self.taxonomy["type"].id),
+            self.ids("category", self.taxonomy),
+        )
+        self.assertEqual(
+            self.suggestions("category", type=self.other_taxonomy["type"].id),
+            self.ids("category", self.other_taxonomy),
+        )
+        # Без выбранного типа - все категории
+        self.assertEqual(
+            self.suggestions("category"),
+            self.ids("category", *both),
+        )
+
+    def test_subcategories_are_limited_to_selected_category(self):
+        both = (self.taxonomy, self.other_taxonomy)
+
+        self.assertEqual(
+            self.suggestions(
+                "subcategory",
+                category=self.other_taxonomy["category"].id,
+            ),
+            self.ids("subcategory", self.other_taxonomy),
+        )
+        self.assertEqual(
+            self.suggestions("subcategory"),
+            self.ids("subcategory", *both),
+        )
+
+    def test_invalid_parent_gives_no_suggestions(self):
+        self.assertEqual(
+            self.suggestions("category", type="not-a-uuid"),
+            set(),
+        )
+        # Параметр родителя другого поля не ограничивает подсказки
+        self.assertEqual(
+            self.suggestions("status", type=self.taxonomy["type"].id),
+            self.ids("status", self.taxonomy, self.other_taxonomy),
+        )
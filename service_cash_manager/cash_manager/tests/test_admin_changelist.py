@@ -0,0 +1,275 @@
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..admin import CashFlowAdmin
+from ..admin_changelist import (
+    CURSOR_NEXT,
+    CURSOR_PREV,
+    CURSOR_VAR,
+    EXACT_COUNT_VAR,
+    seek_condition,
+)
+from ..data_version import mark_cash_flows_changed
+from ..imports import IMPORT_FORMAT_JSONL, CashFlowImporter
+from ..models import CashFlow
+from ..taxonomy import TaxonomySnapshot
+from .base import TEST_CACHES, create_cash_flows, create_taxonomy
+
+PAGE_SIZE = 2
+# Номер столбца суммы в списке (GET-параметр o)
+AMOUNT_COLUMN = CashFlowAdmin.list_display.index("amount")
+
+
+def ordering(keyset: list[tuple[str, bool]]) -> list[str]:
+    return [f"-{name}" if descending else name for name, descending in keyset]
+
+
+class KeysetTestCase(TestCase):
+    """
+    ДДС с одинаковыми ключами сортировки: 4 из 7 строк с суммой 2, из них
+    две - за вторую дату; порядок внутри совпадений держится на pk.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        day = date.today()
+        create_cash_flows(cls.taxonomy, 5, day)
+        create_cash_flows(cls.taxonomy, 2, day - timedelta(days=1))
+        CashFlow.objects.filter(amount__in=(2, 3, 4)).update(amount=2)
+
+
+class SeekConditionTests(KeysetTestCase):
+    """seek_condition: строки строго после (до) ключа в порядке keyset."""
+
+    def test_next_and_prev_from_every_row(self):
+        for keyset in (
+            [("amount", False), ("created_at", False), ("pk", True)],
+            [("amount", True), ("created_at", False), ("pk", False)],
+            [("created_at", True), ("amount", True), ("pk", True)],
+        ):
+            order = ordering(keyset)
+            rows = list(
+                CashFlow.objects.order_by(*order).values_list(
+                    "pk",
+                    *[name for name, _ in keyset],
+                )
+            )
+            ids = [row[0] for row in rows]
+            for i, (_, *values) in enumerate(rows):
+                with self.subTest(keyset=keyset, row=i):
+                    after = CashFlow.objects.filter(
+                        seek_condition(keyset, values, CURSOR_NEXT),
+                    ).order_by(*order)
+                    before = CashFlow.objects.filter(
+                        seek_condition(keyset, values, CURSOR_PREV),
+                    ).order_by(*order)
+
+                    self.assertEqual(
+                        list(after.values_list("pk", flat=True)),
+                        ids[i + 1:],
+                    )
+                    self.assertEqual(
+                        list(before.values_list("pk", flat=True)),
+                        ids[:i],
+                    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class KeysetChangeListTests(KeysetTestCase):
+    """
+    Список ДДС в AdminPanel: страницы по cursor, обе стороны совпадений
+    ключа, обратная сортировка и точное кол-во строк (exact_count).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser("admin")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse("admin:cash_manager_cashflow_changelist")
+        patcher = mock.patch.object(CashFlowAdmin, "list_per_page", PAGE_SIZE)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def walk(self, **params) -> tuple[list[list], list[list]]:
+        """
+        Страницы списка по next_cursor до последней и обратно по
+        prev_cursor до первой.
+
+        :return: ID строк страниц вперед и назад.
+        """
+        forward, backward = [], []
+        cl = self.changelist(**params)
+        self.assertTrue(cl.is_keyset)
+        self.assertIsNone(cl.prev_cursor)
+        while True:
+            forward.append([row.pk for row in cl.result_list])
+            if not cl.next_cursor:
+                break
+            cl = self.changelist(**params, **{CURSOR_VAR: cl.next_cursor})
+        while True:
+            backward.append([row.pk for row in cl.result_list])
+            if not cl.prev_cursor:
+                break
+            cl = self.changelist(**params, **{CURSOR_VAR: cl.prev_cursor})
+        return forward, backward
+
+    def expected_pages(self, order: list[str]) -> list[list]:
+        ids = list(
+            CashFlow.objects.order_by(*order).values_list("pk", flat=True),
+        )
+        return [ids[i:i + PAGE_SIZE] for i in range(0, len(ids), PAGE_SIZE)]
+
+    def test_pages_cross_tied_sort_keys(self):
+        # Повторы полей сортировки ChangeList в ключ не попадают
+        self.assertEqual(
+            self.changelist()._get_keyset(),
+            [("amount", False), ("created_at", False), ("pk", True)],
+        )
+
+        forward, backward = self.walk()
+
+        self.assertEqual(
+            forward,
+            self.expected_pages(["amount", "created_at", "-pk"]),
+        )
+        self.assertEqual(backward, forward[::-1])
+
+    def test_reverse_ordering(self):
+        params = {"o": f"-{AMOUNT_COLUMN + 1}"}
+        order = self.changelist(**params).queryset.query.order_by
+        self.assertEqual(order[0], "-amount")
+
+        forward, backward = self.walk(**params)
+
+        self.assertEqual(forward, self.expected_pages(order))
+        self.assertEqual(backward, forward[::-1])
+        amounts = dict(CashFlow.objects.values_list("pk", "amount"))
+        listed = [amounts[pk] for page in forward for pk in page]
+        self.assertEqual(listed, sorted(listed, reverse=True))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {CURSOR_VAR: "not-a-cursor"})
+
+        # IncorrectLookupParameters: Django admin перенаправляет на ?e=1
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].endswith("?e=1"))
+
+    @override_settings(CHANGELIST_EXACT_COUNT_THRESHOLD=0)
+    def test_exact_count_toggle(self):
+        params = {"type": str(self.taxonomy["type"].id)}
+
+        estimated = self.changelist(**params)
+        exact = self.changelist(**params, **{EXACT_COUNT_VAR: 1})
+
+        # Выше порога - оценка планировщика, с exact_count - COUNT(*)
+        self.assertTrue(estimated.result_count_is_estimated)
+        self.assertFalse(exact.result_count_is_estimated)
+        self.assertEqual(exact.result_count, 7)
+        self.assertEqual(exact.full_result_count, 7)
+        # exact_count не фильтр: не попадает в ссылки и кэш-ключ фильтров
+        self.assertNotIn(EXACT_COUNT_VAR, exact.get_filters_params())
+        self.assertIn(EXACT_COUNT_VAR, estimated.exact_count_url)
+        self.assertTrue(self.changelist(**params).result_count_is_estimated)
+
+    def test_exact_count_below_threshold(self):
+        cl = self.changelist()
+
+        self.assertFalse(cl.result_count_is_estimated)
+        self.assertEqual(cl.result_count, 7)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ChangeListCountCacheTests(TestCase):
+    """
+    Кол-ва строк списка ДДС и фасеты берутся из кэша до записи ДДС: запись
+    (сигнал модели, mark_cash_flows_changed, COPY-импорт) после commit
+    меняет версию данных в ключах кэша.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+        cls.taxonomy = create_taxonomy()
+        create_cash_flows(cls.taxonomy, 3, date.today())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse("admin:cash_manager_cashflow_changelist")
+
+    def assertCounts(self, count: int) -> None:
+        """Кол-во с фильтром, всего и фасет типа в списке равны count."""
+        response = self.client.get(
+            self.url,
+            {"status": str(self.taxonomy["status"].id), "_facets": "True"},
+        )
+
+        cl = response.context["cl"]
+        self.assertEqual((cl.result_count, cl.full_result_count), (count,) * 2)
+        self.assertContains(
+            response,
+            f"{self.taxonomy['type'].title} ({count})",
+        )
+
+    def test_counts_are_cached_until_write(self):
+        self.assertCounts(3)
+
+        # bulk_create без mark_cash_flows_changed версию не меняет
+        create_cash_flows(self.taxonomy, 2, date.today())
+
+        self.assertCounts(3)
+
+    def test_model_save_invalidates_counts(self):
+        self.assertCounts(3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CashFlow.objects.create(
+                **self.taxonomy,
+                amount=1,
+                comment="Оплата",
+            )
+
+        self.assertCounts(4)
+
+    def test_mark_cash_flows_changed_invalidates_counts(self):
+        self.assertCounts(3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CashFlow.objects.filter(amount=1).delete()
+            mark_cash_flows_changed()
+
+        self.assertCounts(2)
+
+    def test_copy_import_invalidates_counts(self):
+        self.assertCounts(3)
+        records = [
+            {kind: item.title for kind, item in self.taxonomy.items()}
+            | {"amount": str(amount)}
+            for amount in (5, 6)
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = CashFlowImporter(TaxonomySnapshot.load()).run(
+                io.StringIO("\n".join(map(json.dumps, records))),
+                IMPORT_FORMAT_JSONL,
+            )
+
+        self.assertEqual(result.imported, 2)
+        self.assertCounts(5)
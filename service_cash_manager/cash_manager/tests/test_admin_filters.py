@@ -0,0 +1,83 @@
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .base import TEST_CACHES, create_cash_flows, create_taxonomy
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowTaxonomyFilterTests(TestCase):
+    """
+    Фильтры списка ДДС по справочникам: UUID, наименование и старые имена
+    параметров ({kind}_title) из закладок.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+        cls.taxonomy = create_taxonomy()
+        cls.other_taxonomy = create_taxonomy("other")
+        create_cash_flows(cls.taxonomy, 2, date.today())
+        create_cash_flows(cls.other_taxonomy, 3, date.today())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("admin:cash_manager_cashflow_changelist")
+
+    def result_count(self, params: dict) -> int:
+        response = self.client.get(self.url, {**params, "exact_count": 1})
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"].result_count
+
+    def test_filter_by_uuid_and_title(self):
+        for params in (
+            {"type": str(self.taxonomy["type"].id)},
+            # Наименование ищется с опечатками: у подкатегорий - лучшее
+            {"subcategory": self.taxonomy["subcategory"].title},
+            {"category": str(self.taxonomy["category"].id)},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.result_count(params), 2)
+
+    def test_legacy_parameters_redirect_to_current_names(self):
+        response = self.client.get(
+            self.url,
+            {
+                "category_title": self.other_taxonomy["category"].title,
+                "subcategory_title": self.other_taxonomy["subcategory"].title,
+                "o": "1",
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        location = urlsplit(response["Location"])
+        self.assertEqual(location.path, self.url)
+        self.assertEqual(
+            parse_qs(location.query),
+            {
+                "category": [self.other_taxonomy["category"].title],
+                "subcategory": [self.other_taxonomy["subcategory"].title],
+                "o": ["1"],
+            },
+        )
+        self.assertEqual(
+            self.result_count(parse_qs(location.query)),
+            3,
+        )
+
+    def test_current_parameter_wins_over_legacy(self):
+        response = self.client.get(
+            self.url,
+            {
+                "type": str(self.taxonomy["type"].id),
+                "type_title": self.other_taxonomy["type"].title,
+            },
+        )
+
+        self.assertEqual(
+            parse_qs(urlsplit(response["Location"]).query),
+            {"type": [str(self.taxonomy["type"].id)]},
+        )
@@ -0,0 +1,228 @@
+import re
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..admin import AUTOCOMPLETE_LIMIT
+from ..data_version import cash_flow_version
+from ..models import (
+    CashFlow,
+    CashFlowCategory,
+    CashFlowCategoryBySubcategory,
+    CashFlowCategoryByType,
+    CashFlowStatus,
+    CashFlowSubCategory,
+    CashFlowType,
+)
+from ..taxonomy import taxonomy
+from .base import TEST_CACHES, create_cash_flows
+
+
+# Кол-во SQL-запросов страниц AdminPanel (модель, страница): не зависит от
+# кол-ва строк (N+1); из них 2 - сессия и пользователь. Список ДДС на
+# маленькой таблице считает COUNT(*) точно (на большой - по оценке)
+ADMIN_PAGE_QUERIES = {
+    ("cashflow", "changelist"): 7,
+    ("cashflow", "add"): 2,
+    ("cashflow", "change"): 3,
+    ("cashflowstatus", "changelist"): 5,
+    ("cashflowstatus", "add"): 2,
+    ("cashflowstatus", "change"): 3,
+    ("cashflowsubcategory", "changelist"): 5,
+    ("cashflowsubcategory", "add"): 2,
+    ("cashflowsubcategory", "change"): 3,
+    ("cashflowtype", "changelist"): 5,
+    ("cashflowtype", "add"): 3,
+    ("cashflowtype", "change"): 4,
+    ("cashflowcategory", "changelist"): 5,
+    ("cashflowcategory", "add"): 3,
+    ("cashflowcategory", "change"): 4,
+    ("cashflow", "autocomplete"): 5,
+    ("cashflow", "filter_autocomplete"): 2,
+}
+ADMIN_SIZES = (1, 50)
+# Дата ДДС набора: список ДДС фильтруется по ней
+ADMIN_SEED_DATE = date.today() - timedelta(days=1)
+# Невыбранные варианты <select> (выбранные значения строк inline-форм
+# выводятся всегда)
+OPTION_RE = re.compile(r'<option value="[^"]+"(?![^>]*\bselected)')
+
+
+@override_settings(CACHES=TEST_CACHES)
+class AdminQueryCountTests(TestCase):
+    """
+    Страницы AdminPanel (списки, формы, autocomplete) на наборах из N
+    строк: кол-во SQL-запросов равно ADMIN_PAGE_QUERIES при любом N, а
+    <select> не выводит все строки связанной таблицы.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @staticmethod
+    def seed(size: int) -> dict:
+        """
+        Набор из size строк каждого справочника и ДДС: тип и категория
+        "_0" связаны со всеми категориями/подкатегориями набора (inline
+        формы), у ДДС - разные справочники (строки списка).
+        """
+        def references(model):
+            return model.objects.bulk_create(
+                model(title=f"qc-{i}", alias=f"qc_{i}") for i in range(size)
+            )
+
+        statuses = references(CashFlowStatus)
+        types = references(CashFlowType)
+        categories = references(CashFlowCategory)
+        subcategories = references(CashFlowSubCategory)
+        CashFlowCategoryByType.objects.bulk_create(
+            [
+                CashFlowCategoryByType(type=types[0], category=category)
+                for category in categories
+            ] + [
+                CashFlowCategoryByType(type=type_, category=category)
+                for type_, category in zip(types[1:], categories[1:])
+            ]
+        )
+        CashFlowCategoryBySubcategory.objects.bulk_create(
+            [
+                CashFlowCategoryBySubcategory(
+                    category=categories[0],
+                    subcategory=subcategory,
+                )
+                for subcategory in subcategories
+            ] + [
+                CashFlowCategoryBySubcategory(
+                    category=category,
+                    subcategory=subcategory,
+                )
+                for category, subcategory in zip(
+                    categories[1:],
+                    subcategories[1:],
+                )
+            ]
+        )
+        cash_flows = []
+        for status, type_, category, subcategory in zip(
+            statuses,
+            types,
+            categories,
+            subcategories,
+        ):
+            cash_flows += create_cash_flows(
+                {
+                    "status": status,
+                    "type": type_,
+                    "category": category,
+                    "subcategory": subcategory,
+                },
+                1,
+                ADMIN_SEED_DATE,
+            )
+
+        return {
+            "cashflow": cash_flows[0],
+            "cashflowstatus": statuses[0],
+            "cashflowtype": types[0],
+            "cashflowcategory": categories[0],
+            "cashflowsubcategory": subcategories[0],
+        }
+
+    @staticmethod
+    def pages(objects: dict) -> dict[tuple[str, str], str]:
+        """Страницы (модель, страница) -> URL."""
+        pages = {}
+        for model in admin.site._registry:
+            opts = model._meta
+            if opts.app_label != "cash_manager":
+                continue
+            prefix = f"admin:{opts.app_label}_{opts.model_name}"
+            changelist = reverse(f"{prefix}_changelist")
+            if model is CashFlow:
+                changelist += "?" + urlencode(
+                    {
+                        "created_at__range__gte": ADMIN_SEED_DATE.isoformat(),
+                        "created_at__range__lte": ADMIN_SEED_DATE.isoformat(),
+                    }
+                )
+            pages[opts.model_name, "changelist"] = changelist
+            pages[opts.model_name, "add"] = reverse(f"{prefix}_add")
+            pages[opts.model_name, "change"] = reverse(
+                f"{prefix}_change",
+                args=[objects[opts.model_name].pk],
+            )
+
+        # Подсказки категорий выбранного типа (форма ДДС) и наименований
+        # (фильтры списка ДДС)
+        pages["cashflow", "autocomplete"] = reverse(
+            "admin:autocomplete",
+        ) + "?" + urlencode(
+            {
+                "app_label": "cash_manager",
+                "model_name": "cashflow",
+                "field_name": "category",
+                "term": "qc",
+                "type": objects["cashflowtype"].pk,
+            }
+        )
+        pages["cashflow", "filter_autocomplete"] = reverse(
+            "admin:cash_manager_cashflow_autocomplete",
+            args=["category"],
+        ) + "?q=qc"
+        return pages
+
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        Сброс кэша (кол-ва, страницы списков, подсказки) - считаются
+        запросы к БД, а не попадания в кэш; копии версий данных
+        восстанавливаются, как у работающего сервиса.
+        """
+        cache.clear()
+        taxonomy.version()
+        cash_flow_version()
+
+    def test_page_queries_do_not_grow_with_rows(self):
+        options: dict[tuple[str, str], set[int]] = {}
+        for size in ADMIN_SIZES:
+            with transaction.atomic():
+                objects = self.seed(size)
+                # Сигналы сбрасывают снимок справочников после commit
+                taxonomy.invalidate()
+                for page, url in self.pages(objects).items():
+                    with self.subTest(page=page, size=size):
+                        # Прогрев: снимок справочников, ContentType и т.п.
+                        self.client.get(url)
+                        self.clear_cache()
+                        with self.assertNumQueries(ADMIN_PAGE_QUERIES[page]):
+                            response = self.client.get(url)
+                        self.assertEqual(response.status_code, 200)
+                        options.setdefault(page, set()).add(
+                            len(OPTION_RE.findall(response.content.decode())),
+                        )
+                        if page == ("cashflow", "changelist"):
+                            self.assertEqual(
+                                len(response.context["cl"].result_list),
+                                size,
+                            )
+                        elif page[1].endswith("autocomplete"):
+                            self.assertEqual(
+                                len(response.json()["results"]),
+                                min(size, AUTOCOMPLETE_LIMIT),
+                            )
+                transaction.set_rollback(True)
+            taxonomy.invalidate()
+
+        for page, counts in options.items():
+            with self.subTest(page=page):
+                self.assertEqual(len(counts), 1, "<select> loads whole table")
@@ -0,0 +1,262 @@
+import json
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..data_version import acash_flow_version
+from ..models import CashFlow
+from .base import (
+    TEST_CACHES,
+    create_api_user,
+    create_cash_flows,
+    create_taxonomy,
+)
+
+
+class CashFlowAPITestCase(TestCase):
+    """Общие данные тестов API: справочники и пользователи с правами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        cls.other_taxonomy = create_taxonomy("other")
+        cls.user = create_api_user("writer", "view", "add", "change", "delete")
+        cls.reader = create_api_user("reader", "view")
+
+    def setUp(self):
+        self.async_client.force_login(self.user)
+
+    def data(self, **fields) -> dict:
+        return {
+            "status": str(self.taxonomy["status"].id),
+            "type": str(self.taxonomy["type"].id),
+            "category": str(self.taxonomy["category"].id),
+            "subcategory": str(self.taxonomy["subcategory"].id),
+            "amount": "100.50",
+            "comment": "Оплата",
+            **fields,
+        }
+
+    async def send(self, method: str, url: str, data):
+        return await getattr(self.async_client, method)(
+            url,
+            data=json.dumps(data),
+            content_type="application/json",
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowListAPITests(CashFlowAPITestCase):
+    """GET /api/v1/cash-flows: cursor-пагинация по ключу сортировки и id."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Одна дата у всех строк: порядок страниц держится на id
+        cls.cash_flows = create_cash_flows(cls.taxonomy, 5, date.today())
+        cls.url = reverse("cash_manager:cash_flow_list")
+
+    async def pages(self, **params) -> list[dict]:
+        pages, cursor = [], None
+        while True:
+            response = await self.async_client.get(
+                self.url,
+                {**params, **({"cursor": cursor} if cursor else {})},
+            )
+            self.assertEqual(response.status_code, 200)
+            pages.append(body := response.json())
+            if not (cursor := body["next_cursor"]):
+                self.assertFalse(body["has_more"])
+                return pages
+
+    async def test_cursor_pages_return_every_row_once(self):
+        for ordering in ("-created_at", "created_at", "-amount", "amount"):
+            with self.subTest(ordering=ordering):
+                pages = await self.pages(ordering=ordering, limit=2)
+
+                self.assertEqual(
+                    [len(page["data"]) for page in pages],
+                    [2, 2, 1],
+                )
+                ids = [row["id"] for page in pages for row in page["data"]]
+                self.assertCountEqual(
+                    ids,
+                    [str(cash_flow.id) for cash_flow in self.cash_flows],
+                )
+
+    async def test_amount_ordering_is_kept_across_pages(self):
+        pages = await self.pages(ordering="-amount", limit=2)
+
+        self.assertEqual(
+            [Decimal(row["amount"]) for page in pages for row in page["data"]],
+            [5, 4, 3, 2, 1],
+        )
+
+    async def test_invalid_cursor_and_limit_are_rejected(self):
+        first = await self.async_client.get(
+            self.url,
+            {"ordering": "amount", "limit": 2},
+        )
+        cursor = first.json()["next_cursor"]
+        for params, field in (
+            # cursor другой сортировки
+            ({"ordering": "-amount", "cursor": cursor}, "cursor"),
+            ({"cursor": "not-a-cursor"}, "cursor"),
+            ({"limit": 0}, "limit"),
+            ({"ordering": "title"}, "ordering"),
+        ):
+            with self.subTest(params=params):
+                response = await self.async_client.get(self.url, params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json()["error"]["errors"])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowWriteAPITests(CashFlowAPITestCase):
+    """Создание, изменение и удаление ДДС через API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cash_flow = create_cash_flows(cls.taxonomy, 1, date.today())[0]
+        cls.list_url = reverse("cash_manager:cash_flow_list")
+        cls.detail_url = reverse(
+            "cash_manager:cash_flow_detail",
+            args=[cls.cash_flow.id],
+        )
+
+    async def test_create_returns_cash_flow(self):
+        response = await self.send("post", self.list_url, self.data())
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body["object"], "cash_flow")
+        self.assertEqual(body["type"]["title"], self.taxonomy["type"].title)
+        cash_flow = await CashFlow.objects.aget(pk=body["id"])
+        self.assertEqual(cash_flow.amount, Decimal("100.50"))
+
+    async def test_create_with_invalid_taxonomy_is_rejected(self):
+        other = self.other_taxonomy
+        for field, value in (
+            # категория другого типа, подкатегория другой категории
+            ("category", other["category"].id),
+            ("subcategory", other["subcategory"].id),
+            ("status", uuid4()),
+            ("type", "not-a-uuid"),
+        ):
+            with self.subTest(field=field):
+                response = await self.send(
+                    "post",
+                    self.list_url,
+                    self.data(**{field: str(value)}),
+                )
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json()["error"]["errors"])
+        self.assertEqual(await CashFlow.objects.acount(), 1)
+
+    async def test_create_without_required_fields_is_rejected(self):
+        response = await self.send("post", self.list_url, {"comment": "x"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertLessEqual(
+            {"status", "type", "amount"},
+            set(response.json()["error"]["errors"]),
+        )
+
+    async def test_update_changes_only_sent_fields(self):
+        response = await self.send("patch", self.detail_url, {"amount": "7"})
+
+        self.assertEqual(response.status_code, 200)
+        await self.cash_flow.arefresh_from_db()
+        self.assertEqual(self.cash_flow.amount, Decimal("7"))
+        self.assertEqual(self.cash_flow.type_id, self.taxonomy["type"].id)
+
+    async def test_update_with_invalid_taxonomy_is_rejected(self):
+        response = await self.send(
+            "patch",
+            self.detail_url,
+            {"category": str(self.other_taxonomy["category"].id)},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        await self.cash_flow.arefresh_from_db()
+        self.assertEqual(
+            self.cash_flow.category_id,
+            self.taxonomy["category"].id,
+        )
+
+    async def test_delete_bumps_data_version(self):
+        version = await acash_flow_version()
+
+        response = await self.async_client.delete(self.detail_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["deleted"])
+        self.assertGreater(await acash_flow_version(), version)
+        self.assertFalse(
+            await CashFlow.objects.filter(pk=self.cash_flow.id).aexists(),
+        )
+        self.assertEqual(
+            (await self.async_client.delete(self.detail_url)).status_code,
+            404,
+        )
+
+    async def test_unknown_cash_flow_is_not_found(self):
+        url = reverse("cash_manager:cash_flow_detail", args=[uuid4()])
+
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+        self.assertEqual(
+            (await self.send("patch", url, {"amount": "1"})).status_code,
+            404,
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowAPIPermissionTests(CashFlowAPITestCase):
+    """401 без сессии, 403 без права модели на метод запроса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cash_flow = create_cash_flows(cls.taxonomy, 1, date.today())[0]
+        cls.list_url = reverse("cash_manager:cash_flow_list")
+        cls.detail_url = reverse(
+            "cash_manager:cash_flow_detail",
+            args=[cls.cash_flow.id],
+        )
+
+    async def test_anonymous_requests_are_unauthorized(self):
+        await self.async_client.alogout()
+
+        for response in (
+            await self.async_client.get(self.list_url),
+            await self.send("post", self.list_url, self.data()),
+            await self.async_client.delete(self.detail_url),
+        ):
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(
+                response.json()["error"]["type"],
+                "authentication_error",
+            )
+
+    async def test_view_only_user_cannot_write(self):
+        await self.async_client.aforce_login(self.reader)
+
+        self.assertEqual(
+            (await self.async_client.get(self.detail_url)).status_code,
+            200,
+        )
+        for response in (
+            await self.send("post", self.list_url, self.data()),
+            await self.send("patch", self.detail_url, {"amount": "1"}),
+            await self.async_client.delete(self.detail_url),
+        ):
+            self.assertEqual(response.status_code, 403)
+        self.assertTrue(
+            await CashFlow.objects.filter(pk=self.cash_flow.id).aexists(),
+        )
@@ -0,0 +1,141 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import CashFlow, CashFlowIdempotencyKey
+from .base import TEST_CACHES, create_api_user, create_taxonomy
+
+
+@override_settings(CACHES=TEST_CACHES, API_IDEMPOTENCY_KEY_TTL=3600)
+class CashFlowBulkViewTests(TestCase):
+    """
+    POST /api/v1/cash-flows/bulk: пачка записывается целиком или не
+    записывается, Idempotency-Key повторяет ответ только своему
+    пользователю и только после проверки прав.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        cls.user = create_api_user("writer", "add", "change", "delete")
+        cls.add_only_user = create_api_user("adder", "add")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def item(self, amount="100.00") -> dict:
+        return {
+            "action": "create",
+            "data": {
+                "status": str(self.taxonomy["status"].id),
+                "type": str(self.taxonomy["type"].id),
+                "category": str(self.taxonomy["category"].id),
+                "subcategory": str(self.taxonomy["subcategory"].id),
+                "amount": amount,
+            },
+        }
+
+    def post(self, items: list, key: str | None = None):
+        return self.client.post(
+            reverse("cash_manager:cash_flow_bulk"),
+            data=json.dumps({"items": items}),
+            content_type="application/json",
+            headers={"Idempotency-Key": key} if key else {},
+        )
+
+    def test_invalid_item_rejects_whole_batch(self):
+        response = self.post([self.item(), self.item(amount="abc")], "k1")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [item["index"] for item in response.json()["error"]["items"]],
+            [1],
+        )
+        self.assertFalse(CashFlow.objects.exists())
+        self.assertFalse(CashFlowIdempotencyKey.objects.exists())
+
+    def test_repeat_with_same_key_replays_response(self):
+        items = [self.item(), self.item(amount="200.00")]
+        first = self.post(items, "k1")
+        repeat = self.post(items, "k1")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["create"], 2)
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+        self.assertEqual(repeat.status_code, 200)
+        self.assertEqual(repeat.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(repeat.json(), first.json())
+        self.assertEqual(CashFlow.objects.count(), 2)
+
+    def test_same_key_with_other_body_is_rejected(self):
+        self.post([self.item()], "k1")
+        response = self.post([self.item(amount="200.00")], "k1")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(
+            response.json()["error"]["type"],
+            "idempotency_error",
+        )
+        self.assertEqual(CashFlow.objects.count(), 1)
+
+    def test_key_is_scoped_per_user(self):
+        self.post([self.item()], "k1")
+        self.client.force_login(self.add_only_user)
+
+        # Тот же ключ другого пользователя - новый запрос, не повтор
+        response = self.post([self.item(amount="200.00")], "k1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(CashFlow.objects.count(), 2)
+        self.assertEqual(
+            CashFlowIdempotencyKey.objects.filter(key="k1").count(),
+            2,
+        )
+
+    def test_permissions_are_checked_before_replay(self):
+        cash_flow_id = self.post([self.item()]).json()["data"][0]["id"]
+        items = [
+            {"action": "update", "id": cash_flow_id, "data": {"amount": "5"}},
+            {"action": "delete", "id": cash_flow_id},
+        ]
+        self.assertEqual(self.post(items[:1], "k1").status_code, 200)
+        self.assertEqual(self.post(items[1:], "k2").status_code, 200)
+        self.client.force_login(self.add_only_user)
+
+        for item, key in zip(items, ("k1", "k2")):
+            with self.subTest(action=item["action"]):
+                response = self.post([item], key)
+
+                self.assertEqual(response.status_code, 403)
+                self.assertNotIn("Idempotent-Replayed", response.headers)
+
+    def test_anonymous_request_is_unauthorized(self):
+        self.client.logout()
+
+        self.assertEqual(self.post([self.item()], "k1").status_code, 401)
+
+    def test_expired_key_is_executed_again_and_purged(self):
+        items = [self.item()]
+        self.post(items, "k1")
+        CashFlowIdempotencyKey.objects.update(
+            created_at=timezone.now() - timedelta(hours=2),
+        )
+
+        response = self.post(items, "k1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(CashFlow.objects.count(), 2)
+        self.assertEqual(CashFlowIdempotencyKey.objects.count(), 1)
+
+        CashFlowIdempotencyKey.objects.update(
+            created_at=timezone.now() - timedelta(hours=2),
+        )
+        call_command("purge_idempotency_keys", stdout=StringIO())
+        self.assertFalse(CashFlowIdempotencyKey.objects.exists())
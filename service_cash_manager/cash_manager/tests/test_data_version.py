@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..data_version import bump_cash_flow_version, cash_flow_version
+from ..taxonomy import taxonomy
+from .base import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class DataVersionTests(TestCase):
+    """Версия данных не сбрасывается при потере записи кэша."""
+
+    def test_bump_increases_version(self):
+        version = cash_flow_version()
+        bump_cash_flow_version()
+
+        self.assertGreater(cash_flow_version(), version)
+
+    def test_evicted_version_is_read_from_sequence(self):
+        bump_cash_flow_version()
+        version = cash_flow_version()
+        cache.clear()
+
+        self.assertEqual(cash_flow_version(), version)
+        bump_cash_flow_version()
+        cache.clear()
+        self.assertGreater(cash_flow_version(), version)
+
+    def test_taxonomy_version_survives_cache_clear(self):
+        taxonomy.invalidate()
+        version = taxonomy.version()
+        cache.clear()
+
+        self.assertEqual(taxonomy.version(), version)
+        taxonomy.invalidate()
+        self.assertGreater(taxonomy.version(), version)
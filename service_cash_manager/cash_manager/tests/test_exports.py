@@ -0,0 +1,129 @@
+import csv
+import io
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..exports import CashFlowCSVExporter
+from ..models import CashFlow
+from ..taxonomy import taxonomy
+from .base import TEST_CACHES, create_cash_flows, create_taxonomy
+
+
+def read_csv(content: bytes) -> list[list[str]]:
+    """Строки выгрузки без BOM."""
+    return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowCSVExportTests(TestCase):
+    """
+    Выгрузка ДДС в CSV из AdminPanel: потоковый ответ, фильтры списка без
+    COUNT и страницы, sync/async итератор, экранирование формул.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+        cls.taxonomy = create_taxonomy()
+        cls.other_taxonomy = create_taxonomy("other")
+        cls.month = date.today().replace(day=1)
+        create_cash_flows(cls.taxonomy, 3, cls.month)
+        create_cash_flows(cls.other_taxonomy, 2, cls.month)
+        CashFlow.objects.filter(
+            type=cls.other_taxonomy["type"],
+            amount=1,
+        ).update(comment="=HYPERLINK(\"http://example.com\")")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("admin:cash_manager_cashflow_export_csv")
+
+    def test_export_is_streamed_with_header_and_all_rows(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content.startswith("\ufeff".encode()))
+        rows = read_csv(content)
+        self.assertEqual(rows[0][0], "ID")
+        self.assertEqual(len(rows), 6)
+
+    def test_export_applies_changelist_filters_without_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url,
+                {"type": str(self.taxonomy["type"].id), "cursor": "x"},
+            )
+            rows = read_csv(b"".join(response.streaming_content))
+
+        self.assertEqual(
+            {row[3] for row in rows[1:]},
+            {self.taxonomy["type"].title},
+        )
+        self.assertEqual(len(rows), 4)
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries.captured_queries
+                if "COUNT(" in query["sql"].upper()
+            ],
+        )
+
+    def test_invalid_filter_redirects_to_changelist(self):
+        response = self.client.get(self.url, {"amount__gt": "x"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response["Location"].endswith("?e=1"))
+
+    def test_formula_cells_are_escaped(self):
+        rows = read_csv(
+            b"".join(
+                self.client.get(
+                    self.url,
+                    {"type": str(self.other_taxonomy["type"].id)},
+                ).streaming_content
+            )
+        )
+
+        self.assertIn(
+            "'=HYPERLINK(\"http://example.com\")",
+            [row[7] for row in rows[1:]],
+        )
+        # Сумма - число, а не текст: не экранируется
+        self.assertEqual(
+            sorted(row[6] for row in rows[1:]),
+            ["1.000", "2.000"],
+        )
+
+    def test_sync_and_async_iterators_return_same_rows(self):
+        exporter = CashFlowCSVExporter(
+            CashFlow.objects.order_by("amount", "id"),
+            taxonomy.snapshot,
+            chunk_size=2,
+        )
+
+        async def collect():
+            return [chunk async for chunk in exporter]
+
+        self.assertEqual(async_to_sync(collect)(), list(exporter))
+
+    async def test_asgi_request_streams_async_iterator(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join(
+            [chunk async for chunk in response.streaming_content]
+        )
+        self.assertEqual(len(read_csv(content)), 6)
@@ -0,0 +1,94 @@
+import io
+import json
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from ..imports import IMPORT_FORMAT_JSONL, CashFlowImporter
+from ..models import CashFlow
+from ..taxonomy import TaxonomySnapshot
+from .base import TEST_CACHES, create_taxonomy
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowImporterTests(TestCase):
+    """Импорт ДДС: некорректные строки попадают в отчет, а не прерывают."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+
+    def run_import(self, *records: dict):
+        payload = "\n".join(
+            json.dumps(record, ensure_ascii=False) for record in records
+        )
+        return CashFlowImporter(TaxonomySnapshot.load()).run(
+            io.StringIO(payload),
+            IMPORT_FORMAT_JSONL,
+        )
+
+    def record(self, **values) -> dict:
+        return {
+            "status": self.taxonomy["status"].title,
+            "type": self.taxonomy["type"].title,
+            "category": self.taxonomy["category"].title,
+            "subcategory": self.taxonomy["subcategory"].title,
+            "amount": "10.50",
+            **values,
+        }
+
+    def test_non_string_reference_is_rejected(self):
+        result = self.run_import(
+            self.record(category=5),
+            self.record(status={"title": "x"}),
+            self.record(),
+        )
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual([reject.line for reject in result.rejects], [1, 2])
+        self.assertIn("category", result.rejects[0].error)
+        self.assertIn("status", result.rejects[1].error)
+
+    def test_missing_category_and_subcategory_are_null(self):
+        result = self.run_import(
+            self.record(category=None, subcategory=None),
+            self.record(subcategory=""),
+        )
+
+        self.assertEqual(result.rejects, [])
+        self.assertEqual(result.imported, 2)
+        self.assertEqual(
+            sorted(
+                CashFlow.objects.values_list("category_id", "subcategory_id"),
+                key=str,
+            ),
+            sorted(
+                [(None, None), (self.taxonomy["category"].id, None)],
+                key=str,
+            ),
+        )
+
+    def test_subcategory_without_category_is_rejected(self):
+        result = self.run_import(self.record(category=None))
+
+        self.assertEqual(result.imported, 0)
+        self.assertEqual(len(result.rejects), 1)
+
+    def test_invalid_amount_rejects_only_its_line(self):
+        result = self.run_import(
+            self.record(amount="abc"),
+            self.record(amount="1.23456"),
+            self.record(amount="10" * 20),
+            self.record(amount=None),
+            self.record(amount="99.125"),
+        )
+
+        self.assertEqual(result.imported, 1)
+        self.assertEqual(
+            [reject.line for reject in result.rejects],
+            [1, 2, 3, 4],
+        )
+        self.assertEqual(
+            list(CashFlow.objects.values_list("amount", flat=True)),
+            [Decimal("99.125")],
+        )
@@ -0,0 +1,86 @@
+import re
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ..models import CashFlow
+from .base import (
+    TEST_CACHES,
+    create_cash_flows,
+    create_taxonomy,
+    explain,
+    index_names,
+)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowIndexTests(TestCase):
+    """Индексы cash_flow используются фильтрами и сортировкой списка."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        # Статистика, близкая к реальной: ДДС за 60 дней, разные справочники
+        for days in range(60):
+            create_cash_flows(
+                create_taxonomy(f"t{days}") if days % 10 else cls.taxonomy,
+                50,
+                date.today() - timedelta(days=days),
+            )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE cash_manager.cash_flow")
+
+    def assertUsesIndex(self, plan: str, index: str) -> None:
+        self.assertTrue(
+            any(
+                re.search(rf"\b{re.escape(name)}\b", plan)
+                for name in index_names(index)
+            ),
+            f"{index} is not used:\n{plan}",
+        )
+
+    def test_created_at_range_uses_brin(self):
+        today = date.today()
+        plan = explain(
+            CashFlow.objects.filter(
+                created_at__range=(today - timedelta(days=3), today),
+            ),
+            enable_seqscan=False,
+            enable_indexscan=False,
+        )
+        self.assertUsesIndex(plan, "cash_flow_created_at_brin")
+
+    def test_default_ordering_uses_amount_index(self):
+        plan = explain(
+            CashFlow.objects.order_by("amount", "created_at")[:100],
+            enable_seqscan=False,
+        )
+        self.assertUsesIndex(plan, "cash_flow_amount_created_idx")
+
+    def test_type_filter_with_range_uses_composite_index(self):
+        plan = explain(
+            CashFlow.objects.filter(
+                type=self.taxonomy["type"],
+                created_at__gte=date.today() - timedelta(days=30),
+            ),
+            enable_seqscan=False,
+        )
+        self.assertUsesIndex(plan, "cash_flow_type_created_idx")
+
+    def test_status_filter_with_range_uses_composite_index(self):
+        plan = explain(
+            CashFlow.objects.filter(
+                status=self.taxonomy["status"],
+                created_at__gte=date.today() - timedelta(days=30),
+            ),
+            enable_seqscan=False,
+        )
+        self.assertUsesIndex(plan, "cash_flow_status_created_idx")
+
+    def test_comment_icontains_uses_trigram_index(self):
+        plan = explain(
+            CashFlow.objects.filter(comment__icontains="договор"),
+            enable_seqscan=False,
+        )
+        self.assertUsesIndex(plan, "cash_flow_comment_trgm_idx")
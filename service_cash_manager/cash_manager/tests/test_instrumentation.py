@@ -0,0 +1,120 @@
+import re
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from ..instrumentation import fingerprint, install_query_wrapper, query_wrapper
+from ..middleware import performance_middleware
+
+PERFORMANCE_LOGGER = "cash_manager.performance"
+SERVER_TIMING_RE = re.compile(
+    r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries, (\d+) duplicate"$',
+)
+
+
+def run_queries(*statements: tuple[str, list]) -> HttpResponse:
+    with connection.cursor() as cursor:
+        for sql, params in statements:
+            cursor.execute(sql, params)
+    return HttpResponse()
+
+
+class FingerprintTests(SimpleTestCase):
+    """Отпечаток SQL не зависит от значений параметров."""
+
+    def test_values_are_replaced(self):
+        self.assertEqual(
+            fingerprint(
+                "SELECT *  FROM t WHERE a = 'x''y' AND b = 10\n"
+                "AND c IN (%s, %s, %s) AND d = $1",
+            ),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (?+) AND d = ?",
+        )
+        self.assertEqual(
+            fingerprint("SELECT 1 FROM t WHERE id IN (1, 2)"),
+            fingerprint("SELECT 1 FROM t WHERE id IN (3, 4, 5, 6)"),
+        )
+
+
+@override_settings(
+    PERFORMANCE_INSTRUMENTATION=True,
+    PERFORMANCE_SLOW_QUERY_MS=100,
+    PERFORMANCE_REPEATED_QUERY_THRESHOLD=3,
+)
+class PerformanceMiddlewareTests(TestCase):
+    """
+    Метрики запроса: заголовок Server-Timing и лог медленных (дольше
+    PERFORMANCE_SLOW_QUERY_MS) и повторяющихся SQL-запросов.
+    """
+
+    factory = RequestFactory()
+
+    def setUp(self):
+        # signals.py подключает wrapper, только если метрики включены на старте
+        if query_wrapper not in connection.execute_wrappers:
+            install_query_wrapper(connection)
+            self.addCleanup(connection.execute_wrappers.remove, query_wrapper)
+
+    def get(self, *statements: tuple[str, list]) -> HttpResponse:
+        def get_response(request):
+            return run_queries(*statements)
+
+        middleware = performance_middleware(get_response)
+        return middleware(self.factory.get("/api/v1/cash-flows"))
+
+    def test_server_timing_counts_queries_and_duplicates(self):
+        with self.assertLogs(PERFORMANCE_LOGGER, "INFO") as logs:
+            response = self.get(
+                ("SELECT %s", [1]),
+                ("SELECT %s", [1]),
+                ("SELECT %s", [2]),
+            )
+
+        match = SERVER_TIMING_RE.match(response["Server-Timing"])
+        self.assertIsNotNone(match, response["Server-Timing"])
+        self.assertEqual(match.groups(), ("3", "1"))
+        [record] = [r for r in logs.records if r.msg.startswith("request ")]
+        self.assertEqual(
+            (record.path, record.db_queries, record.duplicate_queries),
+            ("/api/v1/cash-flows", 3, 1),
+        )
+
+    def test_repeated_queries_are_logged_from_threshold(self):
+        with self.assertLogs(PERFORMANCE_LOGGER, "WARNING") as logs:
+            self.get(*[("SELECT %s", [i]) for i in range(3)])
+
+        [record] = logs.records
+        self.assertTrue(record.msg.startswith("repeated query"))
+        self.assertEqual((record.count, record.fingerprint), (3, "SELECT ?"))
+
+        with self.assertNoLogs(PERFORMANCE_LOGGER, "WARNING"):
+            self.get(*[("SELECT %s", [i]) for i in range(2)])
+
+    def test_slow_query_threshold(self):
+        with self.assertLogs(PERFORMANCE_LOGGER, "WARNING") as logs:
+            self.get(("SELECT pg_sleep(%s)", [0.15]))
+
+        [record] = logs.records
+        self.assertTrue(record.msg.startswith("slow query"))
+        self.assertGreaterEqual(record.duration_ms, 100)
+        self.assertEqual(record.fingerprint, "SELECT pg_sleep(?)")
+
+        with self.assertNoLogs(PERFORMANCE_LOGGER, "WARNING"):
+            self.get(("SELECT %s", [1]))
+
+    def test_queries_outside_request_are_not_profiled(self):
+        with override_settings(PERFORMANCE_SLOW_QUERY_MS=0):
+            with self.assertNoLogs(PERFORMANCE_LOGGER, "WARNING"):
+                run_queries(("SELECT %s", [1]))
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_disabled_middleware_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            performance_middleware(lambda request: HttpResponse())
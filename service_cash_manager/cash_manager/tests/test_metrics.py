@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import db_query_wrapper, install_db_query_wrapper
+from .base import TEST_CACHES
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    METRICS_ENABLED=True,
+    METRICS_TOKEN="metrics-token",
+)
+class MetricsViewTests(TestCase):
+    """/metrics: гистограммы запросов и SQL, доступ по токену или staff."""
+
+    def setUp(self):
+        # Соединение тестовой БД создано до override_settings - wrapper
+        # подключается явно, как при connection_created
+        install_db_query_wrapper(connection)
+        self.addCleanup(connection.execute_wrappers.remove, db_query_wrapper)
+
+    def scrape(self, **headers):
+        return self.client.get(reverse("metrics"), headers=headers)
+
+    def test_scrape_with_token_returns_histograms(self):
+        self.scrape(authorization="Bearer metrics-token")
+        response = self.scrape(authorization="Bearer metrics-token")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertRegex(
+            body,
+            r'cash_manager_http_request_duration_seconds_count\{'
+            r'method="GET",route="metrics",status="200"\} [1-9]',
+        )
+        self.assertRegex(
+            body,
+            r'cash_manager_db_query_duration_seconds_count\{'
+            r'database="default"\} [1-9]',
+        )
+
+    def test_scrape_without_token_is_unauthorized(self):
+        self.assertEqual(self.scrape().status_code, 401)
+        self.assertEqual(
+            self.scrape(authorization="Bearer wrong").status_code,
+            401,
+        )
+
+    def test_staff_session_is_allowed(self):
+        self.client.force_login(
+            get_user_model().objects.create_user("staff", is_staff=True),
+        )
+
+        self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_found(self):
+        self.assertEqual(
+            self.scrape(authorization="Bearer metrics-token").status_code,
+            404,
+        )
+
+
+# Кол-во SQL-запросов страниц AdminPanel (модель, страница): не зависит от
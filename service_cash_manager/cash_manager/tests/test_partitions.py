@@ -0,0 +1,162 @@
+from datetime import date, timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+
+from ..models import CashFlow
+from ..partitions import (
+    DEFAULT_PARTITION,
+    create_partitions,
+    detach_partitions,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from .base import (
+    TEST_CACHES,
+    cash_flow_groups,
+    create_cash_flows,
+    create_taxonomy,
+    explain,
+    rollup_groups,
+)
+
+
+def partition_rows(name: str) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM cash_manager.{name}")
+        return cursor.fetchone()[0]
+
+
+def registered_ids() -> set:
+    """id из реестра cash_flow_id."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM cash_manager.cash_flow_id")
+        return {row[0] for row in cursor.fetchall()}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowPartitionTests(TestCase):
+    """
+    Месячные партиции: фильтр по периоду читает только партиции периода,
+    создание и отключение партиций сохраняют агрегаты и реестр id.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = month_start(date.today())
+        create_partitions(month_start(cls.month, 1))
+        cls.taxonomy = create_taxonomy()
+        create_cash_flows(cls.taxonomy, 10, cls.month)
+
+    def test_created_at_range_prunes_partitions(self):
+        plan = explain(
+            CashFlow.objects.filter(
+                created_at__range=(
+                    self.month,
+                    month_start(self.month, 1) - timedelta(days=1),
+                ),
+            ),
+        )
+
+        self.assertIn(partition_name(self.month), plan)
+        for name in (
+            partition_name(month_start(self.month, -1)),
+            partition_name(month_start(self.month, 1)),
+            DEFAULT_PARTITION,
+        ):
+            self.assertNotRegex(plan, rf"\b{name}\b")
+
+    def test_create_partitions_moves_rows_out_of_default(self):
+        month = month_start(self.month, -3)
+        create_cash_flows(self.taxonomy, 5, month)
+        self.assertEqual(partition_rows(DEFAULT_PARTITION), 5)
+        rollup = rollup_groups()
+        ids = registered_ids()
+
+        created = create_partitions(self.month)
+
+        self.assertEqual(
+            [partition.name for partition in created],
+            [
+                partition_name(month_start(self.month, months))
+                for months in (-3, -2, -1)
+            ],
+        )
+        self.assertEqual(partition_rows(DEFAULT_PARTITION), 0)
+        self.assertEqual(partition_rows(partition_name(month)), 5)
+        self.assertEqual(CashFlow.objects.filter(created_at=month).count(), 5)
+        self.assertEqual(rollup_groups(), rollup)
+        self.assertEqual(rollup_groups(), cash_flow_groups())
+        self.assertEqual(registered_ids(), ids)
+        self.assertEqual(create_partitions(self.month), [])
+
+    def test_detach_partitions_removes_rows_rollup_and_ids(self):
+        month = month_start(self.month, -2)
+        cash_flows = create_cash_flows(self.taxonomy, 5, month)
+        create_partitions(self.month)
+
+        detached = detach_partitions(month_start(month, 1), drop=True)
+
+        self.assertEqual(
+            [partition.name for partition in detached],
+            [partition_name(month)],
+        )
+        self.assertNotIn(
+            partition_name(month),
+            {partition.name for partition in list_partitions()},
+        )
+        self.assertFalse(CashFlow.objects.filter(created_at=month).exists())
+        self.assertEqual(rollup_groups(), cash_flow_groups())
+        self.assertTrue(
+            registered_ids().isdisjoint(
+                cash_flow.id for cash_flow in cash_flows
+            ),
+        )
+        # id отключенных строк снова свободны
+        CashFlow.objects.bulk_create(
+            [CashFlow(**self.taxonomy, id=cash_flows[0].id, amount=1)]
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowIdUniquenessTests(TestCase):
+    """
+    PK таблицы - (id, created_at): id уникален по всем партициям за счет
+    реестра cash_flow_id.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = month_start(date.today())
+        create_partitions(month_start(cls.month, 1))
+        cls.taxonomy = create_taxonomy()
+        cls.cash_flow = create_cash_flows(cls.taxonomy, 1, cls.month)[0]
+
+    def test_duplicate_id_in_other_partition_is_rejected(self):
+        other = create_cash_flows(
+            self.taxonomy,
+            1,
+            month_start(self.month, 1),
+        )[0]
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CashFlow.objects.filter(id=other.id).update(id=self.cash_flow.id)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CashFlow.objects.bulk_create(
+                [CashFlow(**self.taxonomy, id=self.cash_flow.id, amount=1)]
+            )
+        self.assertEqual(
+            CashFlow.objects.get(pk=self.cash_flow.id).created_at,
+            self.month,
+        )
+
+    def test_registry_follows_updates_and_deletes(self):
+        # Перенос строки в другую партицию не меняет id
+        CashFlow.objects.filter(id=self.cash_flow.id).update(
+            created_at=month_start(self.month, 1) + timedelta(days=1),
+        )
+        self.assertEqual(registered_ids(), {self.cash_flow.id})
+
+        CashFlow.objects.filter(id=self.cash_flow.id).delete()
+        self.assertEqual(registered_ids(), set())
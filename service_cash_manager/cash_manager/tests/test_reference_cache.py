@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..cache_metrics import cache_stats
+from ..models import CashFlowStatus
+from .base import TEST_CACHES, create_taxonomy
+
+
+def hits(namespace: str) -> int:
+    return cache_stats().get(namespace, {}).get("hits", 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReferenceCacheTests(TestCase):
+    """
+    Списки справочников (CachedResultsChangeList) и подсказки фильтров
+    списка ДДС кэшируются до сохранения или удаления справочника: сигналы
+    после commit меняют версию справочников в ключах кэша.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser("admin")
+        cls.taxonomy = create_taxonomy()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.list_url = reverse("admin:cash_manager_cashflowstatus_changelist")
+        self.autocomplete_url = reverse(
+            "admin:cash_manager_cashflow_autocomplete",
+            args=["status"],
+        )
+
+    def listed_titles(self) -> list[str]:
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        return [status.title for status in response.context["cl"].result_list]
+
+    def suggested_titles(self) -> list[str]:
+        response = self.client.get(self.autocomplete_url, {"q": "st"})
+        self.assertEqual(response.status_code, 200)
+        return [item["text"] for item in response.json()["results"]]
+
+    def test_list_and_suggestions_are_cached(self):
+        self.assertEqual(self.listed_titles(), ["test-status"])
+        self.assertEqual(self.suggested_titles(), ["test-status"])
+        list_hits = hits("changelist_results")
+        autocomplete_hits = hits("autocomplete")
+
+        # Без commit сигналы не сбрасывают кэш: ответы прежние
+        CashFlowStatus.objects.create(title="st-new", alias="st_new")
+
+        self.assertEqual(self.listed_titles(), ["test-status"])
+        self.assertEqual(self.suggested_titles(), ["test-status"])
+        self.assertEqual(hits("changelist_results"), list_hits + 1)
+        self.assertEqual(hits("autocomplete"), autocomplete_hits + 1)
+
+    def test_save_invalidates_list_and_suggestions(self):
+        self.listed_titles()
+        self.suggested_titles()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CashFlowStatus.objects.create(title="st-new", alias="st_new")
+
+        self.assertEqual(self.listed_titles(), ["st-new", "test-status"])
+        self.assertEqual(self.suggested_titles(), ["st-new", "test-status"])
+
+    def test_delete_invalidates_list_and_suggestions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            status = CashFlowStatus.objects.create(
+                title="st-old",
+                alias="st_old",
+            )
+        self.assertEqual(self.listed_titles(), ["st-old", "test-status"])
+        self.assertEqual(self.suggested_titles(), ["st-old", "test-status"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            status.delete()
+
+        self.assertEqual(self.listed_titles(), ["test-status"])
+        self.assertEqual(self.suggested_titles(), ["test-status"])
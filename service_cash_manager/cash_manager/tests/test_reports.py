@@ -0,0 +1,162 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..data_version import bump_cash_flow_version
+from ..models import CashFlow
+from ..reports import (
+    REPORT_SOURCE_CASH_FLOW,
+    REPORT_SOURCE_ROLLUP,
+    CashFlowReport,
+)
+from ..taxonomy import taxonomy
+from .base import (
+    TEST_CACHES,
+    create_api_user,
+    create_cash_flows,
+    create_taxonomy,
+)
+
+
+def report(query: str) -> CashFlowReport:
+    return CashFlowReport(QueryDict(query), taxonomy.snapshot)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowReportTests(TestCase):
+    """
+    Отчет по ДДС: источник (дневные агрегаты или cash_flow), ключ кэша и
+    одинаковый результат из обоих источников.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        cls.day = date.today().replace(day=1)
+        # 1 + 2 + 2: среднее 5/3 - с округлением
+        create_cash_flows(cls.taxonomy, 2, cls.day)
+        create_cash_flows(cls.taxonomy, 1, cls.day + timedelta(days=1))
+        CashFlow.objects.filter(amount=1, created_at=cls.day).update(amount=2)
+        create_cash_flows(create_taxonomy("other"), 3, cls.day)
+
+    def test_source_is_rollup_only_for_rollup_dimensions_and_filters(self):
+        type_id = self.taxonomy["type"].id
+        for query, source in (
+            ("", REPORT_SOURCE_ROLLUP),
+            (
+                "group_by=status,type,category&bucket=month",
+                REPORT_SOURCE_ROLLUP,
+            ),
+            (
+                f"type={type_id}&created_at_from={self.day}",
+                REPORT_SOURCE_ROLLUP,
+            ),
+            ("group_by=type,subcategory", REPORT_SOURCE_CASH_FLOW),
+            (
+                f"subcategory={self.taxonomy['subcategory'].id}",
+                REPORT_SOURCE_CASH_FLOW,
+            ),
+            ("comment=договор", REPORT_SOURCE_CASH_FLOW),
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(report(query).source, source)
+
+    def test_cache_key_depends_only_on_report_params_and_versions(self):
+        query = "group_by=type,status&bucket=day"
+        key = report(query).cache_key(1, 1)
+
+        # Порядок измерений и посторонние параметры не меняют ключ
+        self.assertEqual(
+            report("group_by=status,type&bucket=day&limit=5").cache_key(1, 1),
+            key,
+        )
+        for other in (
+            report("group_by=status&bucket=day").cache_key(1, 1),
+            report("group_by=type,status&bucket=week").cache_key(1, 1),
+            report(f"{query}&type={self.taxonomy['type'].id}").cache_key(1, 1),
+            report(query).cache_key(2, 1),
+            report(query).cache_key(1, 2),
+        ):
+            self.assertNotEqual(other, key)
+
+    def test_rollup_and_cash_flow_sources_return_same_rows(self):
+        for query in (
+            "group_by=type",
+            "group_by=status,type,category&bucket=day",
+            f"bucket=month&type={self.taxonomy['type'].id}",
+            "",
+        ):
+            with self.subTest(query=query):
+                rollup = report(query)
+                raw = report(query)
+                raw.source = REPORT_SOURCE_CASH_FLOW
+
+                rollup_rows = [rollup.row(row) for row in rollup.queryset()]
+                self.assertEqual(rollup.source, REPORT_SOURCE_ROLLUP)
+                self.assertEqual(
+                    rollup_rows,
+                    [raw.row(row) for row in raw.queryset()],
+                )
+
+        [row] = [
+            row
+            for row in map(
+                report("group_by=type").row,
+                report("group_by=type").queryset(),
+            )
+            if row["type"]["id"] == self.taxonomy["type"].id
+        ]
+        self.assertEqual(
+            (row["sum"], row["count"], row["avg"]),
+            (Decimal(5), 3, Decimal("1.667")),
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowReportViewTests(TestCase):
+    """GET /api/v1/cash-flows/report: кэш до записи ДДС или справочников."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.taxonomy = create_taxonomy()
+        cls.user = create_api_user("reader", "view")
+        create_cash_flows(cls.taxonomy, 2, date.today())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("cash_manager:cash_flow_report")
+
+    def get(self, **params):
+        return self.client.get(self.url, {"group_by": "type", **params})
+
+    def test_report_is_cached_until_cash_flow_write(self):
+        first = self.get()
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(first.json()["source"], REPORT_SOURCE_ROLLUP)
+        self.assertEqual(self.get()["X-Cache"], "HIT")
+
+        create_cash_flows(self.taxonomy, 1, date.today())
+        # mark_cash_flows_changed выполняется после commit
+        bump_cash_flow_version()
+
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["data"][0]["count"], 3)
+
+    def test_report_is_cached_until_taxonomy_change(self):
+        self.get()
+
+        taxonomy.invalidate()
+
+        self.assertEqual(self.get()["X-Cache"], "MISS")
+
+    def test_invalid_params_are_rejected(self):
+        for params in ({"group_by": "amount"}, {"bucket": "year"}):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.client.get(self.url, params).status_code,
+                    400,
+                )
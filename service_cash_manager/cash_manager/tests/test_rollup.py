@@ -0,0 +1,165 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from ..models import CashFlow, CashFlowDailyRollup
+from ..partitions import DEFAULT_PARTITION, create_partitions, month_start
+from ..rollup import rebuild_daily_rollup
+from .base import (
+    TEST_CACHES,
+    cash_flow_groups,
+    create_cash_flows,
+    create_taxonomy,
+    rollup_groups,
+)
+
+
+def day_groups(groups: dict, day: date) -> dict:
+    """Агрегаты (см. rollup_groups) за день."""
+    return {key: value for key, value in groups.items() if key[0] == day}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CashFlowDailyRollupTriggerTests(TestCase):
+    """
+    Statement-level триггеры cash_flow поддерживают дневные агрегаты: после
+    любой записи они совпадают с агрегатами, посчитанными по cash_flow.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.month = month_start(date.today())
+        create_partitions(month_start(cls.month, 1))
+        cls.taxonomy = create_taxonomy()
+        cls.other_taxonomy = create_taxonomy("other")
+        create_cash_flows(cls.taxonomy, 4, cls.month)
+        create_cash_flows(cls.taxonomy, 3, cls.month + timedelta(days=1))
+        create_cash_flows(cls.other_taxonomy, 2, cls.month)
+
+    def assertRollupMatches(self):
+        self.assertEqual(rollup_groups(), cash_flow_groups())
+
+    def test_insert(self):
+        self.assertEqual(len(rollup_groups()), 3)
+        self.assertRollupMatches()
+
+        create_cash_flows(self.other_taxonomy, 5, self.month)
+
+        self.assertRollupMatches()
+
+    def test_update_amounts_and_taxonomy(self):
+        CashFlow.objects.filter(type=self.taxonomy["type"]).update(
+            amount=F("amount") * 10,
+        )
+        self.assertRollupMatches()
+
+        # Перенос в другую группу (в т.ч. с пустой категорией): пустые
+        # группы удаляются
+        CashFlow.objects.filter(created_at=self.month, amount=10).update(
+            category=None,
+        )
+        CashFlow.objects.filter(type=self.other_taxonomy["type"]).update(
+            **self.taxonomy,
+        )
+        self.assertRollupMatches()
+        self.assertFalse(
+            CashFlowDailyRollup.objects.filter(
+                type=self.other_taxonomy["type"],
+            ).exists(),
+        )
+
+    def test_update_moves_rows_between_partitions(self):
+        next_month = month_start(self.month, 1)
+        # Месяц без партиции - в DEFAULT
+        old_month = month_start(self.month, -6)
+
+        CashFlow.objects.filter(amount__lte=2).update(created_at=next_month)
+        self.assertRollupMatches()
+        CashFlow.objects.filter(created_at=next_month).update(
+            created_at=old_month,
+        )
+        self.assertRollupMatches()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM cash_manager.{DEFAULT_PARTITION}",
+            )
+            self.assertEqual(
+                cursor.fetchone()[0],
+                CashFlow.objects.filter(created_at=old_month).count(),
+            )
+
+    def test_delete_recomputes_min_max(self):
+        CashFlow.objects.filter(
+            type=self.taxonomy["type"],
+            created_at=self.month,
+            amount=4,
+        ).delete()
+        self.assertRollupMatches()
+
+        CashFlow.objects.filter(type=self.other_taxonomy["type"]).delete()
+        self.assertRollupMatches()
+
+        CashFlow.objects.all().delete()
+        self.assertEqual(rollup_groups(), {})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class RebuildDailyRollupTests(TestCase):
+    """Пересчет агрегатов за период восстанавливает их по cash_flow."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.day = month_start(date.today())
+        cls.taxonomy = create_taxonomy()
+        create_cash_flows(cls.taxonomy, 3, cls.day)
+        create_cash_flows(cls.taxonomy, 2, cls.day + timedelta(days=1))
+
+    def test_rebuild_restores_only_period(self):
+        next_day = self.day + timedelta(days=1)
+        CashFlowDailyRollup.objects.filter(day=self.day).delete()
+        CashFlowDailyRollup.objects.filter(day=next_day).update(amount_sum=0)
+
+        self.assertEqual(rebuild_daily_rollup(self.day, self.day), 1)
+
+        groups = rollup_groups()
+        self.assertEqual(
+            day_groups(groups, self.day),
+            day_groups(cash_flow_groups(), self.day),
+        )
+        # Вне периода агрегаты не пересчитываются
+        self.assertEqual(
+            {value[0] for value in day_groups(groups, next_day).values()},
+            {0},
+        )
+
+        rebuild_daily_rollup(self.day, next_day)
+        self.assertEqual(rollup_groups(), cash_flow_groups())
+
+    def test_command(self):
+        CashFlowDailyRollup.objects.all().delete()
+        stdout = StringIO()
+
+        call_command(
+            "rebuild_cash_flow_rollup",
+            "--from",
+            str(self.day),
+            "--to",
+            str(self.day + timedelta(days=1)),
+            stdout=stdout,
+        )
+
+        self.assertIn("Rebuilt 2 rollup rows", stdout.getvalue())
+        self.assertEqual(rollup_groups(), cash_flow_groups())
+        with self.assertRaises(CommandError):
+            call_command(
+                "rebuild_cash_flow_rollup",
+                "--from",
+                str(self.day + timedelta(days=1)),
+                "--to",
+                str(self.day),
+            )
@@ -0,0 +1,145 @@
+from datetime import date
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from ..middleware import PRIMARY_STICKY_COOKIE, replica_stickiness_middleware
+from ..models import CashFlow
+from ..routers import (
+    PRIMARY_DB,
+    REPLICA_DB,
+    PrimaryReplicaRouter,
+    pinned_to_primary,
+    read_db,
+    read_from_replica,
+)
+from .base import (
+    TEST_CACHES,
+    create_api_user,
+    create_cash_flows,
+    create_taxonomy,
+)
+
+# Реплика в настройках - только для выбора алиаса: тесты не подключаются к ней
+REPLICA_DATABASES = {
+    **settings.DATABASES,
+    REPLICA_DB: settings.DATABASES[PRIMARY_DB],
+}
+
+
+@override_settings(DATABASES=REPLICA_DATABASES)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """Чтения с реплики - только внутри read_from_replica и без закрепления."""
+
+    router = PrimaryReplicaRouter()
+
+    def test_reads_outside_replica_block_use_primary(self):
+        self.assertEqual(self.router.db_for_read(CashFlow), PRIMARY_DB)
+
+    def test_reads_inside_replica_block_use_replica(self):
+        with read_from_replica() as database:
+            self.assertEqual(database, REPLICA_DB)
+            self.assertEqual(self.router.db_for_read(CashFlow), REPLICA_DB)
+        self.assertEqual(self.router.db_for_read(CashFlow), PRIMARY_DB)
+
+    def test_disabled_block_and_pinned_request_use_primary(self):
+        with read_from_replica(False) as database:
+            self.assertEqual(database, PRIMARY_DB)
+            self.assertEqual(self.router.db_for_read(CashFlow), PRIMARY_DB)
+        with pinned_to_primary(), read_from_replica() as database:
+            self.assertEqual(database, PRIMARY_DB)
+            self.assertEqual(self.router.db_for_read(CashFlow), PRIMARY_DB)
+
+    def test_writes_and_migrations_use_primary(self):
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_write(CashFlow), PRIMARY_DB)
+        self.assertTrue(self.router.allow_migrate(PRIMARY_DB, "cash_manager"))
+        self.assertFalse(self.router.allow_migrate(REPLICA_DB, "cash_manager"))
+
+    @override_settings(DATABASES={PRIMARY_DB: settings.DATABASES[PRIMARY_DB]})
+    def test_without_replica_reads_use_primary(self):
+        with read_from_replica() as database:
+            self.assertEqual(database, PRIMARY_DB)
+            self.assertEqual(self.router.db_for_read(CashFlow), PRIMARY_DB)
+
+
+@override_settings(
+    DATABASES=REPLICA_DATABASES,
+    POSTGRES_REPLICA_STICKY_SECONDS=10,
+)
+class ReplicaStickinessMiddlewareTests(SimpleTestCase):
+    """Cookie закрепления ставится после записи и действует на свою сессию."""
+
+    factory = RequestFactory()
+
+    def run_middleware(self, request, status: int = 200):
+        databases = []
+
+        def get_response(request):
+            with read_from_replica():
+                databases.append(read_db())
+            return HttpResponse(status=status)
+
+        response = replica_stickiness_middleware(get_response)(request)
+        return response, databases[0]
+
+    def test_successful_write_sets_cookie(self):
+        response, _ = self.run_middleware(self.factory.post("/"))
+
+        cookie = response.cookies[PRIMARY_STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], 10)
+        self.assertTrue(cookie["httponly"])
+
+    def test_reads_and_failed_writes_do_not_set_cookie(self):
+        for request, status in (
+            (self.factory.get("/"), 200),
+            (self.factory.post("/"), 400),
+        ):
+            with self.subTest(method=request.method, status=status):
+                response, _ = self.run_middleware(request, status)
+
+                self.assertNotIn(PRIMARY_STICKY_COOKIE, response.cookies)
+
+    def test_cookie_pins_only_its_session(self):
+        sticky = self.factory.get("/")
+        sticky.COOKIES[PRIMARY_STICKY_COOKIE] = "1"
+
+        self.assertEqual(self.run_middleware(sticky)[1], PRIMARY_DB)
+        self.assertEqual(
+            self.run_middleware(self.factory.get("/"))[1],
+            REPLICA_DB,
+        )
+
+    @override_settings(DATABASES={PRIMARY_DB: settings.DATABASES[PRIMARY_DB]})
+    def test_without_replica_cookie_is_not_set(self):
+        response, _ = self.run_middleware(self.factory.post("/"))
+
+        self.assertNotIn(PRIMARY_STICKY_COOKIE, response.cookies)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ReportStickinessTests(TestCase):
+    """Сессия после записи считает отчет на primary, минуя кэш."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_api_user("reader", "view")
+        create_cash_flows(create_taxonomy(), 3, date.today())
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse("cash_manager:cash_flow_report")
+
+    def test_sticky_session_bypasses_report_cache(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+        self.client.cookies[PRIMARY_STICKY_COOKIE] = "1"
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
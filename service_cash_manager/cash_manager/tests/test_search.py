@@ -0,0 +1,172 @@
+from datetime import date
+from uuid import uuid4
+
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..checks import C_CTYPES, check_database_ctype, database_ctype
+from ..models import CashFlow
+from ..search import (
+    TITLE_SIMILARITY_THRESHOLD,
+    rank_comments,
+    search_comments,
+    title_similarity,
+)
+from ..taxonomy import TaxonomyItem, search_title_ids
+from .base import TEST_CACHES, create_cash_flows, create_taxonomy
+
+COMMENTS = (
+    "Оплата по договорам аренды",
+    "Оплата по договору поставки, договор от 01.02",
+    "Возврат займа",
+    "Monthly payment for hosting",
+    "Hosting invoice",
+)
+
+
+def items(*titles: str) -> dict:
+    """Справочники снимка с наименованиями titles."""
+    return {
+        item.id: item
+        for item in (
+            TaxonomyItem(id=uuid4(), title=title, alias=title)
+            for title in titles
+        )
+    }
+
+
+class TitleSimilarityTests(SimpleTestCase):
+    """Сходство наименований по триграммам (как pg_trgm) и их ранжирование."""
+
+    def test_similarity(self):
+        self.assertEqual(title_similarity("Маркетинг", "маркетинг"), 1.0)
+        # Опечатка - выше порога, другое слово - ниже
+        self.assertGreaterEqual(
+            title_similarity("Маркетнг", "Маркетинг"),
+            TITLE_SIMILARITY_THRESHOLD,
+        )
+        self.assertLess(
+            title_similarity("Налоги", "Маркетинг"),
+            TITLE_SIMILARITY_THRESHOLD,
+        )
+        self.assertEqual(title_similarity("", "Маркетинг"), 0.0)
+        self.assertEqual(title_similarity("-", "Маркетинг"), 0.0)
+
+    def test_exact_then_substring_then_typo(self):
+        catalog = items("Реклама", "Реклама онлайн", "Рекламма", "Налоги")
+        ids = {item.title: item_id for item_id, item in catalog.items()}
+
+        self.assertEqual(
+            search_title_ids(catalog, "реклама"),
+            [ids["Реклама"], ids["Реклама онлайн"], ids["Рекламма"]],
+        )
+        self.assertEqual(search_title_ids(catalog, "Нлоги"), [ids["Налоги"]])
+        self.assertEqual(search_title_ids(catalog, "Зарплата"), [])
+
+    def test_best_only_keeps_top_score(self):
+        catalog = items("Аренда офиса", "Аренда склада", "Налоги")
+        ids = {item.title: item_id for item_id, item in catalog.items()}
+
+        self.assertEqual(
+            search_title_ids(catalog, "аренда офиса", best_only=True),
+            [ids["Аренда офиса"]],
+        )
+        # Одинаково похожие остаются оба
+        self.assertCountEqual(
+            search_title_ids(catalog, "Аренда", best_only=True),
+            [ids["Аренда офиса"], ids["Аренда склада"]],
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CommentSearchTests(TestCase):
+    """
+    Поиск ДДС по комментарию: морфология и синтаксис websearch, опечатки
+    (триграммы) и ранжирование.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cash_flows = create_cash_flows(
+            create_taxonomy(),
+            len(COMMENTS),
+            date.today(),
+        )
+        cls.ids = {}
+        for cash_flow, comment in zip(cash_flows, COMMENTS):
+            CashFlow.objects.filter(pk=cash_flow.pk).update(comment=comment)
+            cls.ids[comment] = cash_flow.id
+
+    def search(self, value: str) -> set:
+        return set(
+            search_comments(CashFlow.objects.all(), value).values_list(
+                "id",
+                flat=True,
+            )
+        )
+
+    def ranked(self, value: str) -> list:
+        return list(
+            rank_comments(
+                search_comments(CashFlow.objects.all(), value),
+                value,
+            ).order_by("-search_rank", "-id").values_list("id", flat=True)
+        )
+
+    def test_full_text_search_uses_morphology_and_websearch(self):
+        first, second, loan = COMMENTS[:3]
+        for value, comments in (
+            ("договор", {first, second}),
+            ("договоров аренды", {first}),
+            ('"по договору поставки"', {second}),
+            ("договор -аренда", {second}),
+            ("займ or аренда", {first, loan}),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    self.search(value),
+                    {self.ids[comment] for comment in comments},
+                )
+
+    def test_typos_match_comment_words(self):
+        self.assertEqual(
+            self.search("hostign"),
+            {self.ids[COMMENTS[3]], self.ids[COMMENTS[4]]},
+        )
+        self.assertEqual(self.search("qwerty"), set())
+
+    def test_typos_match_cyrillic_comment_words(self):
+        if database_ctype(DEFAULT_DB_ALIAS) in C_CTYPES:
+            self.skipTest("LC_CTYPE=C: pg_trgm ignores Cyrillic letters")
+        self.assertEqual(self.search("Возврт"), {self.ids[COMMENTS[2]]})
+
+    def test_rank_orders_by_relevance(self):
+        # Два вхождения слова выше одного
+        self.assertEqual(
+            self.ranked("договор")[:2],
+            [self.ids[COMMENTS[1]], self.ids[COMMENTS[0]]],
+        )
+        # Точное слово выше опечатки
+        self.assertEqual(
+            self.ranked("hosting invoice")[0],
+            self.ids[COMMENTS[4]],
+        )
+
+
+class DatabaseCtypeCheckTests(TestCase):
+    """Предупреждение cash_manager.W001 о БД с LC_CTYPE=C."""
+
+    def test_warns_only_for_c_ctype(self):
+        warnings = check_database_ctype(None, databases=[DEFAULT_DB_ALIAS])
+
+        if database_ctype(DEFAULT_DB_ALIAS) in C_CTYPES:
+            self.assertEqual(
+                [warning.id for warning in warnings],
+                ["cash_manager.W001"],
+            )
+        else:
+            self.assertEqual(warnings, [])
+
+    def test_no_databases_no_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(check_database_ctype(None), [])
@@ -0,0 +1,45 @@
+from django.urls import path
+
+from .views import (
+    CacheStatsView,
+    CashFlowBulkView,
+    CashFlowDetailView,
+    CashFlowListView,
+    CashFlowReportView,
+    DatabasePoolStatsView,
+)
+
+app_name = "cash_manager"
+
+urlpatterns = [
+    path(
+        "cash-flows",
+        CashFlowListView.as_view(),
+        name="cash_flow_list",
+    ),
+    path(
+        "cash-flows/bulk",
+        CashFlowBulkView.as_view(),
+        name="cash_flow_bulk",
+    ),
+    path(
+        "cash-flows/report",
+        CashFlowReportView.as_view(),
+        name="cash_flow_report",
+    ),
+    path(
+        "cash-flows/<uuid:pk>",
+        CashFlowDetailView.as_view(),
+        name="cash_flow_detail",
+    ),
+    path(
+        "db/pool-stats",
+        DatabasePoolStatsView.as_view(),
+        name="db_pool_stats",
+    ),
+    path(
+        "cache/stats",
+        CacheStatsView.as_view(),
+        name="cache_stats",
+    ),
+]
@@ -1,3 +1,568 @@
-from django.shortcuts import render
+import base64
+import binascii
+import json
+import os
+from typing import Any
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import JsonResponse
+from django.views import View
+
+from .admin_changelist import seek_condition
+from .api_filters import filter_cash_flows
+from .bulk import (
+    BULK_ACTION_DELETE,
+    BULK_ACTION_UPDATE,
+    BULK_ACTIONS,
+    active_idempotency_keys,
+    apply_bulk,
+    bulk_ids,
+    parse_bulk_items,
+    plan_bulk,
+    request_hash,
+)
+from .cache_metrics import acache_get, cache_stats
+from .data_version import abump_cash_flow_version, acash_flow_version
+from .models import CashFlow, CashFlowIdempotencyKey
+from .reports import CashFlowReport
+from .routers import PRIMARY_DB, is_pinned_to_primary, read_from_replica
+from .search import rank_comments
+from .serializers import (
+    build_cash_flow,
+    serialize_cash_flow,
+    validation_errors,
+)
+from .taxonomy import taxonomy
+
+API_ORDERINGS = ("-created_at", "created_at", "-amount", "amount")
+# Сортировка по релевантности поиска по комментарию: первые limit ДДС
+API_ORDERING_RELEVANCE = "relevance"
+
+
+def api_error(
+    status: int,
+    error_type: str,
+    message: str,
+    errors: dict[str, list[str]] | None = None,
+) -> JsonResponse:
+    """
+    Ответ API с ошибкой (формат Stripe: {"error": {"type", "message"}}).
+
+    :param status: HTTP-статус.
+    :param error_type: Тип ошибки.
+    :param message: Сообщение.
+    :param errors: Ошибки по полям.
+
+    :return: JSON-ответ.
+    """
+    error: dict[str, Any] = {"type": error_type, "message": message}
+    if errors:
+        error["errors"] = errors
+    return JsonResponse({"error": error}, status=status)
+
+
+def invalid_request(ex: ValidationError) -> JsonResponse:
+    return api_error(
+        400,
+        "invalid_request_error",
+        "Некорректные параметры запроса.",
+        validation_errors(ex),
+    )
+
+
+class CashFlowAPIView(View):
+    """
+    Базовый async-view API ДДС: аутентификация по сессии и проверка прав
+    модели CashFlow (view/add/change/delete) для метода запроса.
+    """
+
+    permission_actions = {
+        "get": "view",
+        "post": "add",
+        "patch": "change",
+        "delete": "delete",
+    }
+
+    async def dispatch(self, request, *args, **kwargs):
+        action = self.permission_actions.get(request.method.lower())
+        if action:
+            user = await request.auser()
+            if not user.is_authenticated:
+                return api_error(
+                    401,
+                    "authentication_error",
+                    "Требуется аутентификация.",
+                )
+            if not await user.ahas_perm(f"cash_manager.{action}_cashflow"):
+                return api_error(403, "permission_error", "Недостаточно прав.")
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def parse_json(request) -> Any:
+        """
+        Тело запроса в JSON.
+
+        :raises ValidationError: Тело запроса - не JSON.
+        """
+        try:
+            return json.loads(request.body)
+        except ValueError:
+            raise ValidationError("Тело запроса должно быть JSON.")
+
+    @staticmethod
+    async def get_cash_flow(pk) -> CashFlow | None:
+        try:
+            return await CashFlow.objects.aget(pk=pk)
+        except CashFlow.DoesNotExist:
+            return None
+
+    @staticmethod
+    def not_found() -> JsonResponse:
+        return api_error(404, "invalid_request_error", "ДДС не найдено.")
+
+
+class CashFlowListView(CashFlowAPIView):
+    """
+    GET /api/v1/cash-flows - список ДДС с фильтрами и cursor-пагинацией.
+    POST /api/v1/cash-flows - создание ДДС.
+
+    Страница выбирается keyset-условием от ключа последней строки
+    предыдущей страницы (GET-параметр cursor), поэтому стоимость запроса
+    не зависит от глубины листания.
+    """
+
+    async def get(self, request):
+        snapshot = await taxonomy.asnapshot()
+        try:
+            ordering = request.GET.get("ordering") or API_ORDERINGS[0]
+            if ordering == API_ORDERING_RELEVANCE:
+                return await self._get_relevant(request, snapshot)
+            if ordering not in API_ORDERINGS:
+                raise ValidationError(
+                    {
+                        "ordering": [
+                            "Допустимо: "
+                            f"{', '.join(API_ORDERINGS)}, "
+                            f"{API_ORDERING_RELEVANCE}."
+                        ],
+                    },
+                )
+            limit = self._limit(request.GET.get("limit"))
+            keyset = [
+                (ordering.lstrip("-"), ordering.startswith("-")),
+                ("id", ordering.startswith("-")),
+            ]
+
+            queryset = filter_cash_flows(
+                CashFlow.objects.all(),
+                request.GET,
+                snapshot,
+            )
+            if cursor := request.GET.get("cursor"):
+                queryset = queryset.filter(
+                    seek_condition(
+                        keyset,
+                        self._decode_cursor(cursor, ordering, keyset),
+                    ),
+                )
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        rows = [
+            cash_flow
+            async for cash_flow in queryset.order_by(
+                *(f"{'-' if desc else ''}{name}" for name, desc in keyset),
+            )[:limit + 1]
+        ]
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return JsonResponse(
+            {
+                "object": "list",
+                "data": [serialize_cash_flow(row, snapshot) for row in rows],
+                "has_more": has_more,
+                "next_cursor": (
+                    self._encode_cursor(rows[-1], ordering, keyset)
+                    if has_more
+                    else None
+                ),
+            }
+        )
+
+    async def _get_relevant(self, request, snapshot) -> JsonResponse:
+        """
+        Первые limit ДДС по релевантности поиска по комментарию (без
+        cursor-пагинации: ранг вычисляется, а не хранится).
+        """
+        try:
+            if not (value := request.GET.get("comment")):
+                raise ValidationError(
+                    {"comment": ["Обязателен при ordering=relevance."]},
+                )
+            if request.GET.get("cursor"):
+                raise ValidationError(
+                    {"cursor": ["Не поддерживается при ordering=relevance."]},
+                )
+            limit = self._limit(request.GET.get("limit"))
+            queryset = filter_cash_flows(
+                CashFlow.objects.all(),
+                request.GET,
+                snapshot,
+            )
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        rows = [
+            cash_flow
+            async for cash_flow in rank_comments(queryset, value).order_by(
+                "-search_rank",
+                "-id",
+            )[:limit + 1]
+        ]
+        return JsonResponse(
+            {
+                "object": "list",
+                "data": [
+                    {
+                        **serialize_cash_flow(row, snapshot),
+                        "search_rank": round(row.search_rank, 6),
+                    }
+                    for row in rows[:limit]
+                ],
+                "has_more": len(rows) > limit,
+                "next_cursor": None,
+            }
+        )
+
+    async def post(self, request):
+        snapshot = await taxonomy.asnapshot()
+        try:
+            cash_flow, _ = build_cash_flow(self.parse_json(request), snapshot)
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        await cash_flow.asave(force_insert=True)
+        return JsonResponse(serialize_cash_flow(cash_flow, snapshot), status=201)
+
+    @staticmethod
+    def _limit(value: str | None) -> int:
+        if not value:
+            return settings.API_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.API_MAX_PAGE_SIZE:
+            raise ValidationError(
+                {"limit": [f"Ожидается число 1..{settings.API_MAX_PAGE_SIZE}."]},
+            )
+        return limit
+
+    @staticmethod
+    def _encode_cursor(
+        cash_flow: CashFlow,
+        ordering: str,
+        keyset: list[tuple[str, bool]],
+    ) -> str:
+        values = [
+            CashFlow._meta.get_field(name).value_to_string(cash_flow)
+            for name, _ in keyset
+        ]
+        data = json.dumps({"o": ordering, "v": values}).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    @staticmethod
+    def _decode_cursor(
+        cursor: str,
+        ordering: str,
+        keyset: list[tuple[str, bool]],
+    ) -> list:
+        """
+        Разбор cursor: ключ последней строки предыдущей страницы.
+
+        :raises ValidationError: Некорректный cursor или cursor от другой
+            сортировки.
+        """
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor))
+            if data["o"] != ordering or len(data["v"]) != len(keyset):
+                raise ValueError(data)
+            return [
+                CashFlow._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(keyset, data["v"])
+            ]
+        except (
+            binascii.Error,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ):
+            raise ValidationError({"cursor": ["Некорректный cursor."]})
+
+
+class CashFlowDetailView(CashFlowAPIView):
+    """
+    GET /api/v1/cash-flows/<id> - ДДС.
+    PATCH /api/v1/cash-flows/<id> - изменение полей ДДС.
+    DELETE /api/v1/cash-flows/<id> - удаление ДДС.
+    """
+
+    async def get(self, request, pk):
+        snapshot = await taxonomy.asnapshot()
+        if (cash_flow := await self.get_cash_flow(pk)) is None:
+            return self.not_found()
+
+        return JsonResponse(serialize_cash_flow(cash_flow, snapshot))
+
+    async def patch(self, request, pk):
+        snapshot = await taxonomy.asnapshot()
+        if (cash_flow := await self.get_cash_flow(pk)) is None:
+            return self.not_found()
+
+        try:
+            cash_flow, changed = build_cash_flow(
+                self.parse_json(request),
+                snapshot,
+                instance=cash_flow,
+            )
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        if changed:
+            await cash_flow.asave(update_fields=changed)
+        return JsonResponse(serialize_cash_flow(cash_flow, snapshot))
+
+    async def delete(self, request, pk):
+        deleted, _ = await CashFlow.objects.filter(pk=pk).adelete()
+        if not deleted:
+            return self.not_found()
+        await abump_cash_flow_version()
+
+        return JsonResponse(
+            {"id": pk, "object": "cash_flow", "deleted": True},
+        )
+
+
+class CashFlowBulkView(CashFlowAPIView):
+    """
+    POST /api/v1/cash-flows/bulk - массовое создание, изменение и удаление
+    ДДС: {"items": [{"action": "create|update|delete", "id", "data"}, ...]}.
+
+    Вся пачка проверяется в памяти по снимку taxonomy и записывается в
+    одной транзакции (bulk_create/bulk_update/DELETE) либо не записывается
+    вовсе. Заголовок Idempotency-Key делает повтор запроса безопасным:
+    повтор того же пользователя в пределах API_IDEMPOTENCY_KEY_TTL
+    возвращает сохраненный ответ.
+    """
+
+    async def post(self, request):
+        try:
+            items = parse_bulk_items(self.parse_json(request))
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        actions = {
+            item.get("action") for item in items if isinstance(item, dict)
+        }
+        user = await request.auser()
+        for action, permission in (
+            (BULK_ACTION_UPDATE, "change"),
+            (BULK_ACTION_DELETE, "delete"),
+        ):
+            if action in actions and not await user.ahas_perm(
+                f"cash_manager.{permission}_cashflow",
+            ):
+                return api_error(403, "permission_error", "Недостаточно прав.")
+
+        # Повтор - только после проверки прав и только своего ключа
+        idempotency_key = request.headers.get("Idempotency-Key")
+        body_hash = request_hash(request.body)
+        if idempotency_key and (
+            stored := await active_idempotency_keys(
+                user,
+                idempotency_key,
+            ).afirst()
+        ):
+            return self._replay(stored, body_hash)
+
+        snapshot = await taxonomy.asnapshot()
+        existing = {}
+        if ids := bulk_ids(items):
+            existing = {
+                cash_flow.id: cash_flow
+                async for cash_flow in CashFlow.objects.filter(pk__in=ids)
+            }
+
+        plan = plan_bulk(items, existing, snapshot)
+        if plan.errors:
+            return JsonResponse(
+                {
+                    "error": {
+                        "type": "invalid_request_error",
+                        "message": "Пачка не записана: есть ошибки в операциях.",
+                        "items": plan.errors,
+                    },
+                },
+                status=400,
+            )
+
+        response = {
+            "object": "list",
+            "data": plan.results,
+            **{
+                action: sum(
+                    result["action"] == action for result in plan.results
+                )
+                for action in BULK_ACTIONS
+            },
+        }
+        # Транзакция - только в sync-коде: один переход в sync-поток
+        if stored := await sync_to_async(apply_bulk)(
+            plan,
+            response,
+            user,
+            idempotency_key,
+            body_hash,
+        ):
+            return self._replay(stored, body_hash)
+
+        return JsonResponse(response)
+
+    @staticmethod
+    def _replay(stored: CashFlowIdempotencyKey, body_hash: str) -> JsonResponse:
+        if stored.request_hash != body_hash:
+            return api_error(
+                422,
+                "idempotency_error",
+                "Ключ идемпотентности уже использован с другим запросом.",
+            )
+
+        return JsonResponse(
+            stored.response,
+            status=stored.status_code,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+class CashFlowReportView(CashFlowAPIView):
+    """
+    GET /api/v1/cash-flows/report - SUM/COUNT/AVG суммы ДДС.
+
+    Параметры: group_by (status,type,category,subcategory - через запятую),
+    bucket (day/week/month/quarter) и фильтры списка ДДС. Результат
+    кэшируется по (хэш параметров, версия справочников, версия данных ДДС);
+    отчет с реплики - не дольше POSTGRES_REPLICA_STICKY_SECONDS.
+    """
+
+    async def get(self, request):
+        snapshot = await taxonomy.asnapshot()
+        try:
+            report = CashFlowReport(request.GET, snapshot)
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        cache_key = report.cache_key(
+            await taxonomy.aversion(),
+            await acash_flow_version(),
+        )
+        # Сессия сразу после записи (закреплена за primary) не читает кэш:
+        # отчет под новой версией мог посчитать другой сессией по реплике,
+        # еще не получившей эту запись
+        if not is_pinned_to_primary() and (
+            body := await acache_get("report", cache_key)
+        ) is not None:
+            return JsonResponse(body, headers={"X-Cache": "HIT"})
+
+        try:
+            queryset = report.queryset()
+        except ValidationError as ex:
+            return invalid_request(ex)
+
+        with read_from_replica() as database:
+            data = [report.row(values) async for values in queryset]
+        body = {
+            "object": "report",
+            "source": report.source,
+            "group_by": report.group_by,
+            "bucket": report.bucket,
+            "data": data,
+        }
+        # Кэш хранит JSON-совместимые значения (Decimal, UUID, date -> str)
+        body = json.loads(json.dumps(body, cls=DjangoJSONEncoder))
+        # Отчет с реплики может отставать от версии в ключе на задержку
+        # репликации: он хранится не дольше окна закрепления за primary
+        timeout = settings.API_REPORT_CACHE_TIMEOUT
+        if database != PRIMARY_DB:
+            timeout = min(timeout, settings.POSTGRES_REPLICA_STICKY_SECONDS)
+        await cache.aset(cache_key, body, timeout=timeout)
+        return JsonResponse(body, headers={"X-Cache": "MISS"})
+
+
+class DatabasePoolStatsView(View):
+    """
+    Статистика пулов соединений Postgres (psycopg_pool.get_stats) текущего
+    worker-процесса: у каждого процесса uvicorn свой пул. Только для staff.
+    """
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return api_error(
+                401,
+                "authentication_error",
+                "Требуется аутентификация.",
+            )
+        if not user.is_staff:
+            return api_error(403, "permission_error", "Недостаточно прав.")
+
+        pools = {}
+        for alias in connections:
+            pool = getattr(connections[alias], "pool", None)
+            if pool is None:
+                continue
+            pools[alias] = {
+                "name": pool.name,
+                "closed": pool.closed,
+                "min_size": pool.min_size,
+                "max_size": pool.max_size,
+                **pool.get_stats(),
+            }
+
+        return JsonResponse(
+            {"object": "db_pool_stats", "pid": os.getpid(), "pools": pools},
+        )
+
+
+class CacheStatsView(View):
+    """
+    Попадания и промахи Django cache по областям (отчеты, списки AdminPanel,
+    подсказки наименований) текущего worker-процесса. Только для staff.
+    """
+
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return api_error(
+                401,
+                "authentication_error",
+                "Требуется аутентификация.",
+            )
+        if not user.is_staff:
+            return api_error(403, "permission_error", "Недостаточно прав.")
+
+        return JsonResponse(
+            {
+                "object": "cache_stats",
+                "pid": os.getpid(),
+                "backend": settings.CACHES["default"]["BACKEND"],
+                "namespaces": cache_stats(),
+            },
+        )
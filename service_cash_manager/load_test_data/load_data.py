@@ -1,8 +1,12 @@
+import argparse
 import asyncio
 import logging
+import random
+import sys
 from typing import Any
-from uuid import uuid4
-from datetime import datetime, timezone
+from uuid import UUID
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 
 import psycopg
 
@@ -11,16 +15,58 @@ from config import config
 
 loger = logging.getLogger(__name__)
 
+MAX_AMOUNT = Decimal("99999999.999")
+COPY_CHUNK_ROWS = 10_000
+COMMENT_TEMPLATES = (
+    "Оплата по счету №{n}",
+    "Пополнение баланса {subcategory}",
+    "Продление услуги {subcategory}",
+    "Рекламная кампания {subcategory} #{n}",
+    "Возврат средств по договору {n}",
+    "Ежемесячный платеж",
+    "Налог за {month} месяц",
+    "Перевод между счетами",
+)
+
 
 class DataForTestsGen:
     """Класс для генерации тестовых данных."""
 
+    def __init__(
+        self,
+        cash_flows: int = 0,
+        days: int = 365,
+        types: int = 0,
+        categories: int = 0,
+        subcategories_per_category: int = 3,
+        workers: int = 4,
+        seed: int = 42,
+    ) -> None:
+        """
+        :param cash_flows: Кол-во генерируемых ДДС.
+        :param days: Глубина истории ДДС в днях (до сегодняшнего дня).
+        :param types: Кол-во дополнительных (синтетических) типов.
+        :param categories: Кол-во дополнительных (синтетических) категорий.
+        :param subcategories_per_category: Подкатегорий на доп. категорию.
+        :param workers: Кол-во параллельных соединений для COPY.
+        :param seed: Seed генератора (одинаковый seed - одинаковые данные).
+        """
+        self.cash_flows = cash_flows
+        self.days = days
+        self.types = types
+        self.categories = categories
+        self.subcategories_per_category = subcategories_per_category
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
     @property
     def insert_user(self) -> str:
         return (
             "INSERT INTO public.auth_user "
             "(id, password, is_superuser, username, first_name, last_name, email, is_staff, is_active, date_joined) "
-            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -28,7 +74,8 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_status "
             "(id, title, alias) "
-            "VALUES (%s, %s, %s)"
+            "VALUES (%s, %s, %s) "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -36,7 +83,8 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_type "
             "(id, title, alias) "
-            "VALUES (%s, %s, %s)"
+            "VALUES (%s, %s, %s) "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -44,7 +92,8 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_subcategory "
             "(id, title, alias) "
-            "VALUES (%s, %s, %s)"
+            "VALUES (%s, %s, %s) "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -52,7 +101,8 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_category "
             "(id, title, alias) "
-            "VALUES (%s, %s, %s)"
+            "VALUES (%s, %s, %s) "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -60,7 +110,13 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_category_by_type "
             "(id, category_id, type_id) "
-            "VALUES (%s, %s, %s)"
+            "SELECT %(id)s::uuid, %(category_id)s::uuid, %(type_id)s::uuid "
+            "WHERE NOT EXISTS ("
+            "SELECT 1 FROM cash_manager.cash_flow_category_by_type "
+            "WHERE category_id = %(category_id)s::uuid "
+            "AND type_id = %(type_id)s::uuid"
+            ") "
+            "ON CONFLICT DO NOTHING"
         )
 
     @property
@@ -68,37 +124,119 @@ class DataForTestsGen:
         return (
             "INSERT INTO cash_manager.cash_flow_category_by_subcategory "
             "(id, category_id, subcategory_id) "
-            "VALUES (%s, %s, %s)"
+            "SELECT %(id)s::uuid, %(category_id)s::uuid, %(subcategory_id)s::uuid "
+            "WHERE NOT EXISTS ("
+            "SELECT 1 FROM cash_manager.cash_flow_category_by_subcategory "
+            "WHERE category_id = %(category_id)s::uuid "
+            "AND subcategory_id = %(subcategory_id)s::uuid"
+            ") "
+            "ON CONFLICT DO NOTHING"
         )
 
     @staticmethod
-    def gen_data() -> dict[str, dict[str, Any]]:
+    def select_ids(table: str) -> str:
+        return (
+            f"SELECT alias, id::text FROM cash_manager.{table} "
+            "WHERE alias = ANY(%s)"
+        )
+
+    @property
+    def copy_cash_flow(self) -> str:
+        return (
+            "COPY cash_manager.cash_flow "
+            "(id, created_at, status_id, type_id, category_id, subcategory_id, amount, comment) "
+            "FROM STDIN"
+        )
+
+    def uuid(self, rng: random.Random | None = None) -> str:
+        """UUID4 из генератора с seed (в отличие от uuid4 - воспроизводим)."""
+        return str(UUID(int=(rng or self.rng).getrandbits(128), version=4))
+
+    def gen_data(self) -> dict[str, dict[str, Any]]:
         subcategory = {
-            "vps": {"id": str(uuid4()), "ru": "ВПС"},
-            "proxy": {"id": str(uuid4()), "ru": "Прокси"},
-            "farpost": {"id": str(uuid4()), "ru": "Фарпост"},
-            "avito": {"id": str(uuid4()), "ru": "Авито"},
+            "vps": {"id": self.uuid(), "ru": "ВПС"},
+            "proxy": {"id": self.uuid(), "ru": "Прокси"},
+            "farpost": {"id": self.uuid(), "ru": "Фарпост"},
+            "avito": {"id": self.uuid(), "ru": "Авито"},
         }
         category = {
             "marketing": {
-                "id": str(uuid4()),
+                "id": self.uuid(),
                 "ru": "Маркетинг",
             },
             "infrastructure": {
-                "id": str(uuid4()),
+                "id": self.uuid(),
                 "ru": "Инфраструктура",
             },
         }
         types = {
             "replenishment": {
-                "id": str(uuid4()),
+                "id": self.uuid(),
                 "ru": "Пополнение",
             },
             "write_off": {
-                "id": str(uuid4()),
+                "id": self.uuid(),
                 "ru": "Списание",
             },
         }
+        category_by_type = {
+            self.uuid(): {
+                "category_id": category["marketing"]["id"],
+                "type_id": types["write_off"]["id"],
+            },
+            self.uuid(): {
+                "category_id": category["infrastructure"]["id"],
+                "type_id": types["replenishment"]["id"],
+            },
+        }
+        category_by_subcategory = {
+            self.uuid(): {
+                "category_id": category["marketing"]["id"],
+                "subcategory_id": subcategory["farpost"]["id"]
+            },
+            self.uuid(): {
+                "category_id": category["marketing"]["id"],
+                "subcategory_id": subcategory["avito"]["id"],
+            },
+            self.uuid(): {
+                "category_id": category["infrastructure"]["id"],
+                "subcategory_id": subcategory["vps"]["id"],
+            },
+            self.uuid(): {
+                "category_id": category["infrastructure"]["id"],
+                "subcategory_id": subcategory["proxy"]["id"],
+            },
+        }
+
+        # Синтетические справочники для нагрузочных данных
+        for t_num in range(1, self.types + 1):
+            types[f"type_{t_num}"] = {
+                "id": self.uuid(),
+                "ru": f"Тип {t_num}",
+            }
+
+        type_ids = [t_data["id"] for t_data in types.values()]
+        for c_num in range(1, self.categories + 1):
+            c_id = self.uuid()
+            category[f"category_{c_num}"] = {
+                "id": c_id,
+                "ru": f"Категория {c_num}",
+            }
+            category_by_type[self.uuid()] = {
+                "category_id": c_id,
+                "type_id": type_ids[c_num % len(type_ids)],
+            }
+
+            for sc_num in range(1, self.subcategories_per_category + 1):
+                sc_id = self.uuid()
+                subcategory[f"subcategory_{c_num}_{sc_num}"] = {
+                    "id": sc_id,
+                    "ru": f"Подкатегория {c_num}.{sc_num}",
+                }
+                category_by_subcategory[self.uuid()] = {
+                    "category_id": c_id,
+                    "subcategory_id": sc_id,
+                }
 
         return {
             "user": {
@@ -114,70 +252,73 @@ class DataForTestsGen:
                 "date_joined": datetime.now(timezone.utc).isoformat(),
             },
             "statuses": {
-                "business": {"id": str(uuid4()), "ru": "Бизнес"},
-                "self": {"id": str(uuid4()), "ru": "Личное"},
-                "tax": {"id": str(uuid4()), "ru": "Налог"},
+                "business": {"id": self.uuid(), "ru": "Бизнес"},
+                "self": {"id": self.uuid(), "ru": "Личное"},
+                "tax": {"id": self.uuid(), "ru": "Налог"},
             },
             "types": types,
             "subcategory": subcategory,
             "category": category,
-            "category_by_type": {
-                str(uuid4()): {
-                    "category_id": category["marketing"]["id"],
-                    "type_id": types["write_off"]["id"],
-                },
-                str(uuid4()): {
-                    "category_id": category["infrastructure"]["id"],
-                    "type_id": types["replenishment"]["id"],
-                },
-            },
-            "category_by_subcategory": {
-                str(uuid4()): {
-                    "category_id": category["marketing"]["id"],
-                    "subcategory_id": subcategory["farpost"]["id"]
-                },
-                str(uuid4()): {
-                    "category_id": category["marketing"]["id"],
-                    "subcategory_id": subcategory["avito"]["id"],
-                },
-                str(uuid4()): {
-                    "category_id": category["infrastructure"]["id"],
-                    "subcategory_id": subcategory["vps"]["id"],
-                },
-                str(uuid4()): {
-                    "category_id": category["infrastructure"]["id"],
-                    "subcategory_id": subcategory["proxy"]["id"],
-                },
-            },
+            "category_by_type": category_by_type,
+            "category_by_subcategory": category_by_subcategory,
         }
 
     async def gen(self) -> None:
+        """
+        Загрузка справочников и ДДС.
+
+        Справочники вставляются идемпотентно (ON CONFLICT DO NOTHING):
+        повторный запуск, например с --cash-flows на уже заполненной базе,
+        не падает на уже загруженных строках, а ДДС ссылаются на id
+        справочников из базы. Ошибки не подавляются - скрипт завершается
+        с ненулевым кодом.
+        """
+        data = self.gen_data()
         async with await psycopg.AsyncConnection.connect(
             config.pg_url_connection
         ) as pg_connect:
-            try:
-                async with pg_connect.cursor() as cursor:
-                    data = self.gen_data()
-                    await self._insert_user_data(cursor, data)
-                    await self._insert_status_data(cursor, data)
-                    await self._insert_type_data(cursor, data)
-                    await self._insert_subcategory_data(cursor, data)
-                    await self._insert_category_data(cursor, data)
+            async with pg_connect.cursor() as cursor:
+                await self._insert_user_data(cursor, data)
+                await self._insert_status_data(cursor, data)
+                await self._insert_type_data(cursor, data)
+                await self._insert_subcategory_data(cursor, data)
+                await self._insert_category_data(cursor, data)
+                await self._select_reference_ids(cursor, data)
 
-                    await pg_connect.commit()
+                await self._insert_category_by_type_data(cursor, data)
+                await self._insert_category_by_subcategory_data(
+                    cursor,
+                    data,
+                )
 
-                    await self._insert_category_by_type_data(cursor, data)
-                    await self._insert_category_by_subcategory_data(
-                        cursor,
-                        data,
-                    )
+            await pg_connect.commit()
 
-                await pg_connect.commit()
+        if self.cash_flows:
+            await self._copy_cash_flow_data(data)
 
-            except Exception as ex:
-                loger.error(f"Error gen test data: {ex}")
+        loger.info("All test data was gen")
 
-    loger.info("All test data was gen")
+    async def _select_reference_ids(self, cursor, data) -> None:
+        """
+        Id справочников из базы (по alias) вместо сгенерированных: строки,
+        загруженные ранее (другим seed), сохраняют свои id.
+        """
+        ids = {}
+        for table, key in (
+            ("cash_flow_status", "statuses"),
+            ("cash_flow_type", "types"),
+            ("cash_flow_subcategory", "subcategory"),
+            ("cash_flow_category", "category"),
+        ):
+            await cursor.execute(self.select_ids(table), (list(data[key]),))
+            for alias, db_id in await cursor.fetchall():
+                ids[data[key][alias]["id"]] = db_id
+                data[key][alias]["id"] = db_id
+
+        for links in (data["category_by_type"], data["category_by_subcategory"]):
+            for link in links.values():
+                for field, value in link.items():
+                    link[field] = ids.get(value, value)
 
     async def _insert_user_data(self, cursor, data) -> None:
         user_data = data["user"]
@@ -198,72 +339,251 @@ class DataForTestsGen:
         )
 
     async def _insert_status_data(self, cursor, data) -> None:
-        for s_name, s_data in data["statuses"].items():
-            await cursor.execute(
-                self.insert_status,
-                (
-                    s_data["id"],
-                    s_data["ru"],
-                    s_name,
-                ),
-            )
+        await cursor.executemany(
+            self.insert_status,
+            [
+                (s_data["id"], s_data["ru"], s_name)
+                for s_name, s_data in data["statuses"].items()
+            ],
+        )
 
     async def _insert_type_data(self, cursor, data) -> None:
-        for t_name, t_data in data["types"].items():
-            await cursor.execute(
-                self.insert_type,
-                (
-                    t_data["id"],
-                    t_data["ru"],
-                    t_name,
-                ),
-            )
+        await cursor.executemany(
+            self.insert_type,
+            [
+                (t_data["id"], t_data["ru"], t_name)
+                for t_name, t_data in data["types"].items()
+            ],
+        )
 
     async def _insert_subcategory_data(self, cursor, data) -> None:
-        for sc_name, sc_data in data["subcategory"].items():
-            await cursor.execute(
-                self.insert_subcategory,
-                (
-                    sc_data["id"],
-                    sc_data["ru"],
-                    sc_name,
-                ),
-            )
+        await cursor.executemany(
+            self.insert_subcategory,
+            [
+                (sc_data["id"], sc_data["ru"], sc_name)
+                for sc_name, sc_data in data["subcategory"].items()
+            ],
+        )
 
     async def _insert_category_data(self, cursor, data) -> None:
-        for c_name, c_data in data["category"].items():
-            await cursor.execute(
-                self.insert_category,
-                (
-                    c_data["id"],
-                    c_data["ru"],
-                    c_name,
-                ),
-            )
+        await cursor.executemany(
+            self.insert_category,
+            [
+                (c_data["id"], c_data["ru"], c_name)
+                for c_name, c_data in data["category"].items()
+            ],
+        )
 
     async def _insert_category_by_type_data(self, cursor, data) -> None:
-        for cbt_id, cbt_data in data["category_by_type"].items():
-            await cursor.execute(
-                self.insert_category_by_type,
-                (
-                    cbt_id,
-                    cbt_data["category_id"],
-                    cbt_data["type_id"],
-                ),
-            )
+        await cursor.executemany(
+            self.insert_category_by_type,
+            [
+                {"id": cbt_id, **cbt_data}
+                for cbt_id, cbt_data in data["category_by_type"].items()
+            ],
+        )
 
     async def _insert_category_by_subcategory_data(self, cursor, data) -> None:
         category_by_subcategories = data["category_by_subcategory"]
 
-        for cbs_id, cbs_data in category_by_subcategories.items():
-            await cursor.execute(
-                self.insert_category_by_subcategory,
-                (
-                    cbs_id,
-                    cbs_data["category_id"],
-                    cbs_data["subcategory_id"],
-                ),
+        await cursor.executemany(
+            self.insert_category_by_subcategory,
+            [
+                {"id": cbs_id, **cbs_data}
+                for cbs_id, cbs_data in category_by_subcategories.items()
+            ],
+        )
+
+    async def _copy_cash_flow_data(self, data) -> None:
+        """
+        Генерация ДДС и загрузка через COPY в несколько соединений.
+
+        Дни истории делятся на непрерывные диапазоны по числу соединений,
+        внутри диапазона строки идут по возрастанию даты (как при реальной
+        вставке - это важно для BRIN-индекса по created_at).
+        """
+        days_counts = self._days_counts()
+        chunk = -(-len(days_counts) // self.workers)
+        started_at = datetime.now()
+
+        await asyncio.gather(
+            *(
+                self._copy_cash_flow_worker(
+                    data,
+                    days_counts[w_num * chunk:(w_num + 1) * chunk],
+                    random.Random(f"{self.seed}:{w_num}"),
+                )
+                for w_num in range(self.workers)
+            )
+        )
+
+        loger.info(
+            f"Cash flows was gen: {self.cash_flows} "
+            f"({datetime.now() - started_at})"
+        )
+
+    async def _copy_cash_flow_worker(
+        self,
+        data,
+        days_counts: list[tuple[date, int]],
+        rng: random.Random,
+    ) -> None:
+        if not days_counts:
+            return
+
+        links = self._links(data)
+        if not links:
+            raise RuntimeError(
+                "No type -> category -> subcategory links for cash flows"
             )
 
+        statuses = [s_data["id"] for s_data in data["statuses"].values()]
+        status_weights = self._zipf_weights(len(statuses))
+        types = list(links)
+        type_weights = self._zipf_weights(len(types))
+
+        async with await psycopg.AsyncConnection.connect(
+            config.pg_url_connection
+        ) as pg_connect:
+            async with pg_connect.cursor() as cursor:
+                async with cursor.copy(self.copy_cash_flow) as copy:
+                    lines = []
+                    for created_at, count in days_counts:
+                        for _ in range(count):
+                            type_id = rng.choices(types, type_weights)[0]
+                            category_id, subcategory_id, subcategory_ru = (
+                                rng.choice(links[type_id])
+                            )
+                            lines.append(
+                                "\t".join(
+                                    (
+                                        self.uuid(rng),
+                                        created_at.isoformat(),
+                                        rng.choices(statuses, status_weights)[0],
+                                        type_id,
+                                        category_id,
+                                        subcategory_id,
+                                        str(self._amount(rng)),
+                                        self._comment(rng, subcategory_ru),
+                                    )
+                                )
+                            )
+
+                            if len(lines) >= COPY_CHUNK_ROWS:
+                                await copy.write("\n".join(lines) + "\n")
+                                lines.clear()
+
+                    if lines:
+                        await copy.write("\n".join(lines) + "\n")
+
+            await pg_connect.commit()
+
+    def _days_counts(self) -> list[tuple[date, int]]:
+        """
+        Кол-во ДДС по дням: объем растет к текущей дате (рост бизнеса)
+        и проседает в выходные.
+        """
+        today = date.today()
+        days = [
+            today - timedelta(days=offset)
+            for offset in range(self.days - 1, -1, -1)
+        ]
+        weights = [
+            (1 + 2 * num / len(days)) * (0.4 if day.weekday() >= 5 else 1)
+            for num, day in enumerate(days)
+        ]
+        total_weight = sum(weights)
+
+        counts = [int(self.cash_flows * w / total_weight) for w in weights]
+        for num in self.rng.sample(
+            range(len(days)),
+            self.cash_flows - sum(counts),
+        ):
+            counts[num] += 1
+
+        return list(zip(days, counts))
+
+    @staticmethod
+    def _links(data) -> dict[str, list[tuple[str, str, str]]]:
+        """Тип -> [(категория, подкатегория, наименование подкатегории)]."""
+        subcategories_ru = {
+            sc_data["id"]: sc_data["ru"]
+            for sc_data in data["subcategory"].values()
+        }
+        subcategories_by_category: dict[str, list[str]] = {}
+        for cbs_data in data["category_by_subcategory"].values():
+            subcategories_by_category.setdefault(
+                cbs_data["category_id"],
+                [],
+            ).append(cbs_data["subcategory_id"])
+
+        links: dict[str, list[tuple[str, str, str]]] = {}
+        for cbt_data in data["category_by_type"].values():
+            for sc_id in subcategories_by_category.get(
+                cbt_data["category_id"],
+                [],
+            ):
+                links.setdefault(cbt_data["type_id"], []).append(
+                    (cbt_data["category_id"], sc_id, subcategories_ru[sc_id])
+                )
+
+        return links
+
+    @staticmethod
+    def _zipf_weights(count: int) -> list[float]:
+        return [1 / num for num in range(1, count + 1)]
+
+    @staticmethod
+    def _amount(rng: random.Random) -> Decimal:
+        """Сумма с лог-нормальным распределением (медиана ~3 000 руб.)."""
+        amount = Decimal(str(round(rng.lognormvariate(8, 1.5), 2)))
+        return min(amount, MAX_AMOUNT)
+
+    @staticmethod
+    def _comment(rng: random.Random, subcategory_ru: str) -> str:
+        # \N - NULL в текстовом формате COPY
+        if rng.random() < 0.2:
+            return "\\N"
+
+        template = rng.choices(
+            COMMENT_TEMPLATES,
+            DataForTestsGen._zipf_weights(len(COMMENT_TEMPLATES)),
+        )[0]
+        return template.format(
+            n=rng.randint(1, 99_999),
+            subcategory=subcategory_ru,
+            month=rng.randint(1, 12),
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Генерация тестовых данных")
+    parser.add_argument("--cash-flows", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--types", type=int, default=0)
+    parser.add_argument("--categories", type=int, default=0)
+    parser.add_argument("--subcategories-per-category", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(DataForTestsGen().gen())
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    try:
+        asyncio.run(
+            DataForTestsGen(
+                cash_flows=args.cash_flows,
+                days=args.days,
+                types=args.types,
+                categories=args.categories,
+                subcategories_per_category=args.subcategories_per_category,
+                workers=args.workers,
+                seed=args.seed,
+            ).gen()
+        )
+    except Exception as ex:
+        loger.error(f"Error gen test data: {ex}")
+        sys.exit(1)
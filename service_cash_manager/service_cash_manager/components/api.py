@@ -0,0 +1,37 @@
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+# REST-API: размер страницы списков (параметр limit) по умолчанию и максимум
+API_PAGE_SIZE = int(os.environ.get("CASH_MANAGER_API_PAGE_SIZE", 50))
+API_MAX_PAGE_SIZE = int(os.environ.get("CASH_MANAGER_API_MAX_PAGE_SIZE", 500))
+
+# REST-API: макс. кол-во операций в одном запросе массовой записи ДДС и
+# размер пачки bulk_create/bulk_update
+API_BULK_MAX_ITEMS = int(
+    os.environ.get("CASH_MANAGER_API_BULK_MAX_ITEMS", 50_000)
+)
+API_BULK_BATCH_SIZE = int(
+    os.environ.get("CASH_MANAGER_API_BULK_BATCH_SIZE", 1000)
+)
+
+# REST-API: время жизни ключей идемпотентности массовой записи, сек.:
+# старше - не повторяются и удаляются командой purge_idempotency_keys
+API_IDEMPOTENCY_KEY_TTL = int(
+    os.environ.get("CASH_MANAGER_API_IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+)
+
+# Макс. размер тела запроса: пачка из API_BULK_MAX_ITEMS операций не
+# помещается в значение Django по умолчанию (2.5 МБ)
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(
+    os.environ.get("CASH_MANAGER_DATA_UPLOAD_MAX_MEMORY_SIZE", 32 * 1024 * 1024)
+)
+
+# REST-API: время жизни закэшированных отчетов, сек. Ключ кэша меняется при
+# записи ДДС; таймаут ограничивает устаревание при записи в обход приложения
+API_REPORT_CACHE_TIMEOUT = int(
+    os.environ.get("CASH_MANAGER_API_REPORT_CACHE_TIMEOUT", 300)
+)
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+# Короткие имена backend-ов Django cache (или полный путь к классу)
+CACHE_BACKENDS = {
+    # В памяти процесса: у каждого worker-а uvicorn свой кэш, версии данных
+    # не общие - только для разработки и тестов
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    # Каталог на диске: общий для worker-ов одного хоста, но не для
+    # нескольких хостов (у каждого свой каталог); при MAX_ENTRIES записей
+    # часть кэша вытесняется - версии данных хранятся в sequence Postgres
+    # (cash_manager.data_version), кэш держит только их копию
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    # Redis-совместимый сервер (Redis, Valkey, KeyDB), пакет redis
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_BACKEND = os.environ.get(
+    "CASH_MANAGER_CACHE_BACKEND",
+    "file",
+)
+CACHE_BACKEND = CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND)
+
+if CACHE_BACKEND == CACHE_BACKENDS["redis"]:
+    CACHE_LOCATION = os.environ.get(
+        "CASH_MANAGER_CACHE_LOCATION",
+        "redis://127.0.0.1:6379/0",
+    )
+elif CACHE_BACKEND == CACHE_BACKENDS["locmem"]:
+    CACHE_LOCATION = os.environ.get("CASH_MANAGER_CACHE_LOCATION", "")
+else:
+    CACHE_LOCATION = os.environ.get(
+        "CASH_MANAGER_CACHE_LOCATION",
+        os.path.join(tempfile.gettempdir(), "cash_manager_cache"),
+    )
+
+# Cache (общий для всех worker-процессов uvicorn, кроме locmem; для
+# нескольких хостов - только redis)
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": CACHE_LOCATION,
+        "KEY_PREFIX": os.environ.get("CASH_MANAGER_CACHE_KEY_PREFIX", ""),
+        "TIMEOUT": int(os.environ.get("CASH_MANAGER_CACHE_TIMEOUT", 300)),
+    },
+}
+
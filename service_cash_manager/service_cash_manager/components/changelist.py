@@ -0,0 +1,21 @@
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+# AdminPanel: выше порога кол-во строк списка берется из статистики Postgres
+CHANGELIST_EXACT_COUNT_THRESHOLD = int(
+    os.environ.get("CASH_MANAGER_CHANGELIST_EXACT_COUNT_THRESHOLD", 100_000)
+)
+# AdminPanel: время жизни кэша кол-ва строк списка и фасетов (сек.);
+# запись ДДС сбрасывает кэш раньше (версия данных в ключе)
+CHANGELIST_COUNT_CACHE_TIMEOUT = int(
+    os.environ.get("CASH_MANAGER_CHANGELIST_COUNT_CACHE_TIMEOUT", 60)
+)
+# AdminPanel: время жизни кэша страниц списков справочников и подсказок
+# наименований (сек.); изменение справочников сбрасывает кэш раньше
+CHANGELIST_RESULTS_CACHE_TIMEOUT = int(
+    os.environ.get("CASH_MANAGER_CHANGELIST_RESULTS_CACHE_TIMEOUT", 600)
+)
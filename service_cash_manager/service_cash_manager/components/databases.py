@@ -17,5 +17,95 @@ DATABASES = {
         "PASSWORD": os.environ.get("CASH_MANAGER_POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST", "127.0.0.1"),
         "PORT": os.environ.get("POSTGRES_PORT", 5432),
+        "OPTIONS": {
+            # psycopg3: параметры передаются отдельно от текста запроса
+            # (server-side binding), что позволяет psycopg подготавливать
+            # (PREPARE) запросы, выполненные prepare_threshold раз
+            "server_side_binding": os.environ.get(
+                "CASH_MANAGER_POSTGRES_SERVER_SIDE_BINDING",
+                "True",
+            ) == "True",
+            "prepare_threshold": int(
+                os.environ.get("CASH_MANAGER_POSTGRES_PREPARE_THRESHOLD", 5)
+            ),
+        },
     },
 }
+# Размер кэша prepared statements на соединение (Connection.prepared_max)
+POSTGRES_PREPARED_MAX = int(
+    os.environ.get("CASH_MANAGER_POSTGRES_PREPARED_MAX", 100)
+)
+
+# Postgres: пул соединений psycopg (по одному на процесс-worker uvicorn)
+POSTGRES_POOL = os.environ.get(
+    "CASH_MANAGER_POSTGRES_POOL",
+    "True",
+) == "True"
+# Postgres: подключение через PgBouncer в transaction mode (пул - PgBouncer)
+POSTGRES_PGBOUNCER = os.environ.get(
+    "CASH_MANAGER_POSTGRES_PGBOUNCER",
+    "False",
+) == "True"
+
+if POSTGRES_PGBOUNCER:
+    # В transaction mode соединение сервера не закреплено за клиентом:
+    # server-side cursors (QuerySet.iterator) и именованные prepared
+    # statements psycopg не переживают транзакцию
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+    DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("CASH_MANAGER_POSTGRES_CONN_MAX_AGE", 0)
+    )
+elif POSTGRES_POOL:
+    # CONN_MAX_AGE с пулом должен быть 0: соединение возвращается в пул
+    # в конце запроса
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(
+            os.environ.get("CASH_MANAGER_POSTGRES_POOL_MIN_SIZE", 2)
+        ),
+        "max_size": int(
+            os.environ.get("CASH_MANAGER_POSTGRES_POOL_MAX_SIZE", 10)
+        ),
+        # Ожидание свободного соединения, сек.
+        "timeout": float(
+            os.environ.get("CASH_MANAGER_POSTGRES_POOL_TIMEOUT", 10)
+        ),
+        # Закрытие простаивающих (сверх min_size) и долгоживущих соединений
+        "max_idle": float(
+            os.environ.get("CASH_MANAGER_POSTGRES_POOL_MAX_IDLE", 300)
+        ),
+        "max_lifetime": float(
+            os.environ.get("CASH_MANAGER_POSTGRES_POOL_MAX_LIFETIME", 3600)
+        ),
+    }
+else:
+    # Постоянные соединения без пула
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("CASH_MANAGER_POSTGRES_CONN_MAX_AGE", 60)
+    )
+
+# Проверка соединения перед использованием (с пулом - при выдаче из пула:
+# ConnectionPool.check_connection)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.environ.get(
+    "CASH_MANAGER_POSTGRES_CONN_HEALTH_CHECKS",
+    "True",
+) == "True"
+
+# Postgres: реплика для read-only запросов (список ДДС, выгрузка, отчеты).
+# Без CASH_MANAGER_POSTGRES_REPLICA_HOST все запросы идут в default
+if replica_host := os.environ.get("CASH_MANAGER_POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": os.environ.get(
+            "CASH_MANAGER_POSTGRES_REPLICA_PORT",
+            DATABASES["default"]["PORT"],
+        ),
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["cash_manager.routers.PrimaryReplicaRouter"]
+# Чтения сессии идут на primary в течение этого времени после записи, сек.
+POSTGRES_REPLICA_STICKY_SECONDS = int(
+    os.environ.get("CASH_MANAGER_POSTGRES_REPLICA_STICKY_SECONDS", 10)
+)
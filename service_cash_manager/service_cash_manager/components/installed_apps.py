@@ -5,6 +5,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rangefilter',  # AdminFilter
     'cash_manager.apps.CashManagerConfig', # CashManager
 ]
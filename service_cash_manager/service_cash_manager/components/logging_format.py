@@ -36,5 +36,11 @@ LOGGING = {
             ),
             "propagate": True,
         },
+        # Сервис (метрики запросов, медленные SQL-запросы)
+        "cash_manager": {
+            "handlers": ["console"],
+            "level": os.environ.get("CASH_MANAGER_SERVICE_LOG_LVL", "INFO"),
+            "propagate": False,
+        },
     },
 }
@@ -1,9 +1,12 @@
 MIDDLEWARE = [
+    'cash_manager.middleware.metrics_middleware',
+    'cash_manager.middleware.performance_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cash_manager.middleware.replica_stickiness_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
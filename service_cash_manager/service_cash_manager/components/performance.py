@@ -0,0 +1,31 @@
+import os
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+# Метрики запросов (время, SQL-запросы, время в БД, повторы) в лог
+# cash_manager.performance и заголовок Server-Timing
+PERFORMANCE_INSTRUMENTATION = os.environ.get(
+    "CASH_MANAGER_PERFORMANCE_INSTRUMENTATION",
+    "False",
+) == "True"
+# Порог медленного SQL-запроса (мс)
+PERFORMANCE_SLOW_QUERY_MS = float(
+    os.environ.get("CASH_MANAGER_PERFORMANCE_SLOW_QUERY_MS", 200)
+)
+# Сколько выполнений одного отпечатка SQL за запрос считать N+1
+PERFORMANCE_REPEATED_QUERY_THRESHOLD = int(
+    os.environ.get("CASH_MANAGER_PERFORMANCE_REPEATED_QUERY_THRESHOLD", 5)
+)
+
+# Метрики Prometheus: GET /metrics (время ответа и SQL-запросов, пулы
+# соединений, кэш, строки ДДС); доступ - с Authorization: Bearer <токен>
+# или staff-сессией. Для нескольких worker-ов uvicorn - каталог
+# PROMETHEUS_MULTIPROC_DIR
+METRICS_ENABLED = os.environ.get(
+    "CASH_MANAGER_METRICS_ENABLED",
+    "False",
+) == "True"
+METRICS_TOKEN = os.environ.get("CASH_MANAGER_METRICS_TOKEN", "")
@@ -45,6 +45,10 @@ include(
     "components/middleware.py",
     "components/templates.py",
     "components/databases.py",
+    "components/cache.py",
+    "components/changelist.py",
+    "components/performance.py",
+    "components/api.py",
     "components/auth.py",
     "components/cors.py",
     "components/logging_format.py",
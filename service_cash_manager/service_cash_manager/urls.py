@@ -15,12 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from cash_manager.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/', include('cash_manager.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 
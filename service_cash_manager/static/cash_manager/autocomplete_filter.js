@@ -0,0 +1,58 @@
+// Подсказки наименований справочников в фильтрах списка ДДС.
+// Выбранная подсказка передается фильтру как UUID (скрытое поле),
+// введенная без выбора строка - как есть (поиск по наименованию).
+'use strict';
+{
+    const DEBOUNCE_MS = 200;
+
+    function init(input) {
+        const target = document.getElementById(input.dataset.target);
+        const datalist = input.list;
+        let timer = null;
+        let controller = null;
+
+        function selectedId() {
+            const option = Array.from(datalist.options).find(
+                (item) => item.value === input.value
+            );
+            return option ? option.dataset.id : null;
+        }
+
+        async function load() {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            const url = new URL(input.dataset.autocompleteUrl, window.location.href);
+            url.searchParams.set('q', input.value.trim());
+            try {
+                const response = await fetch(url, {signal: controller.signal});
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                datalist.replaceChildren(...data.results.map((result) => {
+                    const option = document.createElement('option');
+                    option.value = result.text;
+                    option.dataset.id = result.id;
+                    return option;
+                }));
+            } catch (error) {
+                if (error.name !== 'AbortError') {
+                    throw error;
+                }
+            }
+        }
+
+        input.addEventListener('input', () => {
+            target.value = selectedId() || input.value.trim();
+            clearTimeout(timer);
+            timer = setTimeout(load, DEBOUNCE_MS);
+        });
+        input.addEventListener('focus', load, {once: true});
+    }
+
+    window.addEventListener('load', () => {
+        document.querySelectorAll('input[data-autocomplete-url]').forEach(init);
+    });
+}
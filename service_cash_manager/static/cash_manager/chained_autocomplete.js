@@ -0,0 +1,51 @@
+// Инициализация autocomplete (select2) полей AdminPanel вместо
+// admin/js/autocomplete.js: у полей с data-chained-field в запрос
+// подсказок добавляется значение родительского поля той же формы
+// (категории - по типу, подкатегории - по категории), а при его смене
+// значение поля сбрасывается.
+'use strict';
+{
+    const $ = django.jQuery;
+
+    function chainedParent(element) {
+        const parentName = element.dataset.chainedField;
+        if (!parentName) {
+            return null;
+        }
+        // Имя поля с префиксом формы (inline): <prefix><field_name>
+        const prefix = element.name.slice(
+            0,
+            element.name.length - element.dataset.fieldName.length
+        );
+        return element.form.elements.namedItem(prefix + parentName);
+    }
+
+    $.fn.djangoAdminSelect2 = function() {
+        $.each(this, function(i, element) {
+            const parent = chainedParent(element);
+            $(element).select2({
+                ajax: {
+                    data: (params) => {
+                        const data = {
+                            term: params.term,
+                            page: params.page,
+                            app_label: element.dataset.appLabel,
+                            model_name: element.dataset.modelName,
+                            field_name: element.dataset.fieldName
+                        };
+                        if (parent && parent.value) {
+                            data[element.dataset.chainedField] = parent.value;
+                        }
+                        return data;
+                    }
+                }
+            });
+            if (parent) {
+                $(parent).on('change', () => {
+                    $(element).val(null).trigger('change');
+                });
+            }
+        });
+        return this;
+    };
+}